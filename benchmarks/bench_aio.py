@@ -0,0 +1,72 @@
+"""
+事件循环的响应性：在转换 --docs 个文档的同时，一个心跳任务每 1 ms 醒来一次，
+记录它最长被阻塞了多久。直接调用 convert_md_to_typ 会让事件循环停顿整个转换的时间。
+
+    python benchmarks/bench_aio.py --docs 8 --size 500000
+"""
+
+import argparse
+import asyncio
+import time
+
+from corpus import generate_markdown
+
+from marktypist.aio import AsyncConverter
+from marktypist.main import convert_md_to_typ
+
+
+async def measure(convert_all) -> tuple:
+    stop = False
+    worst = 0.0
+
+    async def heartbeat():
+        nonlocal worst
+        last = time.perf_counter()
+        while not stop:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, now - last)
+            last = now
+
+    beat = asyncio.ensure_future(heartbeat())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await convert_all()
+    elapsed = time.perf_counter() - start
+    stop = True
+    await beat
+    return elapsed, worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=8)
+    parser.add_argument("--size", type=int, default=200_000, help="bytes per document")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    texts = [generate_markdown(args.size, seed=i) for i in range(args.docs)]
+
+    async def blocking():
+        for text in texts:
+            convert_md_to_typ(text)
+
+    def pooled(converter):
+        async def run():
+            await asyncio.gather(*(converter.md_to_typ(text) for text in texts))
+        return run
+
+    async def run_all():
+        results = {"blocking call": await measure(blocking)}
+        for name in ("thread", "process"):
+            async with AsyncConverter(name, max_workers=args.workers) as converter:
+                await converter.md_to_typ("# warm up")
+                results[f"AsyncConverter({name})"] = await measure(pooled(converter))
+        return results
+
+    for name, (elapsed, worst) in asyncio.run(run_all()).items():
+        print(f"{name:<26} total {elapsed * 1000:>9.1f} ms   worst loop stall {worst * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Markdown -> Typst：token 列表 + UDM 对象树（MarkdownParser.parse + TypstRenderer）与
+扁平数组 arena（MarkdownParser.parse_arena + ArenaTypstRenderer）的耗时和内存。
+
+耗时在不开启 tracemalloc 时测量；内存用 tracemalloc 统计（只计 Python 分配）：
+解析过程中的峰值，以及解析完成后文档树本身保留的内存。
+
+    python benchmarks/bench_arena.py --size 20MB
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from corpus import generate_markdown
+from suite import format_size, parse_size
+
+from marktypist.arena import ArenaTypstRenderer
+from marktypist.md_parser import MarkdownParser
+from marktypist.typ_renderer import TypstRenderer
+
+
+def measure_memory(parse):
+    gc.collect()
+    tracemalloc.start()
+    tree = parse()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=parse_size, default=parse_size("10MB"))
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc pass")
+    args = parser.parse_args()
+
+    text = generate_markdown(args.size)
+    markdown_parser = MarkdownParser()
+    pipelines = {
+        "tokens + UDM": (lambda: markdown_parser.parse(text), TypstRenderer()),
+        "arena": (lambda: markdown_parser.parse_arena(text), ArenaTypstRenderer()),
+    }
+
+    print(f"{format_size(len(text.encode('utf-8')))} Markdown input")
+    print(f"{'pipeline':<14} {'parse s':>8} {'render s':>9} {'peak MB':>9} {'tree MB':>9}")
+    outputs = []
+    for name, (parse, renderer) in pipelines.items():
+        gc.collect()
+        start = time.perf_counter()
+        tree = parse()
+        parsed = time.perf_counter()
+        outputs.append(renderer.render(tree))
+        rendered = time.perf_counter()
+        del tree
+        retained = peak = float("nan")
+        if not args.no_memory:
+            retained, peak = (value / 1024 / 1024 for value in measure_memory(parse))
+        print(f"{name:<14} {parsed - start:>8.2f} {rendered - parsed:>9.2f} {peak:>9.1f} {retained:>9.1f}")
+    print(f"byte-identical output: {outputs[0] == outputs[1]}")
+
+
+if __name__ == "__main__":
+    main()
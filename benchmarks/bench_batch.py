@@ -0,0 +1,81 @@
+"""
+批量转换的多进程扩展性基准。
+
+在临时目录中生成一批 Markdown/Typst 文件，分别以 1, 2, 4, ... 个工作进程
+运行 convert_tree，并打印耗时与相对单进程的加速比。
+
+    python benchmarks/bench_batch.py --files 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from marktypist.batch import convert_tree
+
+MD_PAGE = """# Page {i}
+
+Some **bold** and *italic* text with `code` and a [link](https://example.com/{i}).
+
+- item one
+- item two
+
+| Key | Value |
+| --- | --- |
+| a | {i} |
+
+> quoted paragraph {i}
+"""
+
+TYP_PAGE = """= Page {i}
+
+Some *bold* and _italic_ text.
+
+- item one
+- item two
+"""
+
+
+def make_tree(root: Path, count: int) -> None:
+    for i in range(count):
+        directory = root / f"section{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if i % 2:
+            (directory / f"page{i}.typ").write_text(TYP_PAGE.format(i=i), encoding="utf-8")
+        else:
+            (directory / f"page{i}.md").write_text(MD_PAGE.format(i=i) * 5, encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    jobs_list = []
+    jobs = 1
+    while jobs < args.max_jobs:
+        jobs_list.append(jobs)
+        jobs *= 2
+    jobs_list.append(args.max_jobs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "src"
+        make_tree(src, args.files)
+
+        baseline = None
+        print(f"{'jobs':>5} {'seconds':>9} {'files/s':>9} {'speedup':>8}")
+        for jobs in jobs_list:
+            out = Path(tmp) / f"out{jobs}"
+            start = time.perf_counter()
+            results = convert_tree(str(src), out, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            assert all(r.ok for r in results)
+            baseline = baseline or elapsed
+            print(f"{jobs:>5} {elapsed:>9.3f} {len(results) / elapsed:>9.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
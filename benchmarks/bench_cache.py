@@ -0,0 +1,42 @@
+"""
+转换缓存的冷启动 vs 热启动基准。
+
+生成一批文件，用同一个缓存目录运行两次 convert_tree：
+第一次全部未命中并写入缓存，第二次全部命中。
+
+    python benchmarks/bench_cache.py --files 2000 --jobs 1
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_batch import make_tree
+from marktypist.batch import convert_tree
+from marktypist.cache import ConversionCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "src"
+        make_tree(src, args.files)
+        cache_dir = Path(tmp) / "cache"
+
+        print(f"{'run':<10} {'seconds':>8} {'files/s':>8} {'hits':>6} {'misses':>7}")
+        for run in ("no cache", "cold", "warm"):
+            cache = None if run == "no cache" else ConversionCache(cache_dir)
+            start = time.perf_counter()
+            results = convert_tree(str(src), Path(tmp) / "out", jobs=args.jobs, cache=cache)
+            elapsed = time.perf_counter() - start
+            hits = sum(r.cached for r in results)
+            print(f"{run:<10} {elapsed:>8.3f} {len(results) / elapsed:>8.0f} {hits:>6} {len(results) - hits:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+单次调用开销基准：每次调用都新建解析器/渲染器（旧做法） vs 复用 Converter。
+
+    python benchmarks/bench_converter.py --calls 2000
+"""
+
+import argparse
+import time
+
+from marktypist.main import Converter
+from marktypist.md_parser import MarkdownParser
+from marktypist.typ_parser import TypstParser
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.typ_renderer import TypstRenderer
+
+SMALL_MD = "# Title\n\nSome **bold** text and a [link](https://example.com)."
+SMALL_TYP = "= Title\n\nSome *bold* text and _italic_ text."
+
+
+def per_call_md_to_typ(text):
+    return TypstRenderer().render(MarkdownParser().parse(text))
+
+
+def per_call_typ_to_md(text):
+    return MarkdownRenderer().render(TypstParser().parse(text))
+
+
+def timeit(func, text, calls):
+    func(text)  # 预热
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(text)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    converter = Converter()
+    rows = [
+        ("md -> typ", per_call_md_to_typ, converter.md_to_typ, SMALL_MD),
+        ("typ -> md", per_call_typ_to_md, converter.typ_to_md, SMALL_TYP),
+    ]
+    print(f"{'direction':<10} {'per-call us':>12} {'Converter us':>13} {'speedup':>8}")
+    for name, before, after, text in rows:
+        t_before = timeit(before, text, args.calls)
+        t_after = timeit(after, text, args.calls)
+        print(f"{name:<10} {t_before:>12.1f} {t_after:>13.1f} {t_before / t_after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+常驻服务 (marktypist serve) 与每个文件启动一个进程的对比：转换 --files 个小文件，分别测量
+
+  per-process   每个文件运行一次 marktypist convert --no-daemon
+  cli+daemon    每个文件运行一次 marktypist convert，由常驻服务转换
+  client        在同一个进程中通过套接字发送请求（编辑器等集成直接使用协议时的延迟）
+
+    python benchmarks/bench_daemon.py --files 50 --workers 2
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import generate_markdown
+
+from marktypist import client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--size", type=int, default=4096, help="bytes per file")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sources = []
+        for i in range(args.files):
+            source = tmp / f"doc{i}.md"
+            source.write_text(generate_markdown(args.size, seed=i), encoding="utf-8")
+            sources.append(source)
+
+        socket_path = tmp / "marktypist.sock"
+        env = dict(os.environ, PYTHONPATH=str(ROOT), MARKTYPIST_SOCKET=str(socket_path))
+        cli = [sys.executable, "-m", "marktypist.cli"]
+
+        def run_cli(extra):
+            start = time.perf_counter()
+            for source in sources:
+                subprocess.run([*cli, "convert", str(source), "-o", str(source.with_suffix(".typ")), *extra],
+                               env=env, check=True, capture_output=True)
+            return time.perf_counter() - start
+
+        results = {"per-process": run_cli(["--no-daemon"])}
+
+        serve_command = [*cli, "serve", "--socket", str(socket_path)]
+        if args.workers:
+            serve_command += ["--workers", str(args.workers)]
+        daemon = subprocess.Popen(serve_command, env=env, stderr=subprocess.DEVNULL)
+        try:
+            while client.ping(socket_path) is None:
+                time.sleep(0.05)
+            results["cli+daemon"] = run_cli([])
+
+            start = time.perf_counter()
+            for source in sources:
+                response = client.request({"input": str(source), "output": str(source.with_suffix(".typ"))},
+                                          socket_path)
+                assert response["ok"], response
+            results["client"] = time.perf_counter() - start
+        finally:
+            client.request({"op": "shutdown"}, socket_path)
+            daemon.wait(30)
+
+    baseline = results["per-process"]
+    for name, elapsed in results.items():
+        print(f"{name:<12} {elapsed * 1000 / args.files:>8.2f} ms/file  {baseline / elapsed:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+每个节点的渲染耗时：TypstRenderer / MarkdownRenderer 遍历 UDM，
+以及 UdmRenderer 由 token 流构建 UDM（按 token 计）。
+
+    python benchmarks/bench_dispatch.py --size-mb 1
+"""
+
+import argparse
+import time
+
+from bench_model_memory import count_nodes, make_text
+
+from marktypist.md_parser import MarkdownParser
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.typ_renderer import TypstRenderer
+
+
+def best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    markdown_parser = MarkdownParser()
+    tokens = markdown_parser.tokenize(make_text(args.size_mb))
+    num_tokens = len(tokens) + sum(len(t.children or ()) for t in tokens)
+    document = markdown_parser.build(tokens)
+    num_nodes = sum(count_nodes(document).values())
+
+    cases = [
+        ("UdmRenderer (per token)", num_tokens, lambda: markdown_parser.build(tokens)),
+        ("TypstRenderer", num_nodes, lambda: TypstRenderer().render(document)),
+        ("MarkdownRenderer", num_nodes, lambda: MarkdownRenderer().render(document)),
+    ]
+    print(f"{num_tokens:,} tokens, {num_nodes:,} nodes")
+    for name, count, func in cases:
+        elapsed = best_of(args.repeat, func)
+        print(f"{name:<24} {elapsed * 1e9 / count:>8.0f} ns/item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+编辑器场景：单字符编辑后增量重新转换 vs 整体重新转换的延迟。
+
+    python benchmarks/bench_incremental.py --lines 1000 10000 100000
+"""
+
+import argparse
+import statistics
+import time
+
+from marktypist.incremental import IncrementalDocument
+from marktypist.main import Converter
+
+SECTION = """# Section {i}
+
+Paragraph with **bold**, *italic* and `code`.
+It continues on a second line.
+
+- item one
+- item two
+
+```python
+print({i})
+```
+
+"""
+
+
+def make_text(lines: int) -> str:
+    sections = []
+    count = i = 0
+    while count < lines:
+        section = SECTION.format(i=i)
+        sections.append(section)
+        count += section.count("\n")
+        i += 1
+    return "".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--edits", type=int, default=50)
+    args = parser.parse_args()
+
+    converter = Converter()
+    print(f"{'lines':>8} {'full ms':>9} {'incremental ms':>15} {'speedup':>8}")
+    for lines in args.lines:
+        text = make_text(lines)
+        doc = IncrementalDocument(text, converter)
+
+        start = time.perf_counter()
+        converter.md_to_typ(doc.text)
+        full = time.perf_counter() - start
+
+        timings = []
+        for n in range(args.edits):
+            # 在文档中间的段落里插入一个字符
+            line = (len(doc.lines) // 2) // 12 * 12 + 2
+            start = time.perf_counter()
+            doc.edit(line, n, line, n, "x")
+            timings.append(time.perf_counter() - start)
+        incremental = statistics.median(timings)
+        print(f"{lines:>8} {full * 1000:>9.1f} {incremental * 1000:>15.3f} {full / incremental:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+大文件输入的峰值内存（RSS）：每种方式在单独的子进程中运行，报告子进程的 ru_maxrss。
+
+  输入层     read_text(...).splitlines()  与  reader.iter_source_lines()（mmap + 增量解码），
+             逐行遍历一个 --size 大小的 Typst 文件
+  完整转换   TypstParser.parse(read_text(...)) + render_to  与  Converter.convert_file，
+             Typst -> Markdown 文件到文件，文件大小为 --convert-size（UDM 本身比输入大得多）
+
+    python benchmarks/bench_input.py --size 500MB --convert-size 50MB
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import write_corpus
+from suite import format_size, parse_size
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PRELUDE = """
+import resource, sys
+from pathlib import Path
+path = Path(sys.argv[1])
+"""
+
+CASES = {
+    "read_text + splitlines": """
+count = 0
+for line in path.read_text(encoding="utf-8-sig").splitlines():
+    count += 1
+""",
+    "iter_source_lines": """
+from marktypist.reader import iter_source_lines
+count = 0
+for line in iter_source_lines(path):
+    count += 1
+""",
+    "convert (read_text)": """
+from marktypist.main import Converter
+converter = Converter()
+document = converter.typst_parser.parse(path.read_text(encoding="utf-8-sig"))
+with open(sys.argv[2], "w", encoding="utf-8") as target:
+    converter.markdown_renderer.render_to(document, target)
+""",
+    "convert_file (lines)": """
+from marktypist.main import Converter
+Converter().convert_file(path, Path(sys.argv[2]))
+""",
+}
+
+FOOTER = """
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run_case(code: str, path: Path, output: Path) -> tuple:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PRELUDE + code + FOOTER, str(path), str(output)],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    # Linux 上 ru_maxrss 的单位是 KB
+    return time.perf_counter() - start, int(result.stdout.split()[-1]) * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=parse_size, default=parse_size("500MB"))
+    parser.add_argument("--convert-size", type=parse_size, default=parse_size("50MB"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        output = tmp / "out.md"
+        for size, names in ((args.size, list(CASES)[:2]), (args.convert_size, list(CASES)[2:])):
+            source = tmp / f"input-{size}.typ"
+            write_corpus(source, size)
+            print(f"{format_size(size)} Typst input")
+            for name in names:
+                elapsed, peak = run_case(CASES[name], source, output)
+                print(f"  {name:<26} {elapsed:>7.2f} s   peak RSS {peak / 1024 / 1024:>8.1f} MB")
+            source.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+UDM 的内存占用：解析一个较大的 Markdown 文档，统计节点数量、
+解析过程中的峰值内存以及解析完成后文档树本身占用的内存（tracemalloc）。
+
+    python benchmarks/bench_model_memory.py --size-mb 2
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import fields, is_dataclass
+
+from bench_streaming import SECTION
+
+from marktypist.md_parser import MarkdownParser
+
+
+def make_text(size_mb: float) -> str:
+    target = int(size_mb * 1024 * 1024)
+    sections = []
+    size = i = 0
+    while size < target:
+        section = SECTION.format(i=i)
+        sections.append(section)
+        size += len(section)
+        i += 1
+    return "".join(sections)
+
+
+def count_nodes(document) -> Counter:
+    counts = Counter()
+    pending = [document]
+    while pending:
+        node = pending.pop()
+        counts[type(node).__name__] += 1
+        for f in fields(node):
+            value = getattr(node, f.name)
+            if is_dataclass(value):
+                pending.append(value)
+            elif isinstance(value, list):
+                pending.extend(item for item in value if is_dataclass(item))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=2)
+    args = parser.parse_args()
+
+    text = make_text(args.size_mb)
+    markdown_parser = MarkdownParser()
+    tokens = markdown_parser.tokenize(text)
+
+    start = time.perf_counter()
+    markdown_parser.build(tokens)
+    elapsed = time.perf_counter() - start
+
+    # 只测量由 token 流构建 UDM 的部分，token 本身在测量之前已经存在
+    gc.collect()
+    tracemalloc.start()
+    document = markdown_parser.build(tokens)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    counts = count_nodes(document)
+    total = sum(counts.values())
+    print(f"input {len(text) / 1024 / 1024:.1f} MB, build {elapsed:.2f} s")
+    print(f"nodes {total:,} ({', '.join(f'{name} {n:,}' for name, n in counts.most_common(4))}, ...)")
+    print(f"retained {retained / 1024 / 1024:.1f} MB ({retained / total:.0f} B/node), peak {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+深度嵌套文档的渲染耗时。渲染器使用显式栈遍历，不受递归上限限制；
+节点访问次数与深度成线性关系，每层的字符串拼接仍会复制一次内层结果。
+
+    python benchmarks/bench_nesting.py --depth 1000 10000 30000
+"""
+
+import argparse
+import sys
+import time
+
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.model import BlockQuote, Bold, Document, ListItem, Paragraph, Text, UnorderedList
+from marktypist.typ_renderer import TypstRenderer
+
+SHAPES = {
+    "bold": lambda node: Bold(content=[node]),
+    "blockquote": lambda node: BlockQuote(content=[node]),
+    "list": lambda node: UnorderedList(items=[ListItem(content=[node])]),
+}
+
+
+def build(shape: str, depth: int) -> Document:
+    node = Text(content="x") if shape == "bold" else Paragraph(content=[Text(content="x")])
+    for _ in range(depth):
+        node = SHAPES[shape](node)
+    return Document(content=[Paragraph(content=[node])] if shape == "bold" else [node])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, nargs="+", default=[1000, 10000, 30000])
+    args = parser.parse_args()
+
+    print(f"recursion limit {sys.getrecursionlimit()}")
+    print(f"{'shape':<11} {'depth':>7} {'typst ms':>9} {'markdown ms':>12}")
+    for shape in SHAPES:
+        for depth in args.depth:
+            document = build(shape, depth)
+            timings = []
+            for renderer in (TypstRenderer(), MarkdownRenderer()):
+                start = time.perf_counter()
+                renderer.render(document)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{shape:<11} {depth:>7} {timings[0]:>9.1f} {timings[1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
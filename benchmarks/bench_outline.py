@@ -0,0 +1,70 @@
+"""
+只提取大纲（标题、链接、图片）与完整转换的对比：在临时目录中生成一批 Markdown/Typst 文件，
+分别计时逐个完整转换（解析 + 构建 UDM + 渲染，不写文件）、逐个 Converter.outline_file，
+以及 iter_outline_tree 以 -j 个工作进程并行处理整个目录。
+
+    python benchmarks/bench_outline.py --files 200 --size 50KB --jobs 4
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import generate_markdown, generate_typst
+from suite import format_size, parse_size
+
+from marktypist.main import Converter
+from marktypist.outline import iter_outline_tree
+
+
+def make_tree(root: Path, count: int, size: int) -> None:
+    for i in range(count):
+        directory = root / f"section{i % 10}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if i % 4 == 3:
+            (directory / f"page{i}.typ").write_text(generate_typst(size, seed=i), encoding="utf-8")
+        else:
+            (directory / f"page{i}.md").write_text(generate_markdown(size, seed=i), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--size", type=parse_size, default=parse_size("50KB"), help="size of each file")
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    converter = Converter()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, args.files, args.size)
+        files = sorted(root.rglob("*.*"))
+        total = sum(path.stat().st_size for path in files)
+        print(f"{len(files)} files, {format_size(total)}")
+
+        start = time.perf_counter()
+        for path in files:
+            text = path.read_text(encoding="utf-8")
+            if path.suffix == ".md":
+                converter.md_to_typ(text)
+            else:
+                converter.typ_to_md(text)
+        full = time.perf_counter() - start
+        print(f"  {'full conversion':<22} {full:>7.2f} s")
+
+        start = time.perf_counter()
+        outlines = [converter.outline_file(path) for path in files]
+        serial = time.perf_counter() - start
+        print(f"  {'outline':<22} {serial:>7.2f} s  ({full / serial:.2f}x)")
+
+        start = time.perf_counter()
+        results = list(iter_outline_tree(str(root), args.jobs))
+        parallel = time.perf_counter() - start
+        same = [result.outline for result in results] == outlines
+        print(f"  {f'outline tree -j {args.jobs}':<22} {parallel:>7.2f} s  ({full / parallel:.2f}x, "
+              f"identical: {same})")
+
+
+if __name__ == "__main__":
+    main()
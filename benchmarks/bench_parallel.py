@@ -0,0 +1,48 @@
+"""
+单个大 Markdown 文档的文档内并行转换：顺序转换 vs parallel_md_to_typ 在不同进程数下的耗时与加速比。
+进程池在计时之前创建并预热，计时只包含切分、并行转换和拼接。
+
+    python benchmarks/bench_parallel.py --size 50MB --jobs 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from corpus import generate_markdown
+from suite import format_size, parse_size
+
+from marktypist.main import convert_md_to_typ
+from marktypist.parallel import parallel_md_to_typ
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=parse_size, default=parse_size("20MB"))
+    parser.add_argument("--jobs", type=int, nargs="+", default=None,
+                        help="process counts to try (default: 2, 4, ... up to the CPU count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    jobs_list = args.jobs or [2 ** k for k in range(1, cpus.bit_length())] + ([cpus] if cpus & (cpus - 1) else [])
+    text = generate_markdown(args.size)
+    print(f"{format_size(len(text.encode('utf-8')))} Markdown input, {cpus} CPUs")
+
+    start = time.perf_counter()
+    expected = convert_md_to_typ(text)
+    serial = time.perf_counter() - start
+    print(f"  {'serial':<10} {serial:>8.2f} s")
+
+    for jobs in jobs_list:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            parallel_md_to_typ("# warm up\n\ntext\n", jobs, chunk_size=1, executor=executor)
+            start = time.perf_counter()
+            result = parallel_md_to_typ(text, jobs, executor=executor)
+            elapsed = time.perf_counter() - start
+        identical = "identical" if result == expected else "DIFFERENT"
+        print(f"  {f'-j {jobs}':<10} {elapsed:>8.2f} s   speedup {serial / elapsed:>5.2f}x   {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+大量小文档的吞吐量：每个文档启动一次 marktypist convert（临时文件），
+与把所有文档经 stdin/stdout 交给一个长期运行的 marktypist pipe 子进程。
+
+    python benchmarks/bench_pipe.py --docs 5000 --size 2000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from corpus import generate_markdown
+
+from marktypist.pipe import encode_frame, read_frames
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def per_process(texts) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, text in enumerate(texts):
+            path = Path(tmp) / f"doc{i}.md"
+            path.write_text(text, encoding="utf-8")
+            paths.append(path)
+        start = time.perf_counter()
+        for path in paths:
+            subprocess.run([sys.executable, "-m", "marktypist.cli", "convert", str(path), "-o",
+                            str(path.with_suffix(".typ")), "--no-daemon"],
+                           check=True, capture_output=True, cwd=ROOT)
+        return time.perf_counter() - start
+
+
+def through_pipe(texts, framing: str, workers: int) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "marktypist.cli", "pipe", "--framing", framing,
+                                "-j", str(workers)], stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=ROOT)
+
+    def feed():
+        for i, text in enumerate(texts):
+            process.stdin.write(encode_frame({"id": i, "direction": "md->typ", "text": text}, framing))
+        process.stdin.close()
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    responses = sum(1 for frame in read_frames(process.stdout, framing) if json.loads(frame)["ok"])
+    writer.join()
+    process.wait()
+    assert responses == len(texts)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=2000, help="bytes per document")
+    parser.add_argument("--spawn-docs", type=int, default=20,
+                        help="documents for the process-per-document case (extrapolated)")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    texts = [generate_markdown(args.size, seed=i) for i in range(args.docs)]
+    print(f"{args.docs} documents of ~{args.size} bytes")
+
+    elapsed = per_process(texts[:args.spawn_docs])
+    per_doc = elapsed / args.spawn_docs
+    print(f"  {'process per document':<24} {per_doc * 1000:>8.2f} ms/doc  "
+          f"({per_doc * args.docs:.1f} s for all, extrapolated from {args.spawn_docs})")
+    for framing, workers in (("ndjson", 1), ("length", 1), ("length", args.workers)):
+        elapsed = through_pipe(texts, framing, workers)
+        name = f"pipe {framing} -j {workers}"
+        print(f"  {name:<24} {elapsed / args.docs * 1000:>8.2f} ms/doc  ({elapsed:.1f} s, "
+              f"{args.docs / elapsed:.0f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+一个 Markdown 源文件输出 Typst 和规范化的 Markdown 两份结果：每个输出单独转换（解析两次），
+与 Converter.convert_file_to_many（解析一次，两个渲染器共用同一个 UDM 文档；--jobs 时在 fork 出的进程中同时渲染）。
+
+    python benchmarks/bench_render_many.py --size 10MB --jobs 2
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import write_corpus
+from suite import format_size, parse_size
+
+from marktypist.main import Converter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=parse_size, default=parse_size("5MB"))
+    parser.add_argument("--jobs", type=int, default=2)
+    args = parser.parse_args()
+
+    converter = Converter()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "doc.md"
+        write_corpus(source, args.size)
+        targets = [tmp / "doc.typ", tmp / "normalized.md"]
+        print(f"{format_size(source.stat().st_size)} Markdown -> .typ + .md")
+
+        start = time.perf_counter()
+        markdown_text = source.read_text(encoding="utf-8")
+        targets[0].write_text(converter.md_to_typ(markdown_text), encoding="utf-8")
+        targets[1].write_text(converter.markdown_renderer.render(converter.markdown_parser.parse(markdown_text)),
+                              encoding="utf-8")
+        separate = time.perf_counter() - start
+        expected = [path.read_bytes() for path in targets]
+        print(f"  {'parse per output':<28} {separate:>7.2f} s")
+
+        for jobs in (1, args.jobs):
+            start = time.perf_counter()
+            converter.convert_file_to_many(source, targets, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            same = [path.read_bytes() for path in targets] == expected
+            print(f"  {f'parse once, render -j {jobs}':<28} {elapsed:>7.2f} s  ({separate / elapsed:.2f}x, "
+                  f"identical: {same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+渲染输出的方式：render() 返回字符串 vs render_to() 写入 StringIO / 文件。
+使用表格密集和列表密集的文档，统计耗时（多次运行取最小值）与 tracemalloc 峰值内存（不含已经构建好的 UDM）。
+
+    python benchmarks/bench_render_to.py --rows 20000
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from marktypist.md_parser import MarkdownParser
+from marktypist.typ_renderer import TypstRenderer
+
+
+def table_document(rows: int) -> str:
+    lines = ["| name | value | note |", "| :--- | ---: | --- |"]
+    lines += [f"| item {i} | {i * 3} | `code {i}` and **bold** |" for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+def list_document(rows: int) -> str:
+    lines = []
+    for i in range(rows):
+        lines.append(f"- item {i} with *emphasis*")
+        lines.append(f"  - nested {i} with [a link](https://example.com/{i})")
+        lines.append(f"    > quoted {i}")
+    return "\n".join(lines) + "\n"
+
+
+def measure(func, repeat=15):
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    renderer = TypstRenderer()
+    markdown_parser = MarkdownParser()
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "out.typ")
+
+        def to_file(document):
+            with open(output, "w", encoding="utf-8") as f:
+                renderer.render_to(document, f)
+
+        modes = [("render()", lambda document: renderer.render(document))]
+        if hasattr(renderer, "render_to"):
+            modes.append(("render_to(StringIO)", lambda document: renderer.render_to(document, io.StringIO())))
+            modes.append(("render_to(file)", to_file))
+
+        print(f"{'document':<8} {'mode':<20} {'seconds':>8} {'peak MB':>8}")
+        for name, make in (("tables", table_document), ("lists", list_document)):
+            document = markdown_parser.parse(make(args.rows))
+            for mode, func in modes:
+                elapsed, peak = measure(lambda: func(document))
+                print(f"{name:<8} {mode:<20} {elapsed:>8.3f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
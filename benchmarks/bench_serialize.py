@@ -0,0 +1,68 @@
+"""
+UDM 序列化：marktypist.serialize 的二进制格式（未压缩 / zlib）和 JSON，与 pickle 比较
+编码、解码的吞吐量（按 Markdown 源文本的 MB/s 计）和体积。
+
+另外给出两种不必构建整个 UDM 的读取方式：loads_arena（只复制数组并检查结构）和 loads_lazy（只解码第一个顶层块）。
+
+    python benchmarks/bench_serialize.py --size 20MB
+"""
+
+import argparse
+import gc
+import pickle
+import time
+
+from corpus import generate_markdown
+from suite import format_size, parse_size
+
+from marktypist import serialize
+from marktypist.md_parser import MarkdownParser
+
+
+def timed(function, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=parse_size, default=parse_size("10MB"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = generate_markdown(args.size)
+    megabytes = len(text.encode("utf-8")) / 1024 / 1024
+    document = MarkdownParser().parse(text)
+
+    formats = {
+        "pickle": (lambda: pickle.dumps(document, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        "binary": (lambda: serialize.dumps(document), serialize.loads),
+        "binary+zlib": (lambda: serialize.dumps(document, compress=True), serialize.loads),
+        "json": (lambda: serialize.dumps_json(document), serialize.loads_json),
+    }
+    print(f"{format_size(len(text.encode('utf-8')))} Markdown input")
+    print(f"{'format':<13} {'size':>10} {'encode s':>9} {'MB/s':>7} {'decode s':>9} {'MB/s':>7}  round trip")
+    encoded = {}
+    for name, (dumps, loads) in formats.items():
+        encode, data = timed(dumps, args.repeat)
+        decode, loaded = timed(lambda: loads(data), args.repeat)
+        encoded[name] = data
+        size = len(data) if isinstance(data, bytes) else len(data.encode("utf-8"))
+        print(f"{name:<13} {format_size(size):>10} {encode:>9.3f} {megabytes / encode:>7.1f} "
+              f"{decode:>9.3f} {megabytes / decode:>7.1f}  {loaded == document}")
+        del loaded
+
+    data = encoded["binary"]
+    arena_time, _ = timed(lambda: serialize.loads_arena(data), args.repeat)
+    lazy_time, _ = timed(lambda: serialize.loads_lazy(data)[0], args.repeat)
+    print(f"{'loads_arena':<13} {'':>10} {'':>9} {'':>7} {arena_time:>9.3f} {megabytes / arena_time:>7.0f}")
+    print(f"{'loads_lazy[0]':<13} {'':>10} {'':>9} {'':>7} {lazy_time:>9.3f} {megabytes / lazy_time:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+CLI 的冷启动时间：在新的解释器中运行 marktypist，测量总耗时，并用 ``python -X importtime``
+统计各个模块的导入耗时。
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 20 --top 15
+
+目标：转换一个很小的 .typ 文件时不导入 markdown-it（及 linkify），
+除解释器本身的启动之外的耗时不超过 --target-ms（默认 100 ms）；超出时以状态码 1 退出。
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_cli(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    """在新进程中运行 python -m marktypist.cli，返回 (耗时, stderr)。"""
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "marktypist.cli", *args]
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, env=env, check=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def best_wall_time(command: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """模块名 -> (自身耗时, 累计耗时)，单位微秒。只保留每个模块的第一次（真正的）导入。"""
+    modules: Dict[str, Tuple[int, int]] = {}
+    for match in IMPORTTIME_RE.finditer(stderr):
+        modules.setdefault(match.group(4), (int(match.group(1)), int(match.group(2))))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="show the slowest imports of the .typ conversion")
+    parser.add_argument("--target-ms", type=float, default=100.0,
+                        help="allowed cold start of the .typ conversion above a bare interpreter")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tiny_typ = Path(tmp) / "tiny.typ"
+        tiny_typ.write_text("= Title\n\nSome *bold* text.\n", encoding="utf-8")
+        tiny_md = Path(tmp) / "tiny.md"
+        tiny_md.write_text("# Title\n\nSome **bold** text.\n", encoding="utf-8")
+
+        interpreter = best_wall_time([sys.executable, "-c", "pass"], args.repeat)
+        print(f"{'python -c pass':<28} {interpreter * 1000:>8.1f} ms")
+
+        cases = [("--help", ["--help"]), ("convert tiny.typ", ["convert", str(tiny_typ)]),
+                 ("convert tiny.md", ["convert", str(tiny_md)])]
+        timings = {}
+        for name, cli_args in cases:
+            timings[name] = min(run_cli(cli_args)[0] for _ in range(args.repeat))
+            print(f"{'marktypist ' + name:<28} {timings[name] * 1000:>8.1f} ms "
+                  f"(+{(timings[name] - interpreter) * 1000:.1f} ms)")
+
+        _, stderr = run_cli(["convert", str(tiny_typ)], importtime=True)
+
+    modules = parse_importtime(stderr)
+    print(f"\nslowest imports of 'convert tiny.typ' (cumulative):")
+    for name, (_, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {name:<40} {cumulative / 1000:>8.1f} ms")
+
+    ok = True
+    heavy = sorted(name for name in modules if name.split(".")[0] in ("markdown_it", "linkify_it"))
+    if heavy:
+        print(f"\nFAIL: the .typ path imports {', '.join(heavy[:5])}")
+        ok = False
+    extra_ms = (timings["convert tiny.typ"] - interpreter) * 1000
+    if extra_ms > args.target_ms:
+        print(f"FAIL: .typ cold start +{extra_ms:.1f} ms exceeds the {args.target_ms:.0f} ms target")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+大文件 Markdown -> Typst：整体转换 vs 流式转换的峰值内存与耗时。
+
+耗时与峰值内存分两次测量：tracemalloc 会让转换慢一个数量级，
+所以耗时在不开启追踪时测量；峰值内存用 tracemalloc 统计（只计 Python 分配）。
+
+    python benchmarks/bench_streaming.py --size-mb 5
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from marktypist.main import Converter
+
+SECTION = """# Section {i}
+
+Paragraph with **bold**, *italic*, `code` and a [link](https://example.com/{i}).
+It continues on a second line.
+
+- item one
+- item two
+  - nested item
+
+> A quotation
+> spanning two lines.
+
+```python
+print({i})
+```
+
+| key | value |
+| --- | --- |
+| a | {i} |
+| b | `x` |
+
+"""
+
+
+def make_document(path: Path, size_mb: float) -> None:
+    target = int(size_mb * 1024 * 1024)
+    size = i = 0
+    with open(path, "w", encoding="utf-8") as f:
+        while size < target:
+            section = SECTION.format(i=i)
+            f.write(section)
+            size += len(section)
+            i += 1
+
+
+def measure(func, memory):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    if not memory:
+        return elapsed, float("nan")
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=5)
+    parser.add_argument("--no-memory", action="store_true", help="skip the (slow) tracemalloc pass")
+    args = parser.parse_args()
+
+    converter = Converter()
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "input.md"
+        make_document(source, args.size_mb)
+        size_mb = source.stat().st_size / 1024 / 1024
+
+        print(f"input {size_mb:.1f} MB")
+        print(f"{'mode':<10} {'seconds':>8} {'peak MB':>8} {'peak/input':>11}")
+        for mode, stream in (("in-memory", False), ("streaming", True)):
+            output = Path(tmp) / f"{mode}.typ"
+            elapsed, peak = measure(lambda: converter.convert_file(source, output, stream=stream), not args.no_memory)
+            print(f"{mode:<10} {elapsed:>8.2f} {peak:>8.1f} {peak / size_mb:>10.1f}x")
+
+        same = (Path(tmp) / "in-memory.typ").read_bytes() == (Path(tmp) / "streaming.typ").read_bytes()
+        print(f"byte-identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+大表格（默认 10 万行）的 Markdown -> Typst：markdown-it 自带的表格规则（每个单元格 th/td + inline 共 4 个 token，
+逐个内联解析）与 md_table 的表格快速路径（整个表格一个 token，纯文本单元格跳过内联解析）。
+
+两条路径的 UDM 相同，分别计时 tokenize、build（构建 UDM）和 render，并检查输出一致。
+
+    python benchmarks/bench_table.py --rows 100000
+"""
+
+import argparse
+import random
+import time
+
+from markdown_it import MarkdownIt
+
+from marktypist.md_parser import MarkdownParser
+from marktypist.typ_renderer import TypstRenderer
+
+
+def generate_table(rows: int, seed: int = 0) -> str:
+    """数据型表格：编号、名称、数值、状态四列，约 5% 的单元格带有行内代码、加粗或链接。"""
+    rng = random.Random(seed)
+    lines = ["| id | name | value | status |", "| ---: | :--- | ---: | :---: |"]
+    for i in range(rows):
+        name = f"item {rng.randrange(10 ** 6)}"
+        status = rng.choice(["active", "idle", "retired", "pending"])
+        roll = rng.random()
+        if roll < 0.02:
+            name = f"`{name}`"
+        elif roll < 0.04:
+            status = f"**{status}**"
+        elif roll < 0.05:
+            name = f"[{name}](https://example.com/{i})"
+        lines.append(f"| {i} | {name} | {rng.random() * 1000:.4f} | {status} |")
+    return "\n".join(lines) + "\n"
+
+
+def run(parser: MarkdownParser, text: str):
+    renderer = TypstRenderer()
+    start = time.perf_counter()
+    tokens = parser.tokenize(text)
+    tokenized = time.perf_counter()
+    document = parser.build(tokens)
+    built = time.perf_counter()
+    output = renderer.render(document)
+    rendered = time.perf_counter()
+    return (tokenized - start, built - tokenized, rendered - built), output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text = generate_table(args.rows)
+    stock = MarkdownParser()
+    stock.md = MarkdownIt("gfm-like")
+    fast = MarkdownParser()
+
+    print(f"{args.rows} rows, {len(text.encode('utf-8')) / 1024 / 1024:.1f} MB Markdown")
+    print(f"{'table rule':<12} {'tokenize s':>11} {'build s':>8} {'render s':>9} {'total s':>8}")
+    outputs = []
+    for name, markdown_parser in (("markdown-it", stock), ("fast path", fast)):
+        (tokenize, build, render), output = run(markdown_parser, text)
+        outputs.append(output)
+        total = tokenize + build + render
+        print(f"{name:<12} {tokenize:>11.2f} {build:>8.2f} {render:>9.2f} {total:>8.2f}")
+    # markdown-it 自带的规则不填写 Table.align，因此输出中没有 align 这一行
+    print(f"identical output apart from align: "
+          f"{outputs[0] == outputs[1].replace('  align: (right, left, right, center),' + chr(10), '')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+TypstParser 内联标记解析的吞吐量基准。
+
+生成若干 MB 的 Typst 文本（长段落中密集出现粗体/斜体/粗斜体），
+测量 TypstParser.parse 的耗时与 MB/s。
+
+    python benchmarks/bench_typst_inline.py --size-mb 4
+"""
+
+import argparse
+import time
+
+from marktypist.typ_parser import TypstParser
+
+LINE = (
+    "Plain words then *bold words* and _italic words_ and *_both at once_* "
+    "followed by a long tail of ordinary prose, *b* _i_ *x* _y_ to finish. "
+)
+
+
+def make_document(size_mb: float) -> str:
+    target = int(size_mb * 1024 * 1024)
+    parts = ["= Benchmark\n\n"]
+    size = 0
+    i = 0
+    while size < target:
+        # 每 20 行一个段落，每行重复若干次以得到长行
+        line = LINE * (1 + i % 8) + "\n"
+        if i % 20 == 19:
+            line += "\n"
+        parts.append(line)
+        size += len(line)
+        i += 1
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_document(args.size_mb)
+    size_mb = len(text.encode("utf-8")) / 1024 / 1024
+    typst_parser = TypstParser()
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        typst_parser.parse(text)
+        best = min(best, time.perf_counter() - start)
+    print(f"input {size_mb:.1f} MB: best {best:.3f}s, {size_mb / best:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
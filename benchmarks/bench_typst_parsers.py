@@ -0,0 +1,69 @@
+"""
+Typst 解析器吞吐量对比：按行正则的 TypstParser vs 基于 Lark LALR 语法的 LarkTypstParser。
+
+同时给出 Lark 解析器的构建耗时：不使用缓存时编译语法，以及从磁盘缓存加载。
+
+    python benchmarks/bench_typst_parsers.py --size-mb 2
+"""
+
+import argparse
+import time
+
+from marktypist.grammar import load_lalr_parser
+from marktypist.typ_lark_parser import LarkTypstParser, UdmTransformer, get_lark_parser
+from marktypist.typ_parser import TypstParser
+
+# 两个解析器都能处理的结构：标题、段落、无序列表、粗体/斜体
+SECTION = """= Section {i}
+
+Plain words then *bold words* and _italic words_ and *_both at once_*
+followed by a second line of ordinary prose.
+
+- first item with *bold*
+- second item with _italic_
+
+"""
+
+
+def make_document(size_mb: float) -> str:
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    size = i = 0
+    while size < target:
+        section = SECTION.format(i=i)
+        parts.append(section)
+        size += len(section)
+        i += 1
+    return "".join(parts)
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    compile_time = best_of(lambda: load_lalr_parser("typst.lark", transformer=UdmTransformer(), cache=False), 1)
+    get_lark_parser()  # 确保缓存文件存在
+    cached_time = best_of(lambda: load_lalr_parser("typst.lark", transformer=UdmTransformer()), args.repeat)
+    print(f"Lark parser construction: compile {compile_time * 1000:.1f} ms, from cache {cached_time * 1000:.1f} ms")
+
+    text = make_document(args.size_mb)
+    size_mb = len(text.encode("utf-8")) / 1024 / 1024
+    print(f"{'parser':<8} {'seconds':>8} {'MB/s':>7}")
+    for name, typst_parser in (("regex", TypstParser()), ("lark", LarkTypstParser())):
+        elapsed = best_of(lambda: typst_parser.parse(text), args.repeat)
+        print(f"{name:<8} {elapsed:>8.3f} {size_mb / elapsed:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+确定性的合成语料生成器：给定种子和目标大小，总是生成完全相同的 Markdown / Typst 文档。
+
+文档由随机选择的段落类型拼成：强调密集的正文、GFM 表格、嵌套列表、代码块、
+引用、链接与图片。生成是流式的（iter_*_sections），可以直接写出 100 MB 级别的文件。
+
+    from corpus import generate_markdown, write_corpus
+    text = generate_markdown(100 * 1024)
+    write_corpus(Path("big.md"), 100 * 1024 * 1024)
+"""
+
+import random
+from pathlib import Path
+from typing import Callable, Iterator
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud "
+    "exercitation ullamco laboris nisi aliquip ex ea commodo consequat duis aute irure "
+    "in reprehenderit voluptate velit esse cillum fugiat nulla pariatur excepteur sint "
+    "occaecat cupidatat non proident sunt culpa qui officia deserunt mollit anim id est"
+).split()
+
+LANGUAGES = ("python", "rust", "bash", "json", "")
+
+
+def _words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+# --- Markdown ---
+
+def _md_inline(rng: random.Random) -> str:
+    """一段强调密集的内联文本。"""
+    pieces = []
+    for _ in range(rng.randint(4, 10)):
+        kind = rng.random()
+        text = _words(rng, 1, 4)
+        if kind < 0.15:
+            pieces.append(f"**{text}**")
+        elif kind < 0.3:
+            pieces.append(f"*{text}*")
+        elif kind < 0.38:
+            pieces.append(f"***{text}***")
+        elif kind < 0.48:
+            pieces.append(f"`{rng.choice(WORDS)}_{rng.randint(0, 99)}`")
+        elif kind < 0.56:
+            pieces.append(f"[{text}](https://example.com/{rng.choice(WORDS)}/{rng.randint(0, 999)})")
+        elif kind < 0.58:
+            pieces.append(f"![{text}](images/{rng.choice(WORDS)}.png)")
+        else:
+            pieces.append(text)
+    return " ".join(pieces)
+
+
+def _md_paragraph(rng: random.Random) -> str:
+    return "\n".join(_md_inline(rng) for _ in range(rng.randint(1, 4)))
+
+
+def _md_list(rng: random.Random) -> str:
+    lines = []
+    ordered = rng.random() < 0.3
+    for i in range(rng.randint(2, 6)):
+        marker = f"{i + 1}." if ordered else "-"
+        lines.append(f"{marker} {_md_inline(rng)}")
+        for j in range(rng.randint(0, 3)):
+            lines.append(f"{' ' * len(marker)} - {_md_inline(rng)}")
+            if rng.random() < 0.3:
+                lines.append(f"{' ' * (len(marker) + 3)}- {_words(rng, 2, 6)}")
+    return "\n".join(lines)
+
+
+def _md_table(rng: random.Random) -> str:
+    columns = rng.randint(2, 5)
+    header = "| " + " | ".join(rng.choice(WORDS).title() for _ in range(columns)) + " |"
+    delimiter = "| " + " | ".join(rng.choice((":---", ":---:", "---:", "---")) for _ in range(columns)) + " |"
+    rows = []
+    for _ in range(rng.randint(2, 12)):
+        cells = []
+        for _ in range(columns):
+            kind = rng.random()
+            if kind < 0.6:
+                cells.append(_words(rng, 1, 3))
+            elif kind < 0.8:
+                cells.append(str(rng.randint(0, 10000)))
+            else:
+                cells.append(f"**{rng.choice(WORDS)}** `{rng.choice(WORDS)}`")
+        rows.append("| " + " | ".join(cells) + " |")
+    return "\n".join([header, delimiter, *rows])
+
+
+def _md_code(rng: random.Random) -> str:
+    body = "\n".join(f"{rng.choice(WORDS)}_{i} = {rng.randint(0, 999)}" for i in range(rng.randint(2, 12)))
+    return f"```{rng.choice(LANGUAGES)}\n{body}\n```"
+
+
+def _md_quote(rng: random.Random) -> str:
+    lines = [f"> {_md_inline(rng)}"]
+    if rng.random() < 0.4:
+        lines += [">", f"> > {_md_inline(rng)}"]
+    return "\n".join(lines)
+
+
+def _md_heading(rng: random.Random) -> str:
+    return f"{'#' * rng.randint(1, 4)} {_words(rng, 2, 6).title()}"
+
+
+MARKDOWN_BLOCKS = (
+    (_md_paragraph, 40), (_md_list, 15), (_md_table, 10),
+    (_md_code, 10), (_md_quote, 8), (_md_heading, 17),
+)
+
+
+# --- Typst ---
+
+def _typ_inline(rng: random.Random) -> str:
+    pieces = []
+    for _ in range(rng.randint(4, 10)):
+        kind = rng.random()
+        text = _words(rng, 1, 4)
+        if kind < 0.18:
+            pieces.append(f"*{text}*")
+        elif kind < 0.34:
+            pieces.append(f"_{text}_")
+        elif kind < 0.4:
+            pieces.append(f"*_{text}_*")
+        else:
+            pieces.append(text)
+    return " ".join(pieces)
+
+
+def _typ_paragraph(rng: random.Random) -> str:
+    return "\n".join(_typ_inline(rng) for _ in range(rng.randint(1, 4)))
+
+
+def _typ_list(rng: random.Random) -> str:
+    marker = rng.choice(("-", "+"))
+    return "\n".join(f"{marker} {_typ_inline(rng)}" for _ in range(rng.randint(2, 8)))
+
+
+def _typ_heading(rng: random.Random) -> str:
+    return f"{'=' * rng.randint(1, 4)} {_words(rng, 2, 6).title()}"
+
+
+TYPST_BLOCKS = ((_typ_paragraph, 55), (_typ_list, 25), (_typ_heading, 20))
+
+
+def _iter_sections(blocks, seed: int) -> Iterator[str]:
+    rng = random.Random(seed)
+    makers = [maker for maker, _ in blocks]
+    weights = [weight for _, weight in blocks]
+    while True:
+        yield rng.choices(makers, weights)[0](rng) + "\n\n"
+
+
+def iter_markdown_sections(seed: int = 0) -> Iterator[str]:
+    """无限地产出 Markdown 顶层块（每块以空行结尾）。"""
+    return _iter_sections(MARKDOWN_BLOCKS, seed)
+
+
+def iter_typst_sections(seed: int = 0) -> Iterator[str]:
+    """
+    无限地产出 Typst 顶层块。只使用 TypstParser 与 LarkTypstParser 都支持的标记
+    （标题、段落、强调、列表），两个解析器都能处理生成的文档。
+    """
+    return _iter_sections(TYPST_BLOCKS, seed)
+
+
+def _generate(sections: Iterator[str], size: int) -> Iterator[str]:
+    total = 0
+    for section in sections:
+        if total >= size:
+            return
+        yield section
+        total += len(section.encode("utf-8"))
+
+
+def generate_markdown(size: int, seed: int = 0) -> str:
+    """生成至少 size 字节的 Markdown 文档。"""
+    return "".join(_generate(iter_markdown_sections(seed), size))
+
+
+def generate_typst(size: int, seed: int = 0) -> str:
+    """生成至少 size 字节的 Typst 文档。"""
+    return "".join(_generate(iter_typst_sections(seed), size))
+
+
+def write_corpus(path: Path, size: int, seed: int = 0) -> None:
+    """按 path 的后缀（.md / .typ）流式写出至少 size 字节的文档，不在内存中保留整个文档。"""
+    sections: Callable[[int], Iterator[str]] = iter_typst_sections if path.suffix == ".typ" else iter_markdown_sections
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(_generate(sections(seed), size))
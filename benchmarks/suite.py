@@ -0,0 +1,217 @@
+"""
+基准测试套件：在确定性的合成语料（corpus.py）上分阶段计时，结果输出为 JSON，
+可以在不同提交之间比较并设置回归阈值。
+
+阶段：
+  md_parse         MarkdownParser.parse
+  typst_render     TypstRenderer.render（Markdown 语料的 UDM）
+  typst_parse      TypstParser.parse
+  markdown_render  MarkdownRenderer.render（Typst 语料的 UDM）
+  convert_md       Converter.convert_file，.md -> .typ 文件到文件
+  convert_typ      Converter.convert_file，.typ -> .md 文件到文件
+  convert_md_stream  Converter.convert_file(stream=True)，内存占用与大小无关
+
+前几个阶段需要把整个文档和 UDM 放在内存里；100MB 级别请只运行 convert_md_stream：
+
+    python benchmarks/suite.py run --sizes 1KB 100KB 1MB -o before.json
+    python benchmarks/suite.py run --sizes 100MB --stages convert_md_stream
+    python benchmarks/suite.py compare before.json after.json --threshold 0.1
+    python benchmarks/suite.py run -o after.json --baseline before.json   # 运行并立即比较
+
+compare（以及带 --baseline 的 run）在任何阶段的耗时（默认取最短耗时）变慢超过阈值时以状态码 1 退出，
+可以直接作为 CI 的回归门禁。
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from corpus import generate_markdown, generate_typst, write_corpus
+
+from marktypist import __version__
+from marktypist.main import Converter
+from marktypist.md_parser import MarkdownParser
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.typ_parser import TypstParser
+from marktypist.typ_renderer import TypstRenderer
+
+STAGES = (
+    "md_parse", "typst_render", "typst_parse", "markdown_render",
+    "convert_md", "convert_typ", "convert_md_stream",
+)
+DEFAULT_STAGES = STAGES[:-1]
+UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([KMG]?B)?", text.strip().upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+    return int(float(match.group(1)) * UNITS[match.group(2) or "B"])
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def time_repeated(func: Callable[[], object], min_time: float, min_runs: int, max_runs: int) -> List[float]:
+    """至少运行 min_runs 次，并持续运行直到累计 min_time 秒（最多 max_runs 次）。"""
+    timings: List[float] = []
+    while len(timings) < min_runs or (sum(timings) < min_time and len(timings) < max_runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def stage_functions(size: int, stages, workdir: Path, seed: int) -> Dict[str, Callable[[], object]]:
+    """为每个阶段准备输入（不计时），返回待计时的函数。"""
+    funcs: Dict[str, Callable[[], object]] = {}
+    converter = Converter()
+    markdown_parser = MarkdownParser()
+    typst_parser = TypstParser()
+
+    if {"md_parse", "typst_render"} & set(stages):
+        markdown_text = generate_markdown(size, seed)
+        funcs["md_parse"] = lambda: markdown_parser.parse(markdown_text)
+        markdown_document = markdown_parser.parse(markdown_text)
+        funcs["typst_render"] = lambda: TypstRenderer().render(markdown_document)
+    if {"typst_parse", "markdown_render"} & set(stages):
+        typst_text = generate_typst(size, seed)
+        funcs["typst_parse"] = lambda: typst_parser.parse(typst_text)
+        typst_document = typst_parser.parse(typst_text)
+        funcs["markdown_render"] = lambda: MarkdownRenderer().render(typst_document)
+
+    if {"convert_md", "convert_md_stream"} & set(stages):
+        md_source = workdir / f"corpus-{size}.md"
+        write_corpus(md_source, size, seed)
+        funcs["convert_md"] = lambda: converter.convert_file(md_source, workdir / "out.typ")
+        funcs["convert_md_stream"] = lambda: converter.convert_file(md_source, workdir / "out.typ", stream=True)
+    if "convert_typ" in stages:
+        typ_source = workdir / f"corpus-{size}.typ"
+        write_corpus(typ_source, size, seed)
+        funcs["convert_typ"] = lambda: converter.convert_file(typ_source, workdir / "out.md")
+
+    return {stage: funcs[stage] for stage in stages}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for stage, func in stage_functions(size, args.stages, Path(tmp), args.seed).items():
+                timings = time_repeated(func, args.min_time, args.min_runs, args.max_runs)
+                median = statistics.median(timings)
+                results.append({
+                    "stage": stage,
+                    "size": format_size(size),
+                    "bytes": size,
+                    "runs": len(timings),
+                    "min": min(timings),
+                    "median": median,
+                    "mb_per_s": size / median / UNITS["MB"],
+                })
+                print(f"{stage:<18} {format_size(size):>7} {median * 1000:>10.2f} ms "
+                      f"{size / median / UNITS['MB']:>8.2f} MB/s  ({len(timings)} runs)", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, metric: str = "min") -> bool:
+    """
+    打印两次运行的对比，有回归（metric 指定的耗时增加超过 threshold）时返回 False。
+    默认比较最短耗时：它受机器上其他负载的影响最小，比中位数更稳定。
+    """
+    base = {(r["stage"], r["size"]): r for r in baseline["results"]}
+    ok = True
+    print(f"baseline {baseline['meta'].get('commit')}  current {current['meta'].get('commit')}  "
+          f"threshold {threshold:.0%} ({metric})")
+    print(f"{'stage':<18} {'size':>7} {'baseline ms':>12} {'current ms':>11} {'change':>8}")
+    for result in current["results"]:
+        key = (result["stage"], result["size"])
+        if key not in base:
+            continue
+        before, after = base[key][metric], result[metric]
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{key[0]:<18} {key[1]:>7} {before * 1000:>12.2f} {after * 1000:>11.2f} {change:>+8.1%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and emit JSON")
+    run_parser.add_argument("--sizes", type=parse_size, nargs="+", default=[parse_size(s) for s in ("1KB", "100KB", "1MB")])
+    run_parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(DEFAULT_STAGES))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--min-time", type=float, default=1.0, help="minimum total seconds per stage")
+    run_parser.add_argument("--min-runs", type=int, default=3)
+    run_parser.add_argument("--max-runs", type=int, default=1000)
+    run_parser.add_argument("-o", "--output", type=Path, help="write JSON results here (default: stdout)")
+    run_parser.add_argument("--baseline", type=Path, help="compare against this JSON file after running")
+    run_parser.add_argument("--threshold", type=float, default=0.10)
+    run_parser.add_argument("--metric", choices=("min", "median"), default="min")
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON result files")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed slowdown, e.g. 0.1 for 10%%")
+    compare_parser.add_argument("--metric", choices=("min", "median"), default="min")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        current = json.loads(args.current.read_text(encoding="utf-8"))
+        sys.exit(0 if compare(baseline, current, args.threshold, args.metric) else 1)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        sys.exit(0 if compare(baseline, report, args.threshold, args.metric) else 1)
+
+
+if __name__ == "__main__":
+    main()
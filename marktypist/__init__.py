@@ -0,0 +1,27 @@
+# marktypist/__init__.py
+
+
+def _read_version() -> str:
+    """已安装的包的版本；直接在源码目录中运行（没有安装）时取 pyproject.toml 中的版本。"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("marktypist")
+    except PackageNotFoundError:
+        import re
+        from pathlib import Path
+
+        try:
+            pyproject = (Path(__file__).resolve().parent.parent / "pyproject.toml").read_text(encoding="utf-8")
+        except OSError:
+            return "0+unknown"
+        match = re.search(r'^version\s*=\s*"([^"]+)"', pyproject, re.MULTILINE)
+        return match.group(1) if match else "0+unknown"
+
+
+def __getattr__(name: str):
+    # __version__ 在第一次访问时才读取：importlib.metadata 的导入需要几十毫秒，CLI 的大多数调用用不到版本号
+    if name == "__version__":
+        value = globals()["__version__"] = _read_version()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
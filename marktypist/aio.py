@@ -0,0 +1,218 @@
+# marktypist/aio.py
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple, TypeVar, Union
+
+from .batch import BatchResult
+from .main import converter_for, output_path_for
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 默认同时在执行器中进行的转换数
+DEFAULT_CONCURRENCY = 8
+
+
+def _convert_text(text: str, suffix: str, typst_parser: str) -> str:
+    """在执行器（线程或工作进程）中运行的转换，必须是模块级函数才能交给进程池。"""
+    return converter_for(typst_parser).convert_text(text, suffix)
+
+
+def _read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8-sig")
+
+
+def _write_text(path: Path, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as target:
+        target.write(text)
+
+
+async def _aiter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class AsyncConverter:
+    """
+    asyncio 版本的转换接口：转换在执行器中运行，不阻塞事件循环。
+
+        async with AsyncConverter("process", max_workers=4) as converter:
+            typst = await converter.convert_text(markdown, ".md", timeout=5)
+
+    * executor："thread"（默认）、"process" 或一个现成的 Executor。
+      转换是 CPU 密集的：线程池只是让事件循环保持响应，进程池才能真正并行；
+      使用进程池时文本需要在进程间复制。
+    * max_concurrency：同时交给执行器的转换数上限，超出的请求在信号量上等待（背压）；
+    * timeout：每个文档的超时秒数，超时抛出 asyncio.TimeoutError。
+
+    取消或超时后，尚未开始的转换不会再执行；已经在执行器中运行的转换无法中断，
+    它占用的并发名额在它真正结束后才会释放，执行器的负载因此始终不超过 max_concurrency。
+
+    文件的读写在事件循环的默认线程池中进行，转换本身在 executor 中进行。
+    """
+    def __init__(self, executor: Union[str, Executor] = "thread", max_workers: Optional[int] = None,
+                 max_concurrency: int = DEFAULT_CONCURRENCY, timeout: Optional[float] = None,
+                 typst_parser: str = "regex"):
+        if executor == "thread":
+            self.executor: Executor = ThreadPoolExecutor(max_workers)
+        elif executor == "process":
+            self.executor = ProcessPoolExecutor(max_workers)
+        elif isinstance(executor, Executor):
+            self.executor = executor
+        else:
+            raise ValueError(f"Unknown executor: {executor!r}")
+        self._owns_executor = not isinstance(executor, Executor)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.typst_parser = typst_parser
+        self.in_flight = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    async def __aenter__(self) -> "AsyncConverter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self) -> None:
+        """关闭自己创建的执行器（等待正在运行的转换结束）。"""
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # 信号量属于创建它时的事件循环
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(self, timeout: Optional[float], func: Callable[..., R], *args) -> R:
+        """在 executor 中运行 func(*args)，受并发上限与超时约束。"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        self.in_flight += 1
+
+        def release(_):
+            # 转换真正结束（或在开始前被取消）时才释放名额
+            def done():
+                self.in_flight -= 1
+                semaphore.release()
+            try:
+                loop.call_soon_threadsafe(done)
+            except RuntimeError:
+                pass  # 事件循环已经关闭
+
+        future.add_done_callback(release)
+        timeout = self.timeout if timeout is None else timeout
+        # 取消 wrap_future 得到的 asyncio Future 也会取消尚未开始的 concurrent Future
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    async def convert_text(self, text: str, suffix: str, timeout: Optional[float] = None) -> str:
+        """按源格式后缀（".md" 或 ".typ"）转换文本。"""
+        return await self._run(timeout, _convert_text, text, suffix.lower(), self.typst_parser)
+
+    async def md_to_typ(self, markdown_text: str, timeout: Optional[float] = None) -> str:
+        return await self.convert_text(markdown_text, ".md", timeout)
+
+    async def typ_to_md(self, typst_text: str, timeout: Optional[float] = None) -> str:
+        return await self.convert_text(typst_text, ".typ", timeout)
+
+    async def convert_file(self, input_path: Path, output_path: Optional[Path] = None,
+                           timeout: Optional[float] = None) -> Optional[str]:
+        """
+        转换一个文件。与 Converter.convert_file 相同：给出 output_path 时写入文件并返回 None，
+        否则返回转换结果。timeout 只约束转换本身，不包括读写文件。
+        """
+        loop = asyncio.get_running_loop()
+        input_path = Path(input_path)
+        source_text = await loop.run_in_executor(None, _read_text, input_path)
+        converted_text = await self.convert_text(source_text, input_path.suffix, timeout)
+        if output_path is None:
+            return converted_text
+        await loop.run_in_executor(None, _write_text, Path(output_path), converted_text)
+        return None
+
+    async def _bounded_map(self, items: Union[Iterable[T], AsyncIterable[T]],
+                           func: Callable[[T], Awaitable[R]]) -> AsyncIterator[R]:
+        """按输入顺序产出 func(item) 的结果，最多预先启动 max_concurrency 个，输入按需读取。"""
+        pending = deque()
+        try:
+            async for item in _aiter(items):
+                if len(pending) >= self.max_concurrency:
+                    yield await pending.popleft()
+                pending.append(asyncio.ensure_future(func(item)))
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # 调用方提前停止迭代或出错时取消剩余的转换
+            for task in pending:
+                if task.done() and not task.cancelled():
+                    task.exception()  # 已经失败的转换：取走异常，避免 asyncio 报告未处理的异常
+                task.cancel()
+
+    def iter_convert_texts(self, texts: Union[Iterable[str], AsyncIterable[str]], suffix: str,
+                           timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """按顺序产出每个文本的转换结果；任何一个转换失败时抛出异常并取消其余的转换。"""
+        return self._bounded_map(texts, lambda text: self.convert_text(text, suffix, timeout))
+
+    def iter_convert_files(self, tasks: Union[Iterable[Tuple[Path, Optional[Path]]],
+                                              AsyncIterable[Tuple[Path, Optional[Path]]]],
+                           timeout: Optional[float] = None) -> AsyncIterator[BatchResult]:
+        """
+        按顺序转换 (输入路径, 输出路径) 并产出 BatchResult。输出路径为 None 时按后缀推断
+        （与输入文件同目录）。单个文件失败（包括超时）记录在 BatchResult.error 中，不中断迭代。
+        """
+        async def convert_one(task) -> BatchResult:
+            source, output = Path(task[0]), task[1]
+            output = Path(output) if output else output_path_for(source)
+            try:
+                await self.convert_file(source, output, timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                return BatchResult(source, output, "TimeoutError: conversion timed out")
+            except Exception as e:
+                return BatchResult(source, output, f"{type(e).__name__}: {e}")
+            return BatchResult(source, output)
+
+        return self._bounded_map(tasks, convert_one)
+
+
+# 模块级函数共享的默认 AsyncConverter（线程池），第一次使用时创建
+_default_async_converter: Optional[AsyncConverter] = None
+
+def get_default_async_converter() -> AsyncConverter:
+    global _default_async_converter
+    if _default_async_converter is None:
+        _default_async_converter = AsyncConverter()
+    return _default_async_converter
+
+async def aconvert_md_to_typ(markdown_text: str, timeout: Optional[float] = None) -> str:
+    return await get_default_async_converter().md_to_typ(markdown_text, timeout)
+
+async def aconvert_typ_to_md(typst_text: str, timeout: Optional[float] = None) -> str:
+    return await get_default_async_converter().typ_to_md(typst_text, timeout)
+
+async def aconvert_file(input_path: Path, output_path: Optional[Path] = None,
+                        timeout: Optional[float] = None) -> Optional[str]:
+    return await get_default_async_converter().convert_file(input_path, output_path, timeout)
+
+def aiter_convert_texts(texts, suffix: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+    return get_default_async_converter().iter_convert_texts(texts, suffix, timeout)
+
+def aiter_convert_files(tasks, timeout: Optional[float] = None) -> AsyncIterator[BatchResult]:
+    return get_default_async_converter().iter_convert_files(tasks, timeout)
@@ -0,0 +1,505 @@
+# marktypist/arena.py
+
+from array import array
+from typing import TYPE_CHECKING, Iterator, List, Sequence, TextIO
+
+from .model import (
+    Document, Text, Bold, Italic, Code, Link, Image, Heading, Paragraph, UnorderedList, OrderedList,
+    ListItem, CodeBlock, BlockQuote, Table, TableRow, TableCell
+)
+from .streaming import StripJoiner
+from .typ_renderer import escape_string
+from .visitor import Dispatcher
+
+if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
+    from markdown_it.token import Token
+
+# 节点种类，存放在 NodeArena.kind 中
+(DOCUMENT, PARAGRAPH, HEADING, UNORDERED_LIST, ORDERED_LIST, LIST_ITEM, CODE_BLOCK, BLOCK_QUOTE,
+ TABLE, TABLE_ROW, TABLE_CELL, TEXT, BOLD, ITALIC, CODE, LINK, IMAGE) = range(17)
+
+# TABLE 节点的文本是用它连接的各列对齐方式，value 是对齐方式的个数
+ALIGN_SEPARATOR = "\x1f"
+
+# render_to 每积累这么多个输出片段写出一次
+FLUSH_FRAGMENTS = 4096
+
+
+class NodeArena:
+    """
+    扁平的、基于数组的文档树，与 UDM 表达相同的内容，但不为每个节点创建对象。
+
+    节点按文档顺序（先序）编号，0 是 Document。每个节点在几个平行数组中各占一项：
+
+    * kind：节点种类（DOCUMENT、PARAGRAPH……）；
+    * parent：父节点编号（根节点为 -1）；
+    * end：子树之后的第一个编号，即 [i + 1, end[i]) 是 i 的全部后代，end[i] 是下一个兄弟节点；
+    * value：标题级别、有序列表的起始编号；CodeBlock 和 Image 中第一个字符串的长度；Table 的对齐方式个数；
+    * start / stop：节点文本在 text 中的范围。Text、Code 是内容，Link 是 url，
+      CodeBlock 是语言 + 代码，Image 是 src + alt，Table 是各列的对齐方式（以 ALIGN_SEPARATOR 连接）。
+      文本按节点顺序存放，start[i] 总是等于 stop[i - 1]。
+
+    所有文本连续存放在一个字符串 text 中。每个节点约 30 字节，没有 Python 对象的头部和列表。
+    """
+    def __init__(self):
+        self.kind = array("B")
+        self.parent = array("i")
+        self.end = array("i")
+        self.value = array("i")
+        self.start = array("q")
+        self.stop = array("q")
+        self.text = ""
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def children(self, node: int) -> Iterator[int]:
+        end = self.end
+        child = node + 1
+        stop = end[node]
+        while child < stop:
+            yield child
+            child = end[child]
+
+    def text_of(self, node: int) -> str:
+        return self.text[self.start[node]:self.stop[node]]
+
+    def nbytes(self) -> int:
+        """数组和文本占用的字节数（近似值）。"""
+        arrays = (self.kind, self.parent, self.end, self.value, self.start, self.stop)
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.text.encode("utf-8"))
+
+    def to_document(self) -> Document:
+        """转换为 UDM 对象树（主要用于测试，以及把 arena 交给基于 UDM 的代码）。"""
+        return self.to_node(0)
+
+    def to_node(self, node: int):
+        """把以 node 为根的子树转换为 UDM 节点。按编号顺序一次扫描，不递归，与嵌套深度无关。"""
+        kinds, end, value, text, start, stop = self.kind, self.end, self.value, self.text, self.start, self.stop
+        root = None
+        # 尚未结束的容器：(子树结束的编号, 种类, UDM 节点)
+        open_nodes: list = []
+        for i in range(node, end[node]):
+            while open_nodes and open_nodes[-1][0] <= i:
+                open_nodes.pop()
+            kind = kinds[i]
+            if kind == TEXT:
+                item = Text(text[start[i]:stop[i]])
+            elif kind == CODE:
+                item = Code(text[start[i]:stop[i]])
+            elif kind == IMAGE or kind == CODE_BLOCK:
+                both, split = text[start[i]:stop[i]], value[i]
+                item = (Image if kind == IMAGE else CodeBlock)(both[:split], both[split:])
+            elif kind == TABLE:
+                item = Table(header=None, align=text[start[i]:stop[i]].split(ALIGN_SEPARATOR) if value[i] else [],
+                             rows=[])
+            elif kind == TABLE_ROW:
+                item = TableRow(cells=[])
+            elif kind == HEADING:
+                item = Heading(level=value[i], content=[])
+            elif kind == ORDERED_LIST:
+                item = OrderedList(start=value[i], items=[])
+            elif kind == UNORDERED_LIST:
+                item = UnorderedList(items=[])
+            elif kind == LINK:
+                item = Link(url=text[start[i]:stop[i]], content=[])
+            else:
+                item = _CONTAINERS[kind](content=[])
+
+            if not open_nodes:
+                root = item
+            else:
+                _, parent_kind, parent = open_nodes[-1]
+                if parent_kind == TABLE:
+                    # 第一行是表头
+                    if parent.header is None:
+                        parent.header = item
+                    else:
+                        parent.rows.append(item)
+                elif parent_kind == TABLE_ROW:
+                    parent.cells.append(item)
+                elif parent_kind == UNORDERED_LIST or parent_kind == ORDERED_LIST:
+                    parent.items.append(item)
+                else:
+                    parent.content.append(item)
+            if end[i] > i + 1:
+                open_nodes.append((end[i], kind, item))
+        return root
+
+    @classmethod
+    def from_document(cls, document) -> "NodeArena":
+        """由 UDM 树（通常是 Document，也可以是任意节点）构建 NodeArena，节点与 UDM 一一对应，不合并文本。"""
+        arena = cls()
+        kinds, parents, end, values, starts, stops = (arena.kind, arena.parent, arena.end, arena.value,
+                                                      arena.start, arena.stop)
+        pieces: List[str] = []
+        offset = 0
+        # 栈中是 (UDM 节点, 父节点编号)；子树结束时由 (None, 编号) 填写 end
+        stack: list = [(document, -1)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            item, parent = pop()
+            if item is None:
+                end[parent] = len(kinds)
+                continue
+            node = len(kinds)
+            kind = _KINDS[type(item)]
+            text, number, children = "", 0, None
+            if kind == TEXT or kind == CODE:
+                text = item.content
+            elif kind == IMAGE:
+                text, number = item.src + item.alt, len(item.src)
+            elif kind == CODE_BLOCK:
+                text, number = item.language + item.content, len(item.language)
+            elif kind == TABLE:
+                text, number, children = ALIGN_SEPARATOR.join(item.align), len(item.align), [item.header] + item.rows
+            elif kind == TABLE_ROW:
+                children = item.cells
+            elif kind == UNORDERED_LIST or kind == ORDERED_LIST:
+                children = item.items
+                number = item.start if kind == ORDERED_LIST else 0
+            else:
+                children = item.content
+                if kind == HEADING:
+                    number = item.level
+                elif kind == LINK:
+                    text = item.url
+            kinds.append(kind)
+            parents.append(parent)
+            end.append(node + 1)
+            values.append(number)
+            starts.append(offset)
+            if text:
+                pieces.append(text)
+                offset += len(text)
+            stops.append(offset)
+            if children:
+                push((None, node))
+                stack.extend((child, node) for child in reversed(children))
+        arena.text = "".join(pieces)
+        return arena
+
+
+_CONTAINERS = {
+    DOCUMENT: Document, PARAGRAPH: Paragraph, LIST_ITEM: ListItem, BLOCK_QUOTE: BlockQuote,
+    TABLE_CELL: TableCell, BOLD: Bold, ITALIC: Italic,
+}
+
+_KINDS = {
+    Document: DOCUMENT, Paragraph: PARAGRAPH, Heading: HEADING, UnorderedList: UNORDERED_LIST,
+    OrderedList: ORDERED_LIST, ListItem: LIST_ITEM, CodeBlock: CODE_BLOCK, BlockQuote: BLOCK_QUOTE,
+    Table: TABLE, TableRow: TABLE_ROW, TableCell: TABLE_CELL, Text: TEXT, Bold: BOLD, Italic: ITALIC,
+    Code: CODE, Link: LINK, Image: IMAGE,
+}
+
+
+class ArenaBuilder(Dispatcher):
+    """
+    由 token 流构建 NodeArena，与 md_parser.UdmRenderer 逐个 token 对应
+    （同样的 token 被忽略，相邻的文本同样合并为一个 Text 节点）。
+    token 可以分批 feed()，每批处理完即可丢弃。
+    """
+    default_handler = "render_default"
+
+    def __init__(self):
+        self.arena = NodeArena()
+        self._pieces: List[str] = []
+        self._offset = 0
+        self._open: List[int] = []
+        self._push(DOCUMENT)
+
+    @classmethod
+    def handler_names(cls, token_type: str) -> Iterator[str]:
+        yield token_type
+
+    def feed(self, tokens: Sequence["Token"]) -> None:
+        dispatch = self._dispatch
+        for token in tokens:
+            handler = dispatch.get(token.type) or self.handler_for(token.type)
+            handler(self, token)
+
+    def finish(self) -> NodeArena:
+        arena = self.arena
+        while self._open:
+            self._close()
+        arena.text = "".join(self._pieces)
+        self._pieces = []
+        return arena
+
+    def render_default(self, token: "Token"):
+        pass
+
+    def _add(self, kind: int, text: str = "", value: int = 0) -> int:
+        """添加一个节点（还没有闭合），返回它的编号。"""
+        arena = self.arena
+        node = len(arena.kind)
+        arena.kind.append(kind)
+        arena.parent.append(self._open[-1] if self._open else -1)
+        arena.end.append(node + 1)
+        arena.value.append(value)
+        arena.start.append(self._offset)
+        if text:
+            self._pieces.append(text)
+            self._offset += len(text)
+        arena.stop.append(self._offset)
+        return node
+
+    def _push(self, kind: int, text: str = "", value: int = 0) -> None:
+        self._open.append(self._add(kind, text, value))
+
+    def _close(self, token: "Token" = None) -> None:
+        node = self._open.pop()
+        self.arena.end[node] = len(self.arena.kind)
+
+    # --- 块级元素 ---
+    def heading_open(self, token): self._push(HEADING, value=int(token.tag[1]))
+    heading_close = _close
+
+    def paragraph_open(self, token): self._push(PARAGRAPH)
+    paragraph_close = _close
+
+    def bullet_list_open(self, token): self._push(UNORDERED_LIST)
+    bullet_list_close = _close
+
+    def ordered_list_open(self, token): self._push(ORDERED_LIST, value=int(token.meta.get("start", 1)))
+    ordered_list_close = _close
+
+    def list_item_open(self, token): self._push(LIST_ITEM)
+    list_item_close = _close
+
+    def blockquote_open(self, token): self._push(BLOCK_QUOTE)
+    blockquote_close = _close
+
+    def fence(self, token):
+        language = token.info.split()[0] if token.info.strip() else ""
+        self._add(CODE_BLOCK, language + token.content.strip(), len(language))
+
+    # --- 表格：第一行是表头 ---
+    def table(self, token):
+        # md_table.table_rule 产出的整个表格，参见 UdmRenderer.table
+        meta = token.meta
+        self._push(TABLE, ALIGN_SEPARATOR.join(meta["align"]), len(meta["align"]))
+        for row in zip(*meta["columns"]):
+            self._push(TABLE_ROW)
+            for cell in row:
+                self._push(TABLE_CELL)
+                if type(cell) is not str:
+                    self.inline(cell)
+                elif cell:
+                    self._add(TEXT, cell)
+                self._close()
+            self._close()
+        self._close()
+
+    def table_open(self, token): self._push(TABLE)
+    table_close = _close
+
+    def tr_open(self, token): self._push(TABLE_ROW)
+    tr_close = _close
+
+    def th_open(self, token): self._push(TABLE_CELL)
+    th_close = _close
+    td_open = th_open
+    td_close = _close
+
+    # --- 内联元素 ---
+    def inline(self, token):
+        self.feed(token.children)
+
+    def text(self, token):
+        arena = self.arena
+        last = len(arena.kind) - 1
+        content = token.content
+        if arena.kind[last] == TEXT and arena.parent[last] == self._open[-1]:
+            # 相邻的文本合并：上一个 Text 是最后添加的节点，它的文本也在缓冲区的末尾
+            if content:
+                self._pieces.append(content)
+                self._offset += len(content)
+                arena.stop[last] = self._offset
+        else:
+            self._add(TEXT, content)
+
+    def strong_open(self, token): self._push(BOLD)
+    strong_close = _close
+
+    def em_open(self, token): self._push(ITALIC)
+    em_close = _close
+
+    def code_inline(self, token): self._add(CODE, token.content)
+
+    def link_open(self, token): self._push(LINK, token.attrs["href"])
+    link_close = _close
+
+    def image(self, token):
+        src = token.attrs["src"]
+        self._add(IMAGE, src + token.content, len(src))
+
+
+def parse_arena(md: "MarkdownIt", markdown_text: str) -> NodeArena:
+    """
+    解析 Markdown，直接得到 NodeArena。
+
+    markdown-it 的块级阶段先处理整个文档（因此链接引用定义与普通解析一样对整个文档生效），
+    之后的内联解析、linkify 等规则按顶层块逐个运行：每个顶层块的内联 token 构建进 arena 后立即丢弃，
+    内存中不会同时存在整个文档的内联 token 和 UDM 对象树。
+    """
+    from markdown_it.rules_core import StateCore
+
+    state = StateCore(markdown_text, md, {})
+    names = md.core.ruler.get_active_rules()
+    rules = md.core.ruler.getRules("")
+    split = names.index("block") + 1
+    for rule in rules[:split]:
+        rule(state)
+    tokens, state.tokens = state.tokens, []
+
+    builder = ArenaBuilder()
+    start = 0
+    for index, token in enumerate(tokens):
+        # 顶层块在 level 回到 0 的闭合 token（或者 level 0 的自闭合 token）处结束
+        if token.level or token.nesting == 1:
+            continue
+        block = tokens[start:index + 1]
+        tokens[start:index + 1] = [None] * (index + 1 - start)
+        state.tokens = block
+        for rule in rules[split:]:
+            rule(state)
+        builder.feed(block)
+        start = index + 1
+    return builder.finish()
+
+
+class ArenaTypstRenderer:
+    """
+    直接遍历 NodeArena 输出 Typst，结果与 TypstRenderer 渲染等价的 UDM 逐字节相同。
+    不创建节点对象，也不经过访问者的分发；遍历使用显式栈，与嵌套深度无关。
+    """
+    def render(self, arena: NodeArena) -> str:
+        parts: List[str] = []
+        self._render_into(arena, parts, None)
+        return "".join(parts).strip()
+
+    def render_to(self, arena: NodeArena, stream: TextIO) -> None:
+        """把结果写入文本流，与 render(arena) 相同；输出按批写出。"""
+        stripper = StripJoiner("")
+        parts: List[str] = []
+
+        def flush():
+            out = stripper.feed("".join(parts))
+            parts.clear()
+            if out:
+                stream.write(out)
+
+        self._render_into(arena, parts, flush)
+        flush()
+
+    def _render_into(self, arena: NodeArena, parts: List[str], flush) -> None:
+        kinds, end, value, start, stop, text = arena.kind, arena.end, arena.value, arena.start, arena.stop, arena.text
+        write = parts.append
+        # 栈中是待输出的字符串和待展开的节点编号，按逆序压入
+        stack: list = [0]
+        pop, push = stack.pop, stack.append
+
+        def children(node):
+            child, last = node + 1, end[node]
+            while child < last:
+                yield child
+                child = end[child]
+
+        def push_joined(nodes, separator):
+            items = []
+            for node in nodes:
+                if items:
+                    items.append(separator)
+                items.append(node)
+            stack.extend(reversed(items))
+
+        while stack:
+            item = pop()
+            if type(item) is str:
+                write(item)
+                if flush is not None and len(parts) >= FLUSH_FRAGMENTS:
+                    flush()
+                continue
+            kind = kinds[item]
+            if kind == TEXT:
+                write(text[start[item]:stop[item]])
+            elif kind in (PARAGRAPH, TABLE_CELL):
+                stack.extend(reversed(list(children(item))))
+            elif kind == BOLD or kind == ITALIC:
+                mark = "*" if kind == BOLD else "_"
+                push(mark)
+                stack.extend(reversed(list(children(item))))
+                write(mark)
+            elif kind == CODE:
+                write("`" + text[start[item]:stop[item]] + "`")
+            elif kind == LINK:
+                push("]")
+                stack.extend(reversed(list(children(item))))
+                write('#link("' + text[start[item]:stop[item]] + '")[')
+            elif kind == IMAGE:
+                src_alt, split = text[start[item]:stop[item]], value[item]
+                alt_text = src_alt[split:].replace('"', '\\"')
+                write(f'#image("{src_alt[:split]}", alt: "{alt_text}")')
+            elif kind == DOCUMENT:
+                push_joined(children(item), "\n\n")
+            elif kind == HEADING:
+                stack.extend(reversed(list(children(item))))
+                write("=" * value[item] + " ")
+            elif kind == UNORDERED_LIST or kind == ORDERED_LIST:
+                marker = "- " if kind == UNORDERED_LIST else "+ "
+                push_joined(children(item), "\n" + marker)
+                write(marker)
+            elif kind == LIST_ITEM:
+                first = item + 1
+                if first < end[item] and kinds[first] == PARAGRAPH:
+                    # 以段落开头的列表项只输出这个段落的内容
+                    stack.extend(reversed(list(children(first))))
+                else:
+                    push_joined(children(item), "\n  ")
+            elif kind == CODE_BLOCK:
+                code, split = text[start[item]:stop[item]], value[item]
+                write(f"```{code[:split]}\n{code[split:]}\n```")
+            elif kind == BLOCK_QUOTE:
+                push("]")
+                push_joined(children(item), "\n\n")
+                write("#quote[")
+            elif kind == TABLE:
+                self._push_table(arena, item, stack, write)
+
+    @staticmethod
+    def _push_table(arena: NodeArena, node: int, stack: list, write) -> None:
+        kinds, end, value, text, start, stop = arena.kind, arena.end, arena.value, arena.text, arena.start, arena.stop
+        rows = list(arena.children(node))
+        header = list(arena.children(rows[0]))
+        if not header:
+            return
+        num_columns = len(header)
+        items: list = [f"#table(\n  columns: ({', '.join(['auto'] * num_columns)}),\n"]
+        aligns = text[start[node]:stop[node]].split(ALIGN_SEPARATOR) if value[node] else []
+        if any(align and align != "auto" for align in aligns):
+            items.append(f"  align: ({', '.join(align or 'auto' for align in aligns)}),\n")
+        items.append("  ")
+        for index, cell in enumerate(header):
+            items.append(", [*" if index else "[*")
+            items.append(cell)
+            items.append("*]")
+        items.append(",\n")
+        for row in rows[1:]:
+            items.append("  ")
+            cells = list(arena.children(row))
+            for index, cell in enumerate(cells):
+                if index:
+                    items.append(", ")
+                child = cell + 1
+                if end[cell] == cell + 2 and kinds[child] == TEXT:
+                    # 纯文本单元格输出为字符串字面量
+                    items.append('"' + escape_string(text[start[child]:stop[child]]) + '"')
+                else:
+                    items.append(cell)
+            for index in range(len(cells), num_columns):
+                items.append(', ""' if index else '""')
+            items.append(",\n")
+        items.append(")")
+        stack.extend(reversed(items))
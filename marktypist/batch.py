@@ -0,0 +1,178 @@
+# marktypist/batch.py
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .cache import ConversionCache
+from .main import OUTPUT_SUFFIXES, convert_file, output_path_for
+
+GLOB_CHARS = set("*?[")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BatchResult:
+    """单个文件的批量转换结果。error 为 None 表示转换成功。"""
+    source: Path
+    output: Path
+    error: Optional[str] = None
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _glob_base(pattern: str) -> Path:
+    """返回 glob 模式中不含通配符的最长前缀目录，用作镜像输出的根。"""
+    parts = []
+    for part in Path(pattern).parts:
+        if GLOB_CHARS & set(part):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path(".")
+
+
+def collect_sources(source: str, output_root: Optional[Path] = None) -> Tuple[Path, List[Path]]:
+    """
+    收集需要转换的文件。source 可以是一个目录（递归查找 .md/.typ）或一个 glob 模式。
+    返回 (基准目录, 文件列表)，位于 output_root 之下的文件会被排除，避免重复运行时
+    把上一次的输出当成输入。
+    """
+    if GLOB_CHARS & set(source):
+        base = _glob_base(source)
+        candidates = (Path(p) for p in glob.iglob(source, recursive=True))
+    else:
+        base = Path(source)
+        if not base.is_dir():
+            raise ValueError(f"Not a directory or glob pattern: {source}")
+        candidates = (p for p in base.rglob("*"))
+
+    base = base.resolve()
+    output_root = output_root.resolve() if output_root else None
+    files = []
+    for path in candidates:
+        if path.suffix.lower() not in OUTPUT_SUFFIXES or not path.is_file():
+            continue
+        path = path.resolve()
+        if output_root and (path == output_root or output_root in path.parents):
+            continue
+        files.append(path)
+    files.sort()
+    return base, files
+
+
+# 每个工作进程各自持有一个缓存对象，按 (目录, 大小上限) 复用
+_worker_caches = {}
+
+
+def worker_cache(cache_config: Optional[Tuple[Path, int]]) -> Optional[ConversionCache]:
+    """按 (目录, 大小上限) 取得当前进程中的 ConversionCache，供工作进程（包括常驻服务的）复用。"""
+    if cache_config is None:
+        return None
+    cache = _worker_caches.get(cache_config)
+    if cache is None:
+        cache = _worker_caches[cache_config] = ConversionCache(*cache_config)
+    return cache
+
+
+def convert_one(task: Tuple[Path, Path], cache: Optional[ConversionCache] = None) -> BatchResult:
+    """转换单个文件，把异常记录为字符串而不是抛出。"""
+    source, output = task
+    hits = cache.stats.hits if cache else 0
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        convert_file(source, output, cache=cache)
+    except Exception as e:
+        return BatchResult(source, output, f"{type(e).__name__}: {e}")
+    return BatchResult(source, output, cached=bool(cache and cache.stats.hits > hits))
+
+
+def _convert_one_in_worker(task: Tuple[Path, Path, Optional[Tuple[Path, int]]]) -> BatchResult:
+    """工作进程入口。"""
+    source, output, cache_config = task
+    return convert_one((source, output), worker_cache(cache_config))
+
+
+def _call_each(function: Callable[[T], R], items: List[T]) -> List[R]:
+    return [function(item) for item in items]
+
+
+def map_in_workers(function: Callable[[T], R], items: Sequence[T], jobs: int,
+                   failed: Callable[[T, str], R]) -> Iterator[R]:
+    """
+    在 jobs 个工作进程中对每个项目调用 function，像 executor.map 一样按顺序产出结果。
+
+    某个工作进程异常退出（段错误、被 OOM 杀死、os._exit）会让整个进程池失效，所有未完成的项目一起失败。
+    这时换新的进程池重试这些项目：第一次重试仍然并行；之后只剩下与崩溃同时运行的少数项目，
+    用一个工作进程逐个运行，第一个未完成的项目就是导致崩溃的那个，它的结果由 failed(项目, 错误) 给出。
+    其余项目照常得到结果，运行不会中断。
+    """
+    results: Dict[int, R] = {}
+    pending = list(range(len(items)))
+    next_index = 0
+    # 每个任务都很小，按块分发可以显著降低进程间通信的开销；重试时逐个分发
+    chunksize = max(1, len(items) // (jobs * 4))
+    retries = 0
+    while pending:
+        sequential = retries >= 2
+        chunks = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
+        retry: List[int] = []
+        crashed = False
+        with ProcessPoolExecutor(max_workers=1 if sequential else jobs) as executor:
+            futures = [executor.submit(_call_each, function, [items[i] for i in chunk]) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results.update(zip(chunk, future.result()))
+                except BrokenProcessPool as e:
+                    if sequential and not crashed:
+                        results[chunk[0]] = failed(items[chunk[0]], f"{type(e).__name__}: {e}")
+                    else:
+                        retry.extend(chunk)
+                    crashed = True
+                while next_index in results:
+                    yield results.pop(next_index)
+                    next_index += 1
+        pending = retry
+        chunksize = 1
+        retries += 1
+
+
+def iter_convert_tree(source: str, output_root: Path, jobs: Optional[int] = None,
+                      cache: Optional[ConversionCache] = None) -> Iterator[BatchResult]:
+    """
+    将 source（目录或 glob）下的所有 .md/.typ 文件转换到 output_root，
+    并保持相对目录结构。按输入顺序逐个产出 BatchResult；
+    单个文件失败不会中断整个运行。
+
+    jobs 为工作进程数，默认使用 CPU 核数；jobs=1 时在当前进程中顺序执行。
+    给出 cache 时，工作进程各自打开同一目录下的 ConversionCache，
+    命中与否记录在 BatchResult.cached 中。
+    """
+    output_root = Path(output_root)
+    base, files = collect_sources(source, output_root)
+    tasks = [(path, output_root / output_path_for(path.relative_to(base))) for path in files]
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield convert_one(task, cache)
+        return
+
+    cache_config = (cache.directory, cache.max_bytes) if cache else None
+    worker_tasks = [(source_path, output, cache_config) for source_path, output in tasks]
+    yield from map_in_workers(_convert_one_in_worker, worker_tasks, jobs,
+                              lambda task, error: BatchResult(task[0], task[1], error))
+
+
+def convert_tree(source: str, output_root: Path, jobs: Optional[int] = None,
+                 cache: Optional[ConversionCache] = None) -> List[BatchResult]:
+    """iter_convert_tree 的列表版本。"""
+    return list(iter_convert_tree(source, output_root, jobs, cache))
@@ -0,0 +1,155 @@
+# marktypist/cache.py
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+# hashlib、shutil 与 tempfile 在第一次使用缓存时才导入：CLI 为了选项默认值导入本模块，
+# 没有启用缓存的调用不必为它们付出启动时间
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 超出上限时淘汰到上限的这个比例，避免每次写入都触发一次淘汰
+EVICT_TARGET_RATIO = 0.9
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} hit(s), {self.misses} miss(es), {self.evictions} eviction(s)"
+
+
+class ConversionCache:
+    """
+    基于内容寻址的磁盘转换缓存。
+
+    键是 (marktypist 版本, 转换方向, 转换选项, 输入字节) 的 SHA-256，
+    值是转换结果的 UTF-8 字节，存放在 <directory>/<键前两位>/<键> 中。
+    命中时更新文件的 mtime，总大小超过 max_bytes 时按 mtime 从旧到新淘汰 (LRU)。
+    写入先落到临时文件再原子地 os.replace，多个进程可以共享同一个缓存目录。
+    """
+    def __init__(self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._size: Optional[int] = None  # 缓存总大小，第一次写入时扫描得到
+
+    # --- 键 ---
+    def _hasher(self, direction: str, options: str):
+        import hashlib
+        from . import __version__  # 读取包的元数据，同样在第一次使用缓存时才进行
+        hasher = hashlib.sha256()
+        for part in ("marktypist", __version__, direction, options):
+            hasher.update(part.encode("utf-8") + b"\0")
+        return hasher
+
+    def key_for_bytes(self, data: bytes, direction: str, options: str = "") -> str:
+        hasher = self._hasher(direction, options)
+        hasher.update(data)
+        return hasher.hexdigest()
+
+    def key_for_file(self, path: Path, direction: str, options: str = "") -> str:
+        """分块读取文件计算键，不会把整个文件读入内存。"""
+        hasher = self._hasher(direction, options)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    # --- 读取 ---
+    def lookup(self, key: str) -> Optional[Path]:
+        """命中时返回缓存文件路径并记为最近使用，未命中返回 None。"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            # 刚好被其他进程淘汰
+            return None
+
+    # --- 写入 ---
+    def put(self, key: str, data: bytes) -> None:
+        self._store(key, lambda f: f.write(data))
+
+    def put_file(self, key: str, source: Path) -> None:
+        """把一个已经写好的输出文件复制进缓存。"""
+        import shutil
+
+        def copy(f):
+            with open(source, "rb") as src:
+                shutil.copyfileobj(src, f)
+        self._store(key, copy)
+
+    def _store(self, key: str, write) -> None:
+        path = self._path(key)
+        import tempfile
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        if self._size is None:
+            self._size = self.total_size()
+        else:
+            self._size += path.stat().st_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    # --- 淘汰 ---
+    def _entries(self):
+        for sub in self.directory.iterdir() if self.directory.is_dir() else ():
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub):
+                if entry.is_file() and not entry.name.startswith(".tmp-"):
+                    yield entry
+
+    def total_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self) -> None:
+        """按最近使用时间从旧到新删除条目，直到总大小降到上限的 90% 以下。"""
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()]
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            self.stats.evictions += 1
+        self._size = size
+
+    def clear(self) -> None:
+        for entry in list(self._entries()):
+            os.unlink(entry.path)
+        self._size = 0
@@ -1,6 +1,56 @@
 import click
+import sys
+from contextlib import nullcontext
 from pathlib import Path
-from .main import convert_file
+from .main import converter_for
+from .cache import DEFAULT_MAX_BYTES, ConversionCache
+
+def cache_options(func):
+    """convert 与 convert-tree 共用的缓存选项。"""
+    func = click.option(
+        '--cache-max-mb',
+        type=click.IntRange(min=1),
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        show_default=True,
+        help="Size limit of the conversion cache; least recently used entries are evicted."
+    )(func)
+    func = click.option(
+        '--no-cache',
+        is_flag=True,
+        help="Ignore the conversion cache even if a cache directory is configured."
+    )(func)
+    func = click.option(
+        '--cache-dir',
+        type=click.Path(file_okay=False),
+        envvar='MARKTYPIST_CACHE_DIR',
+        help="Reuse conversion results stored in this directory (env: MARKTYPIST_CACHE_DIR)."
+    )(func)
+    return func
+
+def convert_via_daemon(input_path, output_path, typst_parser, stream, cache):
+    """
+    请求常驻服务转换文件；服务没有运行、或者不回应 ping（服务卡住）时返回 None，由调用方在本进程中转换。
+    缓存命中情况计入 cache.stats。
+    """
+    from .client import convert
+
+    message = {"input": str(input_path), "typst_parser": typst_parser, "stream": stream}
+    if output_path:
+        message["output"] = str(output_path)
+    if cache:
+        message["cache"] = [str(cache.directory.resolve()), cache.max_bytes]
+    response = convert(message)
+    if response is not None and response["ok"] and cache:
+        if response["cached"]:
+            cache.stats.hits += 1
+        else:
+            cache.stats.misses += 1
+    return response
+
+def open_cache(cache_dir, no_cache, cache_max_mb):
+    if no_cache or not cache_dir:
+        return None
+    return ConversionCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024)
 
 @click.group()
 def cli():
@@ -14,20 +64,68 @@ def cli():
 )
 @click.option(
     '-o', '--output', 
-    'output_file', # 在函数中参数名为 output_file
+    'output_files', # 在函数中参数名为 output_files
     type=click.Path(dir_okay=False, resolve_path=True), 
-    help="Output file path. If omitted, prints to standard output."
+    multiple=True,
+    help="Output file path. If omitted, prints to standard output. Repeat to parse once and write several "
+         "formats, chosen by extension (e.g. -o out.typ -o normalized.md)."
 )
 @click.option(
     '-t', '--to', 
     type=click.Choice(['md', 'typst'], case_sensitive=False), 
     help="Target format. If omitted, it's inferred from the output file extension."
 )
-def convert(input_file, output_file, to):
+@click.option(
+    '--typst-parser',
+    type=click.Choice(['regex', 'lark'], case_sensitive=False),
+    default='regex',
+    show_default=True,
+    help="Parser for Typst input: the line-based regex parser or the full Lark grammar."
+)
+@click.option(
+    '--stream',
+    is_flag=True,
+    help="Convert Markdown input block by block with bounded memory, for very large files."
+)
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help="Split a large Markdown file at top-level blocks and convert the pieces in this many processes. "
+         "With several -o targets, render the targets in up to this many processes instead."
+)
+@click.option(
+    '--profile',
+    is_flag=True,
+    help="Report wall time and token/node counts per conversion stage on stderr."
+)
+@click.option(
+    '--profile-memory',
+    is_flag=True,
+    help="With --profile, also report peak memory per stage (slows the conversion down)."
+)
+@click.option(
+    '--profile-dir',
+    type=click.Path(file_okay=False, path_type=Path),
+    help="With --profile, save a cProfile .pstats file for the conversion in this directory."
+)
+@click.option(
+    '--no-daemon',
+    is_flag=True,
+    help="Always convert in this process, even if 'marktypist serve' is running."
+)
+@cache_options
+def convert(input_file, output_files, to, typst_parser, stream, jobs, cache_dir, no_cache, cache_max_mb,
+            profile, profile_memory, profile_dir, no_daemon):
     """Converts a file from Markdown to Typst or vice versa."""
     
     input_path = Path(input_file)
-    output_path = Path(output_file) if output_file else None
+    output_paths = [Path(output_file) for output_file in output_files]
+    output_path = output_paths[0] if len(output_paths) == 1 else None
+    # 多个输出：解析一次，按后缀交给各自的渲染器（不经过常驻服务和转换缓存）
+    many = len(output_paths) > 1
+    if many and stream:
+        raise click.UsageError("--stream cannot be combined with several -o targets.")
 
     # TODO: 实现更复杂的格式推断逻辑
     # if not to:
@@ -36,22 +134,262 @@ def convert(input_file, output_file, to):
     #     else:
     #         # ...
 
+    cache = None if many else open_cache(cache_dir, no_cache, cache_max_mb)
+
+    # --profile-memory / --profile-dir 都隐含 --profile
+    profiler = None
+    if profile or profile_memory or profile_dir:
+        from .profiling import Profiler
+        profiler = Profiler(callback=lambda run: click.echo(str(run), err=True),
+                            memory=profile_memory, pstats_dir=profile_dir)
+
     click.echo(f"Converting {input_path.name}...")
 
     try:
-        # 如果有输出路径，直接调用 convert_file 进行文件到文件的转换
-        if output_path:
-            convert_file(input_path, output_path)
-            click.secho(f"Conversion successful! Output written to {output_path.name}", fg="green")
+        # 有常驻服务 (marktypist serve) 时交给它转换，省去导入和构建解析器的时间；
+        # 性能统计和 --jobs 的进程池都需要在本进程中进行
+        response = None
+        if not (no_daemon or profiler or jobs or many):
+            response = convert_via_daemon(input_path, output_path, typst_parser, stream, cache)
+        if many:
+            with profiler or nullcontext():
+                converter_for(typst_parser).convert_file_to_many(input_path, output_paths, jobs=jobs)
+        elif response is not None:
+            if not response["ok"]:
+                raise RuntimeError(response["error"])
+            result_string = response.get("text")
+        else:
+            converter = converter_for(typst_parser)
+            with profiler or nullcontext():
+                # 如果有输出路径，直接调用 convert_file 进行文件到文件的转换
+                if output_path:
+                    converter.convert_file(input_path, output_path, stream=stream, cache=cache, jobs=jobs)
+                else:
+                    # 如果没有输出路径，调用 convert_file 获取字符串并打印
+                    result_string = converter.convert_file(input_path, None, stream=stream, cache=cache,
+                                                           jobs=jobs)
+        if output_paths:
+            names = ", ".join(path.name for path in output_paths)
+            click.secho(f"Conversion successful! Output written to {names}", fg="green")
         else:
-            # 如果没有输出路径，调用 convert_file 获取字符串并打印
-            result_string = convert_file(input_path, None)
             click.echo(result_string)
 
     except Exception as e:
         click.secho(f"An error occurred: {e}", fg="red", err=True)
         raise click.Abort()
 
+    if cache:
+        click.echo(f"Cache: {cache.stats}", err=True)
+
+
+@cli.command()
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Unix socket to listen on. Defaults to $MARKTYPIST_SOCKET or marktypist.sock "
+         "in $XDG_RUNTIME_DIR (or the temp directory)."
+)
+@click.option(
+    '-j', '--workers',
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of conversion worker processes. Defaults to the number of CPUs."
+)
+def serve(socket_path, workers):
+    """Runs a resident conversion server that 'marktypist convert' uses automatically."""
+    from .protocol import default_socket_path
+    from .server import run_server
+
+    socket_path = socket_path or default_socket_path()
+    click.echo(f"Serving on {socket_path} (Ctrl+C to stop)", err=True)
+    try:
+        run_server(socket_path, workers)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.option(
+    '--framing',
+    type=click.Choice(['ndjson', 'length'], case_sensitive=False),
+    default='ndjson',
+    show_default=True,
+    help="Message framing on stdin/stdout: one JSON object per line, or a 4-byte big-endian "
+         "length followed by the JSON."
+)
+@click.option(
+    '-j', '--workers',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of conversion worker processes; 1 converts in this process."
+)
+@click.option(
+    '--unordered',
+    is_flag=True,
+    help="Write each response as soon as it is ready instead of in request order (match them by id)."
+)
+def pipe(framing, workers, unordered):
+    """Converts framed requests from stdin and writes framed responses to stdout.
+
+    Each request is a JSON object such as {"id": 1, "direction": "md->typ", "text": "# Title"};
+    see marktypist/protocol.py for the full message format.
+    """
+    from .pipe import run_pipe
+
+    run_pipe(sys.stdin.buffer, sys.stdout.buffer, framing.lower(), workers, ordered=not unordered)
+
+
+@cli.command('convert-tree')
+@click.argument('source')
+@click.option(
+    '-O', '--output-dir',
+    'output_dir',
+    required=True,
+    type=click.Path(file_okay=False, resolve_path=True),
+    help="Root directory for converted files. The source tree layout is mirrored below it."
+)
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes. Defaults to the number of CPUs."
+)
+@cache_options
+def convert_tree(source, output_dir, jobs, cache_dir, no_cache, cache_max_mb):
+    """Converts every .md/.typ file under SOURCE (a directory or a glob pattern)."""
+
+    from .batch import iter_convert_tree
+
+    output_root = Path(output_dir)
+    cache = open_cache(cache_dir, no_cache, cache_max_mb)
+    converted = failed = hits = 0
+
+    try:
+        for result in iter_convert_tree(source, output_root, jobs, cache):
+            if result.ok:
+                converted += 1
+                hits += result.cached
+            else:
+                failed += 1
+                click.secho(f"Failed: {result.source}: {result.error}", fg="red", err=True)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'SOURCE'")
+
+    click.secho(
+        f"Converted {converted} file(s), {failed} failed. Output written to {output_root}",
+        fg="red" if failed else "green"
+    )
+    if cache:
+        click.echo(f"Cache: {hits} hit(s), {converted + failed - hits} miss(es)")
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument('source')
+@click.option(
+    '--json', 'as_json',
+    is_flag=True,
+    help="Print one JSON object per file (source, headings, links, images)."
+)
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes when SOURCE is a directory or glob. Defaults to the number of CPUs."
+)
+def outline(source, as_json, jobs):
+    """Lists headings, link targets and image sources of SOURCE (a file, a directory or a glob pattern) without converting."""
+    import json
+    from .outline import OutlineResult, iter_outline_tree
+
+    if Path(source).is_file():
+        path = Path(source)
+        try:
+            results = [OutlineResult(path, converter_for("regex").outline_file(path))]
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="'SOURCE'")
+    else:
+        results = iter_outline_tree(source, jobs)
+
+    failed = 0
+    try:
+        for result in results:
+            if not result.ok:
+                failed += 1
+                click.secho(f"Failed: {result.source}: {result.error}", fg="red", err=True)
+            elif as_json:
+                click.echo(json.dumps({"source": str(result.source), **result.outline.to_dict()}, ensure_ascii=False))
+            else:
+                click.echo(str(result.source))
+                for heading in result.outline.headings:
+                    click.echo(f"  {'  ' * (heading.level - 1)}{heading.text} (line {heading.line})")
+                for url in result.outline.links:
+                    click.echo(f"  link: {url}")
+                for src in result.outline.images:
+                    click.echo(f"  image: {src}")
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'SOURCE'")
+    if failed:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument('source')
+@click.option(
+    '-O', '--output-dir',
+    'output_dir',
+    required=True,
+    type=click.Path(file_okay=False, resolve_path=True),
+    help="Root directory for converted files. The source tree layout is mirrored below it."
+)
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes. Defaults to the number of CPUs."
+)
+@click.option(
+    '--interval',
+    type=click.FloatRange(min=0.01),
+    default=0.5,
+    show_default=True,
+    help="Seconds between scans of the source tree."
+)
+@click.option(
+    '--debounce',
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Wait until a file has not changed for this many seconds before converting it."
+)
+def watch(source, output_dir, jobs, interval, debounce):
+    """Watches SOURCE (a directory or a glob pattern) and reconverts files when their content changes."""
+    import time
+    from .watch import TreeWatcher
+
+    watcher = TreeWatcher(source, Path(output_dir), jobs, debounce)
+
+    def report(event):
+        stamp = time.strftime("%H:%M:%S")
+        if event.kind == "deleted":
+            click.echo(f"[{stamp}] Deleted {event.output}")
+        elif event.kind == "failed":
+            click.secho(f"[{stamp}] Failed: {event.source}: {event.error}", fg="red", err=True)
+        else:
+            latency = f" ({event.latency * 1000:.0f} ms after save)" if event.latency is not None else ""
+            click.echo(f"[{stamp}] Converted {event.source} -> {event.output}{latency}")
+
+    click.echo(f"Watching {source} (Ctrl+C to stop)...")
+    try:
+        watcher.run(report, interval)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'SOURCE'")
+    except KeyboardInterrupt:
+        pass
+
 
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -0,0 +1,94 @@
+# marktypist/client.py
+
+import os
+import socket
+import stat
+from pathlib import Path
+from typing import Optional
+
+from .protocol import PROTOCOL_VERSION, code_fingerprint, decode_message, default_socket_path, encode_message
+
+# 连接常驻服务的超时：服务不可用时应当尽快回退到进程内转换
+CONNECT_TIMEOUT = 0.5
+# 等待服务回应 ping 的超时：服务接受连接却不回应（卡住）时回退到进程内转换
+PING_TIMEOUT = 2.0
+
+
+def is_trusted_socket(path: Path) -> bool:
+    """
+    path 是否是本用户的、其他用户无法连接的套接字。服务会按请求读写任意路径，
+    因此不把请求发给其他用户创建的套接字（例如预先放在 /tmp 下的同名文件）。
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return (stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+            and not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+
+def _connect(socket_path: Optional[Path]) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = Path(socket_path) if socket_path else default_socket_path()
+    if not is_trusted_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: dict, socket_path: Optional[Path] = None, timeout: Optional[float] = None) -> Optional[dict]:
+    """
+    把一个请求发送给 marktypist serve 并返回响应；服务没有运行、连接中断或者超时时返回 None，
+    调用方应当回退到进程内转换。timeout 是等待响应的秒数，None 表示一直等待。
+    """
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile("rb") as stream:
+            sock.settimeout(timeout)
+            sock.sendall(encode_message(message))
+            line = stream.readline()
+    except OSError:
+        return None
+    return decode_message(line) if line else None
+
+
+def convert(message: dict, socket_path: Optional[Path] = None) -> Optional[dict]:
+    """
+    请求服务转换并等待结果。先在同一个连接上 ping：服务没有运行、PING_TIMEOUT 秒内不回应，
+    或者协议版本、源码指纹与本进程不同（升级之后仍在运行的旧服务）时返回 None。
+    ping 成功之后不再设超时——大文件的转换可能需要很久，超时后回退会让本进程和服务重复转换、
+    同时写同一个输出文件；连接中断（服务退出）时返回 None。
+    """
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile("rb") as stream:
+            sock.settimeout(PING_TIMEOUT)
+            sock.sendall(encode_message({"op": "ping"}))
+            line = stream.readline()
+            if not line:
+                return None
+            status = decode_message(line)
+            if status.get("version") != PROTOCOL_VERSION or status.get("code") != code_fingerprint():
+                return None
+            sock.settimeout(None)
+            sock.sendall(encode_message(message))
+            line = stream.readline()
+    except OSError:
+        return None
+    return decode_message(line) if line else None
+
+
+def ping(socket_path: Optional[Path] = None) -> Optional[dict]:
+    """服务的状态（协议版本、工作进程数、已处理的请求数），服务没有运行或者不回应时返回 None。"""
+    return request({"op": "ping"}, socket_path, timeout=PING_TIMEOUT)
@@ -0,0 +1,17 @@
+# marktypist/grammar/__init__.py
+
+from lark import Lark
+
+
+def load_lalr_parser(grammar_name: str, **options) -> Lark:
+    """
+    从本包加载 .lark 语法并构建 LALR 解析器。
+
+    编译好的解析表会被 Lark 序列化到临时目录下的缓存文件中
+    (以语法内容和选项的哈希命名)，之后的进程直接从磁盘加载，不再重新编译语法。
+    调用方应当只调用一次并复用返回的实例。
+    """
+    options.setdefault("parser", "lalr")
+    options.setdefault("lexer", "contextual")
+    options.setdefault("cache", True)
+    return Lark.open_from_package(__name__, grammar_name, **options)
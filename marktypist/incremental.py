@@ -0,0 +1,124 @@
+# marktypist/incremental.py
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from markdown_it.token import Token
+
+from .streaming import NEWLINES_RE
+
+
+@dataclass
+class RenderedBlock:
+    """一个顶层块：源码行范围 [start, end) 及其 Typst 渲染结果（没有对应 UDM 节点时为 None）。"""
+    start: int
+    end: int
+    typst: Optional[str]
+
+
+@dataclass
+class BlockPatch:
+    """一次编辑对块列表的修改：从 index 开始删除 removed 个块，插入 inserted。"""
+    index: int
+    removed: int
+    inserted: List[Optional[str]]
+
+
+class IncrementalDocument:
+    """
+    面向编辑器/实时预览的增量 Markdown -> Typst 转换。
+
+    文档被拆分为 markdown-it 的顶层块（依据 token.map 的行范围），每个块单独保存渲染结果。
+    一次编辑只重新解析受影响的块：包含编辑范围的块、它前面的一个块（编辑可能让新行
+    并入前一个列表或段落），以及后面的一个“哨兵”块。如果重新解析后哨兵块的行范围
+    与原来一致，说明编辑的影响到此为止；否则（例如新开了一个未闭合的代码块）
+    成倍扩大重新解析的范围，直到收敛或到达文档末尾。
+
+    因此一次小编辑的解析与渲染开销只与附近几个块的大小有关，与文档长度无关。
+    链接引用定义来自初始的整体解析并在之后的局部解析中共享；编辑中删除的引用定义不会失效。
+    """
+    def __init__(self, markdown_text: str = "", converter=None):
+        if converter is None:
+            from .main import get_default_converter
+            converter = get_default_converter()
+        self.converter = converter
+        self._env: dict = {}
+        self.lines: List[str] = NEWLINES_RE.sub("\n", markdown_text).split("\n")
+        self.blocks: List[RenderedBlock] = self._parse_lines(0, len(self.lines))
+        self._starts: List[int] = [block.start for block in self.blocks]
+
+    # --- 结果 ---
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def typst(self) -> str:
+        """完整的 Typst 输出，与 convert_md_to_typ(self.text) 相同。"""
+        return "\n\n".join(block.typst for block in self.blocks if block.typst is not None).strip()
+
+    # --- 解析 ---
+    def _render(self, tokens: Sequence[Token]) -> Optional[str]:
+        renderer = self.converter.typst_renderer
+        document = self.converter.markdown_parser.build(tokens)
+        if not document.content:
+            return None
+        return "\n\n".join(renderer.render_block(block) for block in document.content)
+
+    def _parse_lines(self, start: int, end: int) -> List[RenderedBlock]:
+        """解析 self.lines[start:end]，返回其中的顶层块（行号为文档中的绝对行号）。"""
+        tokens = self.converter.markdown_parser.tokenize("\n".join(self.lines[start:end]), self._env)
+        groups = []
+        for token in tokens:
+            if token.level == 0 and token.nesting >= 0 and token.map is not None:
+                groups.append((token.map[0] + start, token.map[1] + start, [token]))
+            elif groups:
+                groups[-1][2].append(token)
+        return [RenderedBlock(s, e, self._render(group)) for s, e, group in groups]
+
+    # --- 编辑 ---
+    def edit(self, start_line: int, start_col: int, end_line: int, end_col: int, new_text: str) -> BlockPatch:
+        """
+        用 new_text 替换 (start_line, start_col) 到 (end_line, end_col) 之间的文本
+        （行列号从 0 开始，与 LSP 的 Range 相同），返回对块列表的修改。
+        """
+        head = self.lines[start_line][:start_col]
+        tail = self.lines[end_line][end_col:]
+        new_lines = (head + NEWLINES_RE.sub("\n", new_text) + tail).split("\n")
+        self.lines[start_line:end_line + 1] = new_lines
+        delta = len(new_lines) - (end_line - start_line + 1)
+
+        blocks, starts = self.blocks, self._starts
+        # 编辑起点所在（或之前）的块，再往前多包含一个块
+        first = max(bisect_right(starts, start_line) - 2, 0)
+        # 第一个在编辑范围之后开始的块
+        after = bisect_right(starts, end_line)
+        region_start = min(starts[first], start_line) if blocks else 0
+
+        extra = 1
+        while True:
+            stop = min(after + extra, len(blocks))
+            if stop == len(blocks):
+                region_end = len(self.lines)
+            else:
+                region_end = blocks[stop - 1].end + delta
+            new_blocks = self._parse_lines(region_start, region_end)
+
+            if stop == len(blocks):
+                break
+            guard = blocks[stop - 1]
+            if new_blocks and new_blocks[-1].start == guard.start + delta and new_blocks[-1].end == guard.end + delta:
+                break
+            extra *= 2
+
+        blocks[first:stop] = new_blocks
+        starts[first:stop] = [block.start for block in new_blocks]
+        if delta:
+            # 之后的块内容不变，只需要平移行号
+            for index in range(first + len(new_blocks), len(blocks)):
+                blocks[index].start += delta
+                blocks[index].end += delta
+                starts[index] += delta
+
+        return BlockPatch(first, stop - first, [block.typst for block in new_blocks])
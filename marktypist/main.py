@@ -1,36 +1,412 @@
+import threading
 from pathlib import Path
-from .md_parser import MarkdownParser
-from .typ_parser import TypstParser
-from .md_renderer import MarkdownRenderer
-from .typ_renderer import TypstRenderer
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from .profiling import count_nodes, count_tokens, get_profiler, stage
+
+# 解析器和渲染器在第一次使用时才导入：Typst -> Markdown 方向（以及 --help）
+# 不需要加载 markdown-it 和 linkify，CLI 的启动时间主要花在这些导入上
+if TYPE_CHECKING:
+    from .md_parser import MarkdownParser
+    from .md_renderer import MarkdownRenderer
+    from .outline import MarkdownOutliner, Outline
+    from .typ_parser import TypstParser
+    from .typ_renderer import TypstRenderer
+
+# 输入后缀 -> 输出后缀
+OUTPUT_SUFFIXES = {".md": ".typ", ".typ": ".md"}
+# 输入后缀 -> 转换方向（用于性能统计的报告）
+DIRECTIONS = {".md": "md->typ", ".typ": "typ->md"}
+
+def output_path_for(input_path: Path) -> Path:
+    """根据输入文件的后缀推断转换后的输出文件路径。"""
+    suffix = OUTPUT_SUFFIXES.get(input_path.suffix.lower())
+    if suffix is None:
+        raise ValueError(f"Unsupported input file format: {input_path.suffix}")
+    return input_path.with_suffix(suffix)
+
+
+class Converter:
+    """
+    可复用的转换器：解析器和渲染器只构建一次，之后的每次调用都直接复用。
+
+    构建 MarkdownIt 实例（以及它的全部规则链）的开销远大于转换一个小文档，
+    所以在服务中应当创建一个 Converter 并在所有请求间共享。
+
+    线程安全：TypstParser 和两个渲染器都是无状态的，直接共享；
+    MarkdownIt 的 linkify 插件在 test()/match() 之间保存了中间状态，
+    因此 MarkdownParser 按线程各缓存一份（threading.local），
+    每个线程第一次使用时构建，之后复用。
+
+    typst_parser 可以替换 Typst 解析器，例如使用基于 Lark 语法的 LarkTypstParser。
+    渲染器按输出格式从 renderers 的注册表中创建，每种格式一个。
+
+    解析器和渲染器都在第一次使用时才构建（并导入对应的模块），
+    只转换一个方向时不会加载另一个方向的依赖。
+    """
+    def __init__(self, typst_parser=None):
+        self._local = threading.local()
+        self._typst_parser = typst_parser
+        self._renderers: Dict[str, object] = {}
+
+    @property
+    def markdown_parser(self) -> "MarkdownParser":
+        """当前线程专用的 MarkdownParser。"""
+        parser = getattr(self._local, "markdown_parser", None)
+        if parser is None:
+            from .md_parser import MarkdownParser
+            parser = self._local.markdown_parser = MarkdownParser()
+        return parser
+
+    @property
+    def markdown_outliner(self) -> "MarkdownOutliner":
+        """当前线程专用的 MarkdownOutliner（与 markdown_parser 共用 MarkdownIt 实例）。"""
+        outliner = getattr(self._local, "markdown_outliner", None)
+        if outliner is None:
+            from .outline import MarkdownOutliner
+            outliner = self._local.markdown_outliner = MarkdownOutliner(self.markdown_parser)
+        return outliner
+
+    @property
+    def typst_parser(self) -> "TypstParser":
+        if self._typst_parser is None:
+            from .typ_parser import TypstParser
+            self._typst_parser = TypstParser()
+        return self._typst_parser
+
+    def renderer(self, name: str):
+        """输出格式 name（参见 renderers.register_renderer）的渲染器。"""
+        renderer = self._renderers.get(name)
+        if renderer is None:
+            from .renderers import create_renderer
+            renderer = self._renderers[name] = create_renderer(name)
+        return renderer
+
+    @property
+    def typst_renderer(self) -> "TypstRenderer":
+        return self.renderer("typst")
+
+    @property
+    def markdown_renderer(self) -> "MarkdownRenderer":
+        return self.renderer("markdown")
+
+    def md_to_typ(self, markdown_text: str) -> str:
+        if get_profiler() is not None:
+            return self.convert_text(markdown_text, ".md")
+        document_model = self.markdown_parser.parse(markdown_text)
+        return self.typst_renderer.render(document_model)
+
+    def md_to_typ_arena(self, markdown_text: str) -> str:
+        """
+        与 md_to_typ 结果相同，但经过扁平的 NodeArena 而不是 token 列表 + UDM 对象树，
+        大文档的内存占用和构建时间都更少。
+        """
+        from .arena import ArenaTypstRenderer
+        return ArenaTypstRenderer().render(self.markdown_parser.parse_arena(markdown_text))
+
+    def typ_to_md(self, typst_text: str) -> str:
+        if get_profiler() is not None:
+            return self.convert_text(typst_text, ".typ")
+        document_model = self.typst_parser.parse(typst_text)
+        return self.markdown_renderer.render(document_model)
+
+    def parse_text(self, source_text: str, suffix: str):
+        """按源文件后缀（".md" 或 ".typ"）解析，返回 (UDM 文档, 目标格式的渲染器)。"""
+        suffix = suffix.lower()
+        if suffix == ".md":
+            return self._parse_markdown(source_text), self.typst_renderer
+        elif suffix == ".typ":
+            return self._parse_typst(source_text), self.markdown_renderer
+        raise ValueError(f"Unsupported input file format: {suffix}")
+
+    def _parse_markdown(self, markdown_text: str):
+        profiler = get_profiler()
+        if profiler is None:
+            return self.markdown_parser.parse(markdown_text)
+        with profiler.stage("tokenize") as tokenize_stage:
+            tokens = self.markdown_parser.tokenize(markdown_text)
+        tokenize_stage.count, tokenize_stage.unit = count_tokens(tokens), "tokens"
+        with profiler.stage("build") as build_stage:
+            document_model = self.markdown_parser.build(tokens)
+        build_stage.count, build_stage.unit = count_nodes(document_model), "nodes"
+        return document_model
+
+    def _parse_typst(self, typst_text: str):
+        return self._profiled_parse(self.typst_parser.parse, typst_text)
+
+    def _profiled_parse(self, parse, source):
+        profiler = get_profiler()
+        if profiler is None:
+            return parse(source)
+        with profiler.stage("parse") as parse_stage:
+            document_model = parse(source)
+        parse_stage.count, parse_stage.unit = count_nodes(document_model), "nodes"
+        return document_model
+
+    def parse_file(self, input_path: Path):
+        """
+        解析文件，返回 (UDM 文档, 目标格式的渲染器)。
+
+        Typst 解析器支持逐行解析（parse_lines）时，文件通过 reader.iter_source_lines 惰性读取：
+        大文件被 mmap 映射并增量解码，内存中不会同时存在整个文件的字符串和行列表。
+        """
+        suffix = input_path.suffix.lower()
+        parse_lines = getattr(self.typst_parser, "parse_lines", None)
+        if suffix == ".typ" and parse_lines is not None:
+            from .reader import iter_source_lines
+            # 读取与解析交替进行，不单独记录 read 阶段
+            return self._profiled_parse(parse_lines, iter_source_lines(input_path)), self.markdown_renderer
+
+        with stage("read"):
+            source_text = input_path.read_text(encoding="utf-8-sig")
+        return self.parse_text(source_text, suffix)
+
+    def convert_text(self, source_text: str, suffix: str) -> str:
+        """按源文件后缀（".md" 或 ".typ"）选择转换方向。"""
+        profiler = get_profiler()
+        if profiler is None:
+            document_model, renderer = self.parse_text(source_text, suffix)
+            return renderer.render(document_model)
+
+        with profiler.conversion(DIRECTIONS.get(suffix.lower(), suffix)):
+            document_model, renderer = self.parse_text(source_text, suffix)
+            with profiler.stage("render") as render_stage:
+                converted_text = renderer.render(document_model)
+            render_stage.count, render_stage.unit = len(converted_text), "chars"
+            return converted_text
+
+    # --- 大纲：不构建 UDM、不渲染 ---
+    def outline_text(self, source_text: str, suffix: str) -> "Outline":
+        """按源文件后缀（".md" 或 ".typ"）提取标题大纲、链接和图片，参见 outline 模块。"""
+        suffix = suffix.lower()
+        if suffix == ".md":
+            return self.markdown_outliner.outline(source_text)
+        elif suffix == ".typ":
+            from .outline import outline_typst
+            return outline_typst(source_text.splitlines())
+        raise ValueError(f"Unsupported input file format: {suffix}")
+
+    def outline_file(self, input_path: Path) -> "Outline":
+        suffix = input_path.suffix.lower()
+        if suffix == ".typ":
+            from .outline import outline_typst
+            from .reader import iter_source_lines
+            return outline_typst(iter_source_lines(input_path))
+        return self.outline_text(input_path.read_text(encoding="utf-8-sig"), suffix)
+
+    # --- 解析一次，渲染为多种格式 ---
+    def render_many(self, document, formats: Sequence[str], jobs: int = None) -> Dict[str, str]:
+        """
+        把同一个 UDM 文档交给多种输出格式的渲染器，返回 {格式: 输出}；增加一种输出格式只增加渲染的时间。
+        jobs > 1 时各格式在 fork 出的进程中同时渲染，参见 _render_targets。
+        """
+        names = list(dict.fromkeys(formats))
+        return dict(zip(names, self._render_targets(document, [(name, None) for name in names], jobs)))
+
+    def convert_text_to_many(self, source_text: str, suffix: str, formats: Sequence[str],
+                             jobs: int = None) -> Dict[str, str]:
+        """按源文件后缀解析一次，渲染为 formats 中的每种格式。"""
+        document_model, _ = self.parse_text(source_text, suffix)
+        return self.render_many(document_model, formats, jobs)
+
+    def convert_file_to_many(self, input_path: Path, output_paths: Sequence[Path], jobs: int = None) -> None:
+        """
+        解析 input_path 一次，按每个输出路径的后缀选择输出格式写出，
+        例如同时写出 Typst 和规范化的 Markdown：convert_file_to_many(Path("a.md"), [Path("a.typ"), Path("b.md")])。
+        """
+        from .renderers import format_for_path
+
+        targets = [(format_for_path(path), path) for path in output_paths]
+        # 同一个文件不能写两次（jobs > 1 时各个子进程会同时写它），也不能覆盖输入；符号链接等按解析后的路径比较
+        seen = {input_path.resolve(): None}
+        for _, path in targets:
+            resolved = path.resolve()
+            if resolved in seen:
+                if seen[resolved] is None:
+                    raise ValueError(f"Output would overwrite the input file: {path}")
+                raise ValueError(f"Output file given more than once: {path} (same as {seen[resolved]})")
+            seen[resolved] = path
+
+        profiler = get_profiler()
+        if profiler is None:
+            document_model, _ = self.parse_file(input_path)
+            self._render_targets(document_model, targets, jobs)
+            return
+        direction = input_path.suffix.lower()[1:] + "->" + "+".join(path.suffix.lower()[1:] for path in output_paths)
+        with profiler.conversion(direction, input_path):
+            document_model, _ = self.parse_file(input_path)
+            self._render_targets(document_model, targets, jobs)
+
+    def _render_targets(self, document, targets: List[Tuple[str, Optional[Path]]], jobs: int = None) -> list:
+        """
+        渲染 (格式, 输出路径) 列表，输出路径为 None 时返回字符串。
+
+        渲染是纯 Python 代码，线程受 GIL 限制不会更快；jobs > 1 时改为 fork 出的进程，
+        子进程继承已经解析好的文档（写时复制，不需要序列化），各自写出自己的文件。
+        不支持 fork 的平台上依次渲染。
+        """
+        if jobs and jobs > 1 and len(targets) > 1:
+            import multiprocessing
+            if "fork" in multiprocessing.get_all_start_methods():
+                with stage("render"):
+                    return _render_forked(self, document, targets, jobs)
+        return [self._render_target(document, name, path) for name, path in targets]
+
+    def _render_target(self, document, name: str, path: Optional[Path]) -> Optional[str]:
+        renderer = self.renderer(name)
+        with stage(f"render {name}"):
+            if path is None:
+                return renderer.render(document)
+            with open(path, "w", encoding="utf-8") as target:
+                if hasattr(renderer, "render_to"):
+                    renderer.render_to(document, target)
+                else:
+                    target.write(renderer.render(document))
+        return None
+
+    def iter_md_to_typ(self, lines, chunk_lines: int = None):
+        """流式 Markdown -> Typst 转换，参见 streaming.iter_md_to_typ。"""
+        from .streaming import DEFAULT_CHUNK_LINES, iter_md_to_typ
+        return iter_md_to_typ(lines, self, chunk_lines or DEFAULT_CHUNK_LINES)
+
+    @property
+    def cache_options(self) -> str:
+        """影响转换结果的选项，作为 ConversionCache 键的一部分。"""
+        # 不为了取类名而构建（导入）默认的 TypstParser
+        typst_parser = type(self._typst_parser).__name__ if self._typst_parser is not None else "TypstParser"
+        return f"typst_parser={typst_parser}"
+
+    def convert_file(self, input_path: Path, output_path: Path = None, stream: bool = False, cache=None,
+                     jobs: int = None):
+        """
+        转换一个文件。stream=True 时 Markdown 输入按块流式解析并逐块写出，
+        内存占用与文件大小无关（Typst 输入总是整体转换）。
+
+        cache 是一个 ConversionCache：输入内容、方向和选项都没变时直接复用上一次的结果。
+
+        jobs > 1 时 Markdown 输入在顶层块边界处切分，由 jobs 个进程并行转换（参见 parallel.parallel_md_to_typ），
+        输出与顺序转换逐字节相同。
+        """
+        profiler = get_profiler()
+        if profiler is not None:
+            with profiler.conversion(DIRECTIONS.get(input_path.suffix.lower(), input_path.suffix), input_path):
+                return self._convert_file_cached(input_path, output_path, stream, cache, jobs)
+        return self._convert_file_cached(input_path, output_path, stream, cache, jobs)
+
+    def _convert_file_cached(self, input_path: Path, output_path: Path = None, stream: bool = False, cache=None,
+                             jobs: int = None):
+        if cache is None:
+            return self._convert_file(input_path, output_path, stream, jobs)
+
+        key = cache.key_for_file(input_path, input_path.suffix.lower(), self.cache_options)
+        cached = cache.lookup(key)
+        if cached is not None:
+            try:
+                if output_path:
+                    import shutil
+                    shutil.copyfile(cached, output_path)
+                    return None
+                return cached.read_bytes().decode("utf-8")
+            except FileNotFoundError:
+                pass  # 刚好被其他进程淘汰，重新转换
+
+        converted_text = self._convert_file(input_path, output_path, stream, jobs)
+        if output_path:
+            cache.put_file(key, output_path)
+        else:
+            cache.put(key, converted_text.encode("utf-8"))
+        return converted_text
+
+    def _convert_file(self, input_path: Path, output_path: Path = None, stream: bool = False, jobs: int = None):
+        if stream and input_path.suffix.lower() == ".md":
+            with stage("stream"):
+                return self._convert_md_file_streaming(input_path, output_path)
+        if jobs and jobs > 1 and input_path.suffix.lower() == ".md":
+            return self._convert_md_file_parallel(input_path, output_path, jobs)
+
+        document_model, renderer = self.parse_file(input_path)
+
+        with stage("render"):
+            if output_path:
+                # 渲染器直接写入文件，不在内存中拼出完整的输出字符串
+                with open(output_path, "w", encoding="utf-8") as target:
+                    renderer.render_to(document_model, target)
+            else:
+                return renderer.render(document_model)
+
+    def _convert_md_file_parallel(self, input_path: Path, output_path: Path, jobs: int):
+        from .parallel import parallel_md_to_typ
+
+        with stage("read"):
+            markdown_text = input_path.read_text(encoding="utf-8-sig")
+        with stage("parallel"):
+            converted_text = parallel_md_to_typ(markdown_text, jobs)
+        if not output_path:
+            return converted_text
+        with open(output_path, "w", encoding="utf-8") as target:
+            target.write(converted_text)
+
+    def _convert_md_file_streaming(self, input_path: Path, output_path: Path = None):
+        with open(input_path, encoding="utf-8-sig") as source:
+            chunks = self.iter_md_to_typ(source)
+            if not output_path:
+                return "".join(chunks)
+            with open(output_path, "w", encoding="utf-8") as target:
+                for chunk in chunks:
+                    target.write(chunk)
+
+
+# fork 出的渲染进程从这里取得转换器和文档（继承自父进程的内存）
+_forked_render_state = None
+
+
+def _render_forked(converter: Converter, document, targets, jobs: int) -> list:
+    global _forked_render_state
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    _forked_render_state = (converter, document)
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(targets)),
+                                 mp_context=multiprocessing.get_context("fork")) as executor:
+            return list(executor.map(_render_forked_target, targets))
+    finally:
+        _forked_render_state = None
+
+
+def _render_forked_target(target):
+    converter, document = _forked_render_state
+    return converter._render_target(document, *target)
+
+
+# 模块级函数共享的默认转换器
+_default_converter = Converter()
+
+def get_default_converter() -> Converter:
+    """返回模块级函数使用的共享 Converter。"""
+    return _default_converter
+
+# 按 Typst 解析器名称缓存的 Converter（"regex" 即默认转换器）
+_converters = {"regex": _default_converter}
+
+def converter_for(typst_parser: str = "regex") -> Converter:
+    """返回使用指定 Typst 解析器（"regex" 或 "lark"）的共享 Converter。"""
+    converter = _converters.get(typst_parser)
+    if converter is None:
+        if typst_parser != "lark":
+            raise ValueError(f"Unknown Typst parser: {typst_parser}")
+        from .typ_lark_parser import LarkTypstParser
+        converter = _converters[typst_parser] = Converter(typst_parser=LarkTypstParser())
+    return converter
 
 def convert_md_to_typ(markdown_text: str) -> str:
-    parser = MarkdownParser()
-    renderer = TypstRenderer()
-    document_model = parser.parse(markdown_text)
-    typst_output = renderer.render(document_model)
-    return typst_output
+    return _default_converter.md_to_typ(markdown_text)
 
 # 新增：Typst -> MD 的转换函数
 def convert_typ_to_md(typst_text: str) -> str:
-    parser = TypstParser()
-    renderer = MarkdownRenderer()
-    document_model = parser.parse(typst_text)
-    md_output = renderer.render(document_model)
-    return md_output
-
-def convert_file(input_path: Path, output_path: Path = None):
-    source_text = input_path.read_text(encoding="utf-8-sig")
-    
-    # 扩展逻辑以处理 Typst 输入
-    if input_path.suffix.lower() == ".md":
-        converted_text = convert_md_to_typ(source_text)
-    elif input_path.suffix.lower() == ".typ":
-        converted_text = convert_typ_to_md(source_text)
-    else:
-        raise ValueError(f"Unsupported input file format: {input_path.suffix}")
-            
-    if output_path:
-        output_path.write_text(converted_text, encoding="utf-8")
-    else:
-        return converted_text
\ No newline at end of file
+    return _default_converter.typ_to_md(typst_text)
+
+def convert_file(input_path: Path, output_path: Path = None, stream: bool = False, cache=None, jobs: int = None):
+    return _default_converter.convert_file(input_path, output_path, stream, cache, jobs)
+
+def convert_file_to_many(input_path: Path, output_paths: Sequence[Path], jobs: int = None) -> None:
+    return _default_converter.convert_file_to_many(input_path, output_paths, jobs)
@@ -1,7 +1,7 @@
 from markdown_it import MarkdownIt
 from markdown_it.renderer import RendererProtocol
 from markdown_it.token import Token
-from typing import List, Sequence
+from typing import Iterator, List, Sequence
 
 # 导入所有需要的模型
 from .model import (
@@ -9,20 +9,31 @@ from .model import (
     Heading, Paragraph, UnorderedList, OrderedList, ListItem, CodeBlock, BlockQuote,
     Table, TableRow, TableCell
 )
+from .arena import NodeArena, parse_arena
+from .md_table import use_table_fast_path
+from .visitor import Dispatcher
 
-class UdmRenderer(RendererProtocol):
+class UdmRenderer(Dispatcher, RendererProtocol):
     """
     一个自定义的 markdown-it 渲染器，它不输出字符串，
     而是构建我们的通用文档模型 (UDM) 对象。
+
+    token 按 token.type 分发到同名方法（例如 paragraph_open），没有对应方法的 token 被忽略。
     """
+    default_handler = "render_default"
     def __init__(self):
         self.stack: List = [Document(content=[])]
         self.in_header = False  # 状态变量，用于区分表格的 a a和 a
 
+    @classmethod
+    def handler_names(cls, token_type: str) -> Iterator[str]:
+        yield token_type
+
     def render(self, tokens: Sequence[Token]) -> Document:
+        dispatch = self._dispatch
         for token in tokens:
-            method = getattr(self, token.type, self.render_default)
-            method(token)
+            handler = dispatch.get(token.type) or self.handler_for(token.type)
+            handler(self, token)
         return self.stack[0]
 
     def render_default(self, token: Token):
@@ -73,11 +84,30 @@ class UdmRenderer(RendererProtocol):
     def blockquote_close(self, token: Token): self._pop()
 
     def fence(self, token: Token):
-        lang = token.info.split()[0] if token.info else ""
+        lang = token.info.split()[0] if token.info.strip() else ""
         code_block = CodeBlock(language=lang, content=token.content.strip())
         self.stack[-1].content.append(code_block)
         
     # --- 表格处理器 ---
+    def table(self, token: Token):
+        # md_table.table_rule 产出的整个表格：按列保存的单元格，纯文本单元格是字符串，其余是 inline token
+        meta = token.meta
+        inline_cell = self._inline_cell
+        rows = [TableRow(cells=[TableCell(content=[Text(content=cell)]) if type(cell) is str and cell
+                                else inline_cell(cell) for cell in row])
+                for row in zip(*meta["columns"])]
+        self.stack[-1].content.append(Table(header=rows[0], align=list(meta["align"]), rows=rows[1:]))
+
+    def _inline_cell(self, cell) -> TableCell:
+        node = TableCell(content=[])
+        if type(cell) is str:  # 空单元格
+            return node
+        self.stack.append(node)
+        self.inline(cell)
+        self.stack.pop()
+        return node
+
+    # markdown-it 自带的表格规则产出的 token
     def table_open(self, token: Token):
         self._push(Table(header=TableRow(cells=[]), rows=[], align=[]))
     def table_close(self, token: Token): self._pop()
@@ -99,11 +129,18 @@ class UdmRenderer(RendererProtocol):
         
     # --- 内联元素处理器 ---
     def inline(self, token: Token):
+        dispatch = self._dispatch
         for child in token.children:
-            method = getattr(self, child.type, self.render_default)
-            method(child)
+            handler = dispatch.get(child.type) or self.handler_for(child.type)
+            handler(self, child)
 
-    def text(self, token: Token): self.stack[-1].content.append(Text(content=token.content))
+    def text(self, token: Token):
+        # 相邻的文本（例如被忽略的软换行两侧）合并为一个 Text 节点
+        content = self.stack[-1].content
+        if content and type(content[-1]) is Text:
+            content[-1] = Text(content=content[-1].content + token.content)
+        else:
+            content.append(Text(content=token.content))
 
     def strong_open(self, token: Token): self._push(Bold(content=[]))
     def strong_close(self, token: Token): self._pop()
@@ -131,13 +168,26 @@ class MarkdownParser:
     def __init__(self):
         # 使用 "gfm-like" 预设，它包含了表格等功能
         self.md = MarkdownIt("gfm-like")
+        # 表格整体产出一个 token，纯文本单元格不经过内联解析，参见 md_table
+        use_table_fast_path(self.md)
 
-    def parse(self, markdown_text: str) -> Document:
-        tokens = self.md.parse(markdown_text)
+    def tokenize(self, markdown_text: str, env=None) -> List[Token]:
+        """只运行 markdown-it，返回 token 流。env 可以在多次调用间共享（例如链接引用定义）。"""
+        return self.md.parse(markdown_text, env)
+
+    def build(self, tokens: Sequence[Token]) -> Document:
+        """由 token 流构建 UDM 文档。"""
         renderer = UdmRenderer()
         doc = renderer.render(tokens)
         
         # 修复一个可能的解析问题：有时根节点会错误地嵌套一层
         if len(doc.content) == 1 and isinstance(doc.content[0], Document):
             return doc.content[0]
-        return doc
\ No newline at end of file
+        return doc
+
+    def parse(self, markdown_text: str) -> Document:
+        return self.build(self.tokenize(markdown_text))
+
+    def parse_arena(self, markdown_text: str) -> NodeArena:
+        """解析为扁平的 NodeArena（参见 arena.parse_arena），不构建 token 流和 UDM 两套对象图。"""
+        return parse_arena(self.md, markdown_text)
@@ -1,76 +1,131 @@
 # marktypist/md_renderer.py
 
 from .model import *
+from .visitor import Capture, NodeVisitor
 from typing import List
 
-class MarkdownRenderer:
+class MarkdownRenderer(NodeVisitor):
     """
     遍历 UDM 树并将其渲染为 Markdown 格式的字符串。
     """
     def render(self, document: Document) -> str:
         return self._visit(document).strip()
 
-    def _visit(self, node):
-        # 核心修正：移除了多余的 .__name__
-        method_name = f"visit_{node.__class__.__name__.lower()}"
-        visitor = getattr(self, method_name, self.visit_default)
-        return visitor(node)
-
     def visit_default(self, node):
         # 如果遇到未知的节点类型，抛出 NotImplementedError
         raise NotImplementedError(f"No visitor for node type: {node.__class__.__name__} ({node})")
 
-    def _render_inline_content(self, content: List[InlineElement]) -> str:
-        return "".join(self._visit(item) for item in content)
-
+    # 容器节点的访问者是生成器：依次产出输出片段和子节点，参见 NodeVisitor
     def visit_text(self, node: Text) -> str: return node.content
     
-    def visit_bold(self, node: Bold) -> str:
+    def visit_bold(self, node: Bold):
         # Typst 的粗斜体 *_..._* 解析为 Italic(Bold(...))
         # 所以，Bold 节点不会是粗斜体的顶层，这里只处理纯 Bold
-        return f"**{self._render_inline_content(node.content)}**"
+        yield "**"
+        yield node.content
+        yield "**"
 
-    def visit_italic(self, node: Italic) -> str:
+    def visit_italic(self, node: Italic):
         # 关键修复：处理 Typst 解析器生成的 Italic(Bold(...)) 粗斜体
         if len(node.content) == 1 and isinstance(node.content[0], Bold):
-            bold_node = node.content[0]
             # 渲染成 Markdown 的粗斜体 ***...***
-            return f"***{self._render_inline_content(bold_node.content)}***"
-        # 否则，是纯斜体
-        return f"*{self._render_inline_content(node.content)}*"
+            yield "***"
+            yield node.content[0].content
+            yield "***"
+        else:
+            # 否则，是纯斜体
+            yield "*"
+            yield node.content
+            yield "*"
 
-    def visit_document(self, node: Document) -> str:
+    def _join(self, nodes: List, separator: str):
+        for index, node in enumerate(nodes):
+            if index:
+                yield separator
+            yield node
+
+    def visit_document(self, node: Document):
         # 块与块之间用两个换行符分隔
-        return "\n\n".join(self._visit(item) for item in node.content)
+        return self._join(node.content, "\n\n")
 
-    def visit_heading(self, node: Heading) -> str:
-        return f"{'#' * node.level} {self._render_inline_content(node.content)}"
+    def visit_heading(self, node: Heading):
+        yield f"{'#' * node.level} "
+        yield node.content
 
-    def visit_paragraph(self, node: Paragraph) -> str:
-        return self._render_inline_content(node.content)
+    def visit_paragraph(self, node: Paragraph):
+        return node.content
 
     # --- 新增列表渲染器 ---
-    def visit_unorderedlist(self, node: UnorderedList) -> str:
+    def visit_unorderedlist(self, node: UnorderedList):
         # 列表项之间用换行符分隔
-        items_str = "\n".join(self._visit(item) for item in node.items)
-        return items_str
+        return self._join(node.items, "\n")
+
+    def visit_orderedlist(self, node: OrderedList):
+        for i, item in enumerate(node.items):
+            if i:
+                yield "\n"
+            yield from self._render_list_item(item, f"{node.start + i}. ")
 
-    def visit_listitem(self, node: ListItem) -> str:
+    def visit_listitem(self, node: ListItem):
         # Markdown 列表项以 '- ' 开头
-        # 列表项内容可以是段落，或者其他块
-        item_content_lines = []
-        for block_elem in node.content:
-            # 渲染列表项内部的块级元素
-            block_output = self._visit(block_elem)
-            item_content_lines.append(block_output)
-        
-        # 首行加 '- '，后续行缩进
-        first_line = f"- {item_content_lines[0]}" if item_content_lines else "- "
-        
-        remaining_lines = []
-        if len(item_content_lines) > 1:
-            for line in item_content_lines[1:]:
-                # 对于多行内容，每行前面加4个空格（CommonMark 列表项缩进）
-                remaining_lines.append(f"    {line}")
-        
-        return first_line + ("\n" + "\n".join(remaining_lines) if remaining_lines else "")
\ No newline at end of file
+        return self._render_list_item(node, "- ")
+
+    def _render_list_item(self, node: ListItem, marker: str):
+        # 首行加列表标记；列表项内容可以是段落，或者其他块
+        yield marker
+        for index, block_elem in enumerate(node.content):
+            if index:
+                # 之后的每个块前面加4个空格（CommonMark 列表项缩进）
+                yield "\n    "
+            yield block_elem
+
+    def visit_code(self, node: Code) -> str:
+        # 内容中含有反引号时，使用更长的反引号序列包裹
+        fence = "`"
+        while fence in node.content:
+            fence += "`"
+        padding = " " if node.content.startswith("`") or node.content.endswith("`") else ""
+        return f"{fence}{padding}{node.content}{padding}{fence}"
+
+    def visit_link(self, node: Link):
+        yield "["
+        yield node.content
+        yield f"]({node.url})"
+
+    def visit_image(self, node: Image) -> str:
+        return f"![{node.alt}]({node.src})"
+
+    def visit_codeblock(self, node: CodeBlock) -> str:
+        return f"```{node.language}\n{node.content}\n```"
+
+    def visit_blockquote(self, node: BlockQuote):
+        inner_content = yield Capture(self._join(node.content, "\n\n"))
+        # 每一行前面加上 '> '，空行只保留 '>'
+        yield "\n".join(f"> {line}" if line else ">" for line in inner_content.split("\n"))
+
+    # --- 表格渲染器 (GFM) ---
+    ALIGN_DELIMITERS = {"left": ":---", "center": ":---:", "right": "---:"}
+
+    def visit_table(self, node: Table):
+        if not node.header.cells:
+            return
+
+        num_columns = len(node.header.cells)
+        yield from self._render_table_row(node.header, num_columns)
+        align = list(node.align) + [""] * (num_columns - len(node.align))
+        yield "\n| " + " | ".join(self.ALIGN_DELIMITERS.get(a, "---") for a in align[:num_columns]) + " |"
+        for row in node.rows:
+            yield "\n"
+            yield from self._render_table_row(row, num_columns)
+
+    def _render_table_row(self, row: TableRow, num_columns: int):
+        yield "|"
+        cells = row.cells[:num_columns]
+        for cell in cells:
+            text = yield Capture(cell)
+            yield " " + text.replace("|", "\\|") + " |"
+        # 单元格不足时补齐空单元格
+        yield "  |" * (num_columns - len(cells))
+
+    def visit_tablecell(self, node: TableCell):
+        return node.content
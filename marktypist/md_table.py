@@ -0,0 +1,142 @@
+# marktypist/md_table.py
+
+import re
+from typing import TYPE_CHECKING, List
+
+from markdown_it.rules_block.table import escapedSplit, getLine, table as markdown_it_table
+from markdown_it.rules_core import StateCore
+from markdown_it.token import Token
+
+if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
+    from markdown_it.rules_block import StateBlock
+
+# markdown-it 内联 text 规则的终止字符（另加换行）：不含这些字符的单元格，内联解析的结果只能是一个 text token
+INLINE_MARKUP_RE = re.compile(r"[\n!#$%&*+\-:<=>@\[\\\]^_`{}~]")
+
+# 列中单元格用它连接后整体检查一次。normalize 之后文本中不会出现 NUL；NUL 属于 linkify 预检查中
+# 链接前后允许出现的控制字符，所以连接后的整列没有通过预检查时，其中每个单元格单独检查也不会通过
+_COLUMN_SEPARATOR = "\x00"
+
+
+def _split_row(line: str) -> List[str]:
+    # escapedSplit 逐字符处理；没有反斜杠（也就没有转义的 |）时结果与 str.split 相同
+    cells = escapedSplit(line) if "\\" in line else line.split("|")
+    if cells and cells[0] == "":
+        cells.pop(0)
+    if cells and cells[-1] == "":
+        cells.pop()
+    return cells
+
+
+def _aligns(line: str) -> List[str]:
+    aligns = []
+    for column in line.split("|"):
+        marker = column.strip()
+        if not marker:
+            continue
+        if marker.endswith(":"):
+            aligns.append("center" if marker.startswith(":") else "right")
+        elif marker.startswith(":"):
+            aligns.append("left")
+        else:
+            aligns.append("")
+    return aligns
+
+
+def table_rule(state: "StateBlock", startLine: int, endLine: int, silent: bool) -> bool:
+    """
+    替代 markdown-it 的 GFM 表格规则：接受的语法和表格的行范围完全相同，但整个表格只产出一个 "table" token，
+    不为每个单元格产出 th/td/inline 共 4 个 token。
+
+    token.meta["align"] 是每列的对齐方式（"left"、"center"、"right"，未指定为 ""），
+    token.meta["columns"] 按列保存单元格文本，每列的第一个是表头（行数不足的单元格补 ""，多余的丢弃）。
+    单元格的内联解析由 table_cells_rule 在核心阶段完成。
+    """
+    # 表头和分隔行的检查交给 markdown-it 自己的规则，以免两者接受的表格不同
+    if not markdown_it_table(state, startLine, endLine, True):
+        return False
+    if silent:
+        return True
+
+    aligns = _aligns(getLine(state, startLine + 1))
+    columns = [[cell.strip()] for cell in _split_row(getLine(state, startLine).strip())]
+    count = len(columns)
+
+    oldParentType = state.parentType
+    state.parentType = "table"
+    terminatorRules = state.md.block.ruler.getRules("blockquote")
+    # markdown-it 自带的终止规则都不会在以 | 开头的行上开始新的块，这样的行不必逐个检查
+    builtin = all(rule.__module__.startswith("markdown_it.") for rule in terminatorRules)
+
+    nextLine = startLine + 2
+    while nextLine < endLine:
+        if state.sCount[nextLine] < state.blkIndent:
+            break
+        lineText = getLine(state, nextLine)
+        if not (builtin and lineText.startswith("|")) and any(
+                rule(state, nextLine, endLine, True) for rule in terminatorRules):
+            break
+        lineText = lineText.strip()
+        if not lineText or state.is_code_block(nextLine):
+            break
+        cells = _split_row(lineText)
+        if len(cells) < count:
+            cells.extend([""] * (count - len(cells)))
+        for column, cell in zip(columns, cells):
+            column.append(cell.strip())
+        nextLine += 1
+
+    token = state.push("table", "table", 0)
+    token.map = [startLine, nextLine]
+    token.meta = {"align": aligns, "columns": columns}
+    state.parentType = oldParentType
+    state.line = nextLine
+    return True
+
+
+def table_cells_rule(state: StateCore) -> None:
+    """
+    核心规则，紧接在块级阶段之后：把需要内联解析的单元格换成 inline token，之后的内联、linkify 等核心规则
+    处理这些 token，与处理普通的 inline token 相同。其余单元格保留为字符串，表示内容就是这段纯文本。
+
+    检查按列进行：整列都没有标记字符时不必逐个检查单元格。
+    """
+    md = state.md
+    typographer = md.options.get("typographer")
+    pretest = md.linkify.pretest if md.options.get("linkify") else None
+
+    pending = []
+    for token in state.tokens:
+        if token.type != "table":
+            continue
+        for column in token.meta["columns"]:
+            # 排版替换可能改变任何文本
+            joined = _COLUMN_SEPARATOR.join(column)
+            marked = typographer or INLINE_MARKUP_RE.search(joined)
+            linkable = pretest is not None and pretest(joined)
+            if not marked and not linkable:
+                continue
+            for index, text in enumerate(column):
+                if text and (typographer or (marked and INLINE_MARKUP_RE.search(text))
+                             or (linkable and pretest(text))):
+                    cell = Token("inline", "", 0)
+                    cell.map = token.map
+                    cell.content = text
+                    cell.children = []
+                    column[index] = cell
+                    pending.append(cell)
+    if not pending:
+        return
+
+    names = md.core.ruler.get_active_rules()
+    rules = md.core.ruler.getRules("")
+    cells = StateCore(state.src, md, state.env, pending)
+    for rule in rules[names.index("table_cells") + 1:]:
+        rule(cells)
+
+
+def use_table_fast_path(md: "MarkdownIt") -> None:
+    """在 md 上启用 table_rule 和 table_cells_rule。"""
+    md.block.ruler.at("table", table_rule, {"alt": ["paragraph", "reference"]})
+    md.core.ruler.after("block", "table_cells", table_cells_rule)
@@ -1,33 +1,52 @@
 # marktypist/model.py
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Union
 
+# 大文档会产生数以百万计的节点，所以所有节点都使用 __slots__（没有逐实例的 __dict__）。
+# Python 3.8 的 dataclass 还不支持 slots=True，这里手工声明，字段都没有默认值，
+# 因此与 @dataclass 生成的 __init__ 兼容。
+# 叶子节点 Text / Code / Image 是不可变的（frozen）：需要修改时创建新节点。
+
+
+class _FrozenNode:
+    """frozen + __slots__ 的节点不能用默认的 pickle 方式（逐个 setattr）恢复，改为重新调用构造函数。"""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, f.name) for f in fields(self))
+
 # --- 内联元素 (Inline Elements) ---
 
-@dataclass
-class Text:
+@dataclass(frozen=True)
+class Text(_FrozenNode):
+    __slots__ = ("content",)
     content: str
 
 @dataclass
 class Bold:
+    __slots__ = ("content",)
     content: List['InlineElement']
 
 @dataclass
 class Italic:
+    __slots__ = ("content",)
     content: List['InlineElement']
 
-@dataclass
-class Code:
+@dataclass(frozen=True)
+class Code(_FrozenNode):
+    __slots__ = ("content",)
     content: str
 
 @dataclass
 class Link:
+    __slots__ = ("url", "content")
     url: str
     content: List['InlineElement']
 
-@dataclass
-class Image:
+@dataclass(frozen=True)
+class Image(_FrozenNode):
+    __slots__ = ("src", "alt")
     src: str
     alt: str
 
@@ -37,49 +56,59 @@ InlineElement = Union[Text, Bold, Italic, Code, Link, Image]
 # --- 表格专用结构 (重新添加) ---
 @dataclass
 class TableCell:
+    __slots__ = ("content",)
     content: List[InlineElement]
 
 @dataclass
 class TableRow:
+    __slots__ = ("cells",)
     cells: List[TableCell]
 
 @dataclass
 class Table:
+    __slots__ = ("header", "align", "rows")
     header: TableRow
-    align: List[str] # 暂时不用，但保留字段
+    align: List[str] # 每列的对齐方式：left / center / right，"" 或 auto 表示未指定
     rows: List[TableRow]
 
 # --- 块级元素 (Block Elements) ---
 
 @dataclass
 class Paragraph:
+    __slots__ = ("content",)
     content: List[InlineElement]
 
 @dataclass
 class Heading:
+    __slots__ = ("level", "content")
     level: int
     content: List[InlineElement]
 
 @dataclass
 class ListItem:
+    __slots__ = ("content",)
     content: List['BlockElement'] # 列表项内容可以是块级元素
 
 @dataclass
 class UnorderedList:
+    __slots__ = ("items",)
     items: List[ListItem]
 
 @dataclass
 class OrderedList:
+    __slots__ = ("start", "items")
     start: int
     items: List[ListItem]
 
 @dataclass
 class CodeBlock:
+    __slots__ = ("language", "content")
     language: str
     content: str
 
 @dataclass
 class BlockQuote:
+    __slots__ = ("content",)
     content: List['BlockElement']
 
 # 更新 BlockElement 类型别名，重新包含 Table
@@ -88,4 +117,5 @@ BlockElement = Union[Paragraph, Heading, UnorderedList, OrderedList, CodeBlock,
 # --- 文档根节点 ---
 @dataclass
 class Document:
+    __slots__ = ("content",)
     content: List[BlockElement]
\ No newline at end of file
@@ -0,0 +1,232 @@
+# marktypist/outline.py
+
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+from .model import Bold, Code, Italic, Link, Text
+
+if TYPE_CHECKING:
+    from markdown_it.token import Token
+    from .md_parser import MarkdownParser
+
+# 与链接和图片无关的内联规则：强调和删除线在 markdown-it 的链接标签扫描（静默模式）中不起作用，
+# 实体和换行只产生文本。去掉它们之后链接和图片的识别结果不变。
+LINK_IRRELEVANT_RULES = ["emphasis", "strikethrough", "entity", "newline"]
+
+# 扫描一行 Typst 标记，终结符与 grammar/typst.lark 相同：转义字符、http(s) URL（其中的 // 不是注释）和
+# `行内代码` 被跳过，// 开始行注释；#link("...") 的参数是链接，#image(...) 整个调用（包括字符串参数）一次匹配
+TYPST_SCAN_RE = re.compile(r"""
+    \\.
+  | https?://[^\s\\*_`#\[\]]*
+  | `[^`\n]*`
+  | (?P<comment>//)
+  | \#link\("(?P<link>(?:[^"\\\n]|\\.)*)"\)
+  | (?P<image>\#image\((?:[^()"\n]|"(?:[^"\\\n]|\\.)*")*\))
+""", re.VERBOSE)
+
+
+@dataclass
+class OutlineHeading:
+    level: int
+    text: str  # 去掉强调等标记后的纯文本
+    line: int  # 从 1 开始的行号
+
+
+@dataclass
+class Outline:
+    """一个文档的标题大纲、链接目标和图片来源（按文档顺序，不去重）。"""
+    headings: List[OutlineHeading] = field(default_factory=list)
+    links: List[str] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class OutlineResult:
+    """iter_outline_tree 中单个文件的结果。error 为 None 表示成功。"""
+    source: Path
+    outline: Optional[Outline] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _plain_text(nodes) -> str:
+    """UDM 内联节点的纯文本：Text 和 Code 的内容，去掉强调和链接的标记。"""
+    parts = []
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Text, Code)):
+            parts.append(node.content)
+        elif isinstance(node, (Bold, Italic, Link)):
+            stack.extend(reversed(node.content))
+    return "".join(parts)
+
+
+class MarkdownOutliner:
+    """
+    从 Markdown 中提取 Outline，不构建 UDM、不渲染。
+
+    块级阶段与普通解析相同（因此链接引用定义同样对整个文档生效）。之后只对标题和可能含有链接或图片的
+    内联内容（含有 [ 或 <，或者通过 linkify 的预检查）做内联解析：标题使用完整的规则，
+    其余内容使用去掉 LINK_IRRELEVANT_RULES 的一份 markdown-it。得到的链接和图片与完整转换的 UDM 中相同。
+
+    与 MarkdownParser 一样不是线程安全的，参见 Converter.markdown_outliner。
+    """
+    def __init__(self, parser: "MarkdownParser" = None):
+        from markdown_it import MarkdownIt
+        from .md_parser import MarkdownParser
+
+        self.md = (parser or MarkdownParser()).md
+        self.links_md = MarkdownIt("gfm-like")
+        self.links_md.disable(LINK_IRRELEVANT_RULES)
+
+    def _may_link(self, text: str) -> bool:
+        if "[" in text or "<" in text:
+            return True
+        return bool(self.md.options.get("linkify")) and self.md.linkify.pretest(text)
+
+    def outline(self, markdown_text: str) -> Outline:
+        from markdown_it.rules_core import StateCore
+        from markdown_it.token import Token
+
+        md = self.md
+        state = StateCore(markdown_text, md, {})
+        names = md.core.ruler.get_active_rules()
+        rules = md.core.ruler.getRules("")
+        for rule in rules[:names.index("block") + 1]:
+            rule(state)
+
+        result = Outline()
+        # 按文档顺序：(标题, inline token)，不是标题时为 (None, inline token)
+        ordered = []
+        headings: List["Token"] = []
+        candidates: List["Token"] = []
+        level = line = 0
+        for token in state.tokens:
+            if token.type == "heading_open":
+                level, line = int(token.tag[1]), token.map[0] + 1
+            elif token.type == "heading_close":
+                level = 0
+            elif token.type == "inline":
+                if level:
+                    heading = OutlineHeading(level, "", line)
+                    result.headings.append(heading)
+                    ordered.append((heading, token))
+                    headings.append(token)
+                elif self._may_link(token.content):
+                    ordered.append((None, token))
+                    candidates.append(token)
+            elif token.type == "table":
+                # md_table.table_rule 产出的表格，单元格按行的顺序检查
+                for row in zip(*token.meta["columns"]):
+                    for text in row:
+                        if text and self._may_link(text):
+                            cell = Token("inline", "", 0)
+                            cell.content = text
+                            cell.children = []
+                            ordered.append((None, cell))
+                            candidates.append(cell)
+
+        self._parse_inline(md, StateCore(markdown_text, md, state.env, headings))
+        self._parse_inline(self.links_md, StateCore(markdown_text, self.links_md, state.env, candidates))
+
+        for heading, token in ordered:
+            text_parts = []
+            for child in token.children:
+                if child.type == "link_open":
+                    result.links.append(child.attrs["href"])
+                elif child.type == "image":
+                    result.images.append(child.attrs["src"])
+                elif heading is not None and child.type in ("text", "code_inline"):
+                    text_parts.append(child.content)
+            if heading is not None:
+                heading.text = "".join(text_parts)
+        return result
+
+    @staticmethod
+    def _parse_inline(md, state) -> None:
+        """对 state.tokens 中的 inline token 运行块级阶段之后的核心规则（内联、linkify 等）。"""
+        if not state.tokens:
+            return
+        names = md.core.ruler.get_active_rules()
+        rules = md.core.ruler.getRules("")
+        for rule in rules[names.index("block") + 1:]:
+            rule(state)
+
+
+def _scan_typst_line(line: str, result: "Outline") -> str:
+    """把一行中的链接和图片加入 result，返回去掉行注释之后的内容。"""
+    from .typ_lark_parser import ESCAPE_PATTERN, IMAGE_SRC_PATTERN, STRING_ESCAPES
+
+    def unescape(literal: str) -> str:
+        return ESCAPE_PATTERN.sub(lambda m: STRING_ESCAPES.get(m.group(1), m.group(1)), literal)
+
+    for match in TYPST_SCAN_RE.finditer(line):
+        if match.group("comment"):
+            return line[:match.start()]
+        if match.group("link") is not None:
+            result.links.append(unescape(match.group("link")))
+        elif match.group("image"):
+            src = IMAGE_SRC_PATTERN.match(match.group("image"))
+            result.images.append(unescape(src.group(1)) if src else "")
+    return line
+
+
+def outline_typst(lines: Iterable[str]) -> Outline:
+    """
+    逐行扫描 Typst 文本（lines 可以是惰性的迭代器）。标题的识别与 TypstParser 相同，只解析标题行的内联内容；
+    链接和图片的识别与 LarkTypstParser 相同（行内代码、转义和 // 注释中的不算）。``` 代码块中的行被跳过。
+    """
+    from .typ_parser import HEADING_PATTERN, TypstParser
+
+    parser = TypstParser()
+    result = Outline()
+    in_raw = False
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_raw = not in_raw
+            continue
+        if in_raw:
+            continue
+        if "#" in stripped or "/" in stripped:
+            stripped = _scan_typst_line(stripped, result).rstrip()
+        match = HEADING_PATTERN.match(stripped)
+        if match:
+            heading = parser.parse_lines([stripped]).content[0]
+            result.headings.append(OutlineHeading(heading.level, _plain_text(heading.content), number))
+    return result
+
+
+def _outline_one(source: Path) -> OutlineResult:
+    from .main import get_default_converter
+
+    try:
+        return OutlineResult(source, get_default_converter().outline_file(source))
+    except Exception as e:
+        return OutlineResult(source, error=f"{type(e).__name__}: {e}")
+
+
+def iter_outline_tree(source: str, jobs: Optional[int] = None) -> Iterator[OutlineResult]:
+    """
+    提取 source（目录或 glob，参见 batch.collect_sources）下每个 .md/.typ 文件的 Outline，按文件顺序产出。
+    jobs 为工作进程数，默认使用 CPU 核数；jobs=1 时在当前进程中顺序执行。单个文件失败不会中断整个运行。
+    """
+    from .batch import collect_sources, map_in_workers
+
+    _, files = collect_sources(source)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) <= 1:
+        for path in files:
+            yield _outline_one(path)
+        return
+    yield from map_in_workers(_outline_one, files, jobs, lambda path, error: OutlineResult(path, error=error))
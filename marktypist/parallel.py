@@ -0,0 +1,152 @@
+# marktypist/parallel.py
+
+import bisect
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from .main import get_default_converter
+from .streaming import NEWLINES_RE, StripJoiner, _last_top_level_block
+
+# 每块至少这么大：更小的块省下的时间抵不上进程间传输和调度的开销
+MIN_CHUNK_SIZE = 256 * 1024
+
+# 可以安全切分的位置：空行之后、从第 0 列开始、不是列表项或引用的一行。
+# 这样的行之前的所有顶层块（段落、表格、列表、引用、缩进代码块……）都已经结束，
+# 只有代码围栏和第 1-5 类 HTML 块能跨越它，见 _opaque_spans
+BOUNDARY_RE = re.compile(r"\n[ \t]*\n(?=[^\s>])(?![-+*](?:[ \t\n]|$)|\d{1,9}[.)](?:[ \t\n]|$))")
+
+# 代码围栏的开始，以及在空行处不结束的 HTML 块（<script>/<pre>/<style>/<textarea>、注释、
+# 处理指令、声明、CDATA）的开始
+OPENER_RE = re.compile(
+    r"^ {0,3}(?:(?P<fence>`{3,}|~{3,})(?P<info>[^\n]*)"
+    r"|<(?:(?P<tag>script|pre|style|textarea)(?=[\s>]|$)|(?P<other>!--|\?|!\[CDATA\[|![A-Za-z])))",
+    re.M | re.I,
+)
+HTML_TAG_END_RE = re.compile(r"</(?:script|pre|style|textarea)>", re.I)
+HTML_ENDS = {"!--": "-->", "?": "?>", "![CDATA[": "]]>"}
+
+# 链接引用定义对整个文档生效（包括在它之前的链接），分块解析无法保证结果相同
+REFERENCE_RE = re.compile(r"^[ \t>]*(?:(?:[-+*]|\d{1,9}[.)])[ \t]+)*\[[^\n]*\]:", re.M)
+
+
+def _line_end(text: str, pos: int) -> int:
+    end = text.find("\n", pos)
+    return len(text) if end < 0 else end
+
+
+def _opaque_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    返回代码围栏和第 1-5 类 HTML 块的 (开始, 结束) 位置，它们内部的空行不是块的边界。
+
+    这里只按行首识别，不追踪列表、引用等容器，可能把容器内的围栏也当作顶层围栏，
+    或者反过来；这只会让切分更保守，或者由 _convert_chunk 的检查发现并回退到整体转换。
+    """
+    spans = []
+    pos = 0
+    while True:
+        match = OPENER_RE.search(text, pos)
+        if match is None:
+            return spans
+        line_end = _line_end(text, match.end())
+        fence = match.group("fence")
+        if fence:
+            if fence[0] == "`" and "`" in match.group("info"):
+                pos = line_end  # 行内代码，不是围栏
+                continue
+            closer = re.compile(r"^ {0,3}%s{%d,}[ \t]*$" % (re.escape(fence[0]), len(fence)), re.M)
+            close = closer.search(text, line_end + 1)
+        else:
+            other = match.group("other")
+            if other is None:
+                close = HTML_TAG_END_RE.search(text, match.start())
+            else:
+                close = re.compile(re.escape(HTML_ENDS.get(other, ">"))).search(text, match.start())
+        end = _line_end(text, close.end()) if close else len(text)
+        spans.append((match.start(), end))
+        pos = end
+
+
+def split_markdown(text: str, chunk_size: int) -> List[str]:
+    """
+    在顶层块的边界处把 Markdown 切成大约 chunk_size 字符的块，"".join(结果) == text。
+    切分点总是在空行之后，不会落在代码围栏、HTML 块、列表、引用或表格内部。
+    """
+    spans = _opaque_spans(text)
+    starts = [start for start, _ in spans]
+    chunks = []
+    start = 0
+    while len(text) - start > chunk_size:
+        pos = start + chunk_size
+        cut = None
+        while cut is None:
+            match = BOUNDARY_RE.search(text, pos)
+            if match is None:
+                break
+            cut = match.end()
+            # 在 cut 之前开始的最后一个围栏 / HTML 块是否包含 cut
+            index = bisect.bisect_left(starts, cut) - 1
+            if index >= 0 and spans[index][1] > cut:
+                pos, cut = spans[index][1], None
+        if cut is None:
+            break
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def _convert_chunk(task: Tuple[str, bool]) -> Optional[Tuple[int, str]]:
+    """
+    工作进程入口：转换一块，返回 (顶层块数, 用 "\\n\\n" 连接的各块输出)。
+
+    不是最后一块时检查它是否以未闭合的代码围栏或 HTML 块结束（markdown-it 让它们延伸到输入末尾）：
+    这说明切分点实际落在这样的块内部，返回 None，由调用方回退到整体转换。
+    """
+    chunk, last = task
+    converter = get_default_converter()
+    parser = converter.markdown_parser
+    tokens = parser.tokenize(chunk)
+    if not last:
+        index = _last_top_level_block(tokens)
+        if index is not None:
+            token = tokens[index]
+            if token.type in ("fence", "html_block") and token.map[1] >= chunk.count("\n"):
+                return None
+    blocks = parser.build(tokens).content
+    renderer = converter.typst_renderer
+    return len(blocks), "\n\n".join(renderer.render_block(block) for block in blocks)
+
+
+def parallel_md_to_typ(markdown_text: str, jobs: Optional[int] = None, chunk_size: Optional[int] = None,
+                       executor: Optional[Executor] = None) -> str:
+    """
+    把一个大 Markdown 文档切成顶层块组成的若干块，在进程池中并行解析、渲染，再按顺序拼接。
+    结果与 convert_md_to_typ(markdown_text) 逐字节相同。
+
+    jobs 为工作进程数（默认 CPU 核数），chunk_size 为每块的目标字符数
+    （默认让每个进程分到约 4 块，且不小于 MIN_CHUNK_SIZE）；executor 可以复用已有的进程池。
+    文档含有链接引用定义、切分后不足两块，或检查发现切分点不安全时，在当前进程中整体转换。
+    """
+    jobs = jobs or os.cpu_count() or 1
+    text = NEWLINES_RE.sub("\n", markdown_text)
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, len(text) // (jobs * 4))
+
+    chunks = split_markdown(text, chunk_size) if jobs > 1 and not REFERENCE_RE.search(text) else [text]
+    if len(chunks) < 2:
+        return get_default_converter().md_to_typ(markdown_text)
+
+    tasks = [(chunk, index == len(chunks) - 1) for index, chunk in enumerate(chunks)]
+    if executor is not None:
+        results = list(executor.map(_convert_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_convert_chunk, tasks))
+    if any(result is None for result in results):
+        return get_default_converter().md_to_typ(markdown_text)
+
+    # 各块的输出可以直接当作一个 "块" 交给 StripJoiner：结果与把所有顶层块一起连接再 strip() 相同
+    joiner = StripJoiner()
+    return "".join(joiner.feed(rendered) for count, rendered in results if count)
@@ -0,0 +1,214 @@
+# marktypist/pipe.py
+
+import queue
+import struct
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from .protocol import (
+    MAX_MESSAGE_BYTES, PROTOCOL_VERSION, ProtocolError, decode_message, encode_message, error_response,
+    handle_request,
+)
+
+# marktypist pipe 的分帧方式。消息本身与 protocol 中的请求 / 响应相同：
+#   ndjson  每条消息一行 JSON，以 "\n" 结尾
+#   length  4 字节大端无符号整数（JSON 的字节数），后面紧跟 UTF-8 JSON，没有分隔符
+FRAMINGS = ("ndjson", "length")
+LENGTH_PREFIX = struct.Struct(">I")
+
+# 使用工作进程时，每个进程最多积压这么多个尚未写出响应的请求
+PENDING_PER_WORKER = 8
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frames(stream: BinaryIO, framing: str = "ndjson") -> Iterator[bytes]:
+    """从二进制流中逐个读出消息（不含分帧）。分帧错误（超长、截断）抛出 ProtocolError，之后的数据无法再分帧。"""
+    if framing == "ndjson":
+        while True:
+            line = stream.readline(MAX_MESSAGE_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_MESSAGE_BYTES:
+                raise ProtocolError("message too large")
+            if line.strip():
+                yield line
+    elif framing == "length":
+        while True:
+            header = _read_exact(stream, LENGTH_PREFIX.size)
+            if not header:
+                return
+            if len(header) < LENGTH_PREFIX.size:
+                raise ProtocolError("truncated length prefix")
+            (length,) = LENGTH_PREFIX.unpack(header)
+            if length > MAX_MESSAGE_BYTES:
+                raise ProtocolError("message too large")
+            payload = _read_exact(stream, length)
+            if len(payload) < length:
+                raise ProtocolError("truncated message")
+            yield payload
+    else:
+        raise ValueError(f"Unknown framing: {framing}")
+
+
+def encode_frame(message: dict, framing: str = "ndjson") -> bytes:
+    line = encode_message(message)
+    if framing == "ndjson":
+        return line
+    payload = line[:-1]
+    return LENGTH_PREFIX.pack(len(payload)) + payload
+
+
+def _done(response: dict) -> Future:
+    future: Future = Future()
+    future.set_result(response)
+    return future
+
+
+class PipeProcessor:
+    """
+    marktypist pipe：从一个流读取分帧的转换请求，把响应按同样的分帧写入另一个流。
+
+    一个长期运行的子进程可以处理任意多个文档，转换器只构建一次。workers > 1 时转换在预热过的进程池中并行进行，
+    一个写出线程负责输出：ordered=True 时响应顺序与请求相同，否则每个响应在完成时立即写出
+    （客户端按 "id" 匹配）。积压的请求有上限，客户端写得比转换快时读取会暂停。
+
+    除了转换请求，还支持 {"op": "ping"}，以及 {"op": "shutdown"}（写出所有响应后结束，与输入结束相同）。
+    """
+    def __init__(self, target: BinaryIO, framing: str = "ndjson", workers: int = 1, ordered: bool = True):
+        if framing not in FRAMINGS:
+            raise ValueError(f"Unknown framing: {framing}")
+        self.target = target
+        self.framing = framing
+        self.workers = workers
+        self.ordered = ordered
+        self.requests = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # (响应的 Future, 请求, 是否占用了积压名额)；请求用于在工作进程失败时给出带 "id" 的错误响应
+        self._responses: "queue.Queue[Optional[Tuple[Future, dict, bool]]]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(workers * PENDING_PER_WORKER)
+        self._broken = False
+
+    def run(self, source: BinaryIO) -> int:
+        """处理 source 中的全部请求，返回转换请求的个数。"""
+        if self.workers <= 1:
+            for request, response in self._iter_requests(source):
+                self._write(handle_request(request) if response is None else response)
+            return self.requests
+
+        from .server import _warm_up
+
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        writer = threading.Thread(target=self._write_responses, name="marktypist-pipe-writer")
+        writer.start()
+        try:
+            for request, response in self._iter_requests(source):
+                if response is None:
+                    # 转换请求占用一个积压名额，写出响应后由写出线程归还
+                    self._slots.acquire()
+                    entry = (self._submit(request), request, True)
+                else:
+                    entry = (_done(response), request, False)
+                if self.ordered:
+                    self._responses.put(entry)
+                else:
+                    entry[0].add_done_callback(lambda _, entry=entry: self._responses.put(entry))
+        finally:
+            self._executor.shutdown()
+            self._responses.put(None)
+            writer.join()
+            self._executor = None
+        return self.requests
+
+    def _submit(self, request: dict) -> Future:
+        """
+        把转换请求交给工作进程。某个工作进程异常退出（段错误、被 OOM 杀死等）后进程池不再接受任务，
+        这时本请求得到带 "id" 的错误响应，并换一个新的进程池处理之后的请求。
+        """
+        try:
+            return self._executor.submit(handle_request, request)
+        except (BrokenProcessPool, RuntimeError) as e:
+            from .server import _warm_up
+
+            self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+            return _done(error_response(request, f"{type(e).__name__}: {e}"))
+
+    def _iter_requests(self, source: BinaryIO) -> Iterator[Tuple[dict, Optional[dict]]]:
+        """
+        逐个读取请求，产出 (请求, 响应)。转换请求的响应为 None，由调用方转换；
+        其他操作和格式错误的请求直接给出响应。
+        """
+        try:
+            for frame in read_frames(source, self.framing):
+                if self._broken:
+                    return
+                try:
+                    request = decode_message(frame)
+                except ProtocolError as e:
+                    yield {}, error_response(None, f"ProtocolError: {e}")
+                    continue
+
+                op = request.get("op", "convert")
+                if op == "convert":
+                    self.requests += 1
+                    yield request, None
+                    continue
+                if op == "ping":
+                    response = {"ok": True, "version": PROTOCOL_VERSION, "workers": self.workers,
+                                "requests": self.requests}
+                elif op == "shutdown":
+                    response = {"ok": True}
+                else:
+                    yield request, error_response(request, f"ProtocolError: Unknown op: {op!r}")
+                    continue
+                if "id" in request:
+                    response["id"] = request["id"]
+                yield request, response
+                if op == "shutdown":
+                    return
+        except ProtocolError as e:
+            # 分帧错误之后无法找到下一条消息的开始，报告后结束
+            yield {}, error_response(None, f"ProtocolError: {e}")
+
+    def _write_responses(self) -> None:
+        while True:
+            entry = self._responses.get()
+            if entry is None:
+                return
+            future, request, acquired = entry
+            try:
+                response = future.result()
+            except Exception as e:
+                # 工作进程异常退出等：handle_request 自身不会抛出异常
+                response = error_response(request, f"{type(e).__name__}: {e}")
+            if not self._broken:
+                self._write(response)
+            if acquired:
+                self._slots.release()
+
+    def _write(self, response: dict) -> None:
+        try:
+            self.target.write(encode_frame(response, self.framing))
+            # 客户端可能在等待这个响应之后才发送下一个请求
+            self.target.flush()
+        except BrokenPipeError:
+            self._broken = True
+
+
+def run_pipe(source: BinaryIO, target: BinaryIO, framing: str = "ndjson", workers: int = 1,
+             ordered: bool = True) -> int:
+    """参见 PipeProcessor。返回转换请求的个数。"""
+    return PipeProcessor(target, framing, workers, ordered).run(source)
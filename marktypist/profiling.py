@@ -0,0 +1,190 @@
+# marktypist/profiling.py
+
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields, is_dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Sequence
+
+# cProfile 与 tracemalloc（它会导入 pickle）只在启用对应功能时导入
+if TYPE_CHECKING:
+    import cProfile
+
+    from markdown_it.token import Token
+
+
+@dataclass
+class StageStats:
+    """一个阶段的统计：耗时、处理的条目数（token / 节点 / 字符）以及峰值内存（开启内存统计时）。"""
+    name: str
+    seconds: float = 0.0
+    count: Optional[int] = None
+    unit: str = ""
+    peak_bytes: Optional[int] = None
+
+    def __str__(self) -> str:
+        line = f"  {self.name:<10} {self.seconds * 1000:>10.2f} ms"
+        if self.count is not None:
+            line += f" {self.count:>12,} {self.unit}"
+        if self.peak_bytes is not None:
+            line += f"  peak {self.peak_bytes / 1024 / 1024:.1f} MB"
+        return line
+
+
+@dataclass
+class ConversionProfile:
+    """一次转换（一个输入）的各阶段统计。"""
+    direction: str
+    source: Optional[str] = None
+    seconds: float = 0.0
+    stages: List[StageStats] = field(default_factory=list)
+    pstats_path: Optional[Path] = None
+
+    def stage(self, name: str) -> Optional[StageStats]:
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    def __str__(self) -> str:
+        title = f"Profile {self.direction}" + (f" {self.source}" if self.source else "")
+        lines = [f"{title}: {self.seconds * 1000:.2f} ms total", *(str(stage) for stage in self.stages)]
+        if self.pstats_path:
+            lines.append(f"  pstats: {self.pstats_path}")
+        return "\n".join(lines)
+
+
+_profiler: ContextVar[Optional["Profiler"]] = ContextVar("marktypist_profiler", default=None)
+_current_run: ContextVar[Optional[ConversionProfile]] = ContextVar("marktypist_profile_run", default=None)
+
+
+def get_profiler() -> Optional["Profiler"]:
+    """返回当前上下文中启用的 Profiler；没有启用时返回 None（这是唯一的额外开销）。"""
+    return _profiler.get()
+
+
+class Profiler:
+    """
+    可选的转换插桩。在 with 块中进行的每次转换都会记录为一个 ConversionProfile：
+
+        with Profiler(callback=print) as profiler:
+            convert_md_to_typ(text)
+        profiler.profiles[0].stage("tokenize").count
+
+    Markdown -> Typst 分为 tokenize（markdown-it）、build（构建 UDM）和 render 三个阶段，
+    Typst -> Markdown 分为 parse 和 render；convert_file 另外记录 read，流式转换整体记为 stream。
+
+    * callback：每次转换结束时以 ConversionProfile 调用；
+    * memory=True：用 tracemalloc 统计每个阶段的峰值内存（会显著拖慢转换，耗时仅供参考；
+      Python 3.8 没有 tracemalloc.reset_peak，峰值是从转换开始累计的）；
+    * pstats_dir：为每次转换保存一个 cProfile 的 .pstats 文件。
+
+    启用状态保存在 ContextVar 中，只影响当前线程（和当前 asyncio 任务）中的转换。
+    """
+    def __init__(self, callback: Optional[Callable[[ConversionProfile], None]] = None,
+                 memory: bool = False, pstats_dir: Optional[Path] = None):
+        self.callback = callback
+        self.memory = memory
+        self.pstats_dir = Path(pstats_dir) if pstats_dir else None
+        self.profiles: List[ConversionProfile] = []
+        self._tokens: List = []
+
+    def __enter__(self) -> "Profiler":
+        self._tokens.append(_profiler.set(self))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _profiler.reset(self._tokens.pop())
+
+    @contextmanager
+    def conversion(self, direction: str, source=None) -> Iterator[ConversionProfile]:
+        """记录一次转换。嵌套调用（例如 convert_file 内部的解析）归入外层的转换。"""
+        run = _current_run.get()
+        if run is not None:
+            yield run
+            return
+
+        run = ConversionProfile(direction, str(source) if source is not None else None)
+        token = _current_run.set(run)
+        started_tracing = False
+        if self.memory:
+            import tracemalloc
+            started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = None
+        if self.pstats_dir:
+            import cProfile
+            profile = cProfile.Profile()
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield run
+        finally:
+            if profile:
+                profile.disable()
+            run.seconds = time.perf_counter() - start
+            if started_tracing:
+                tracemalloc.stop()
+            _current_run.reset(token)
+            if profile:
+                run.pstats_path = self._dump(profile, run)
+            self.profiles.append(run)
+            if self.callback:
+                self.callback(run)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """记录当前转换中的一个阶段。调用方可以在 with 块结束后设置 count。"""
+        stats = StageStats(name)
+        tracing = False
+        if self.memory:
+            import tracemalloc
+            tracing = tracemalloc.is_tracing()
+        if tracing:
+            baseline = tracemalloc.get_traced_memory()[0]
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - start
+            if tracing:
+                stats.peak_bytes = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+            run = _current_run.get()
+            if run is not None:
+                run.stages.append(stats)
+
+    def _dump(self, profile: "cProfile.Profile", run: ConversionProfile) -> Path:
+        self.pstats_dir.mkdir(parents=True, exist_ok=True)
+        name = Path(run.source).name if run.source else run.direction.replace(">", "")
+        path = self.pstats_dir / f"{len(self.profiles):04d}-{name}.pstats"
+        profile.dump_stats(path)
+        return path
+
+
+def stage(name: str):
+    """当前启用了 Profiler 时记录一个阶段，否则什么也不做。"""
+    profiler = _profiler.get()
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+def count_tokens(tokens: Sequence["Token"]) -> int:
+    """markdown-it token 总数，包括内联 token。"""
+    return len(tokens) + sum(len(token.children) for token in tokens if token.children)
+
+
+def count_nodes(node) -> int:
+    """UDM 子树中的节点总数。"""
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        count += 1
+        for f in fields(node):
+            value = getattr(node, f.name)
+            if isinstance(value, list):
+                pending.extend(item for item in value if is_dataclass(item))
+            elif is_dataclass(value):
+                pending.append(value)
+    return count
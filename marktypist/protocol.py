@@ -0,0 +1,124 @@
+# marktypist/protocol.py
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Optional
+
+# marktypist serve 使用的消息格式：每条消息是一行 JSON（NDJSON，UTF-8，以 "\n" 结尾）。
+#
+# 请求：
+#     {"id": 1, "direction": "md->typ", "text": "# Title"}          转换文本，响应带 "text"
+#     {"id": 2, "input": "/abs/doc.md", "output": "/abs/doc.typ"}   转换文件（方向由后缀决定），
+#                                                                   不给 output 时响应带 "text"
+#     可选字段："typst_parser"（"regex" / "lark"）、"stream"（bool）、
+#     "cache"（[缓存目录, 大小上限字节数]，响应带 "cached"）
+#     {"op": "ping"} / {"op": "shutdown"}
+#
+# 响应：
+#     {"id": 1, "ok": true, "text": "= Title"}
+#     {"id": 1, "ok": false, "error": "ValueError: ..."}
+#     ping 的响应带 "version"（PROTOCOL_VERSION）和 "code"（服务加载的源码的 code_fingerprint()），
+#     marktypist convert 只把请求交给两者都与自己相同的服务
+#
+# "id" 原样返回，客户端可以用它匹配请求与响应。文件路径由服务进程直接读写，
+# 因此应当使用绝对路径。
+#
+# marktypist pipe 在 stdin/stdout 上使用同样的消息，也可以用长度前缀分帧，参见 pipe.py。
+PROTOCOL_VERSION = 1
+
+# 单条消息（一行）的大小上限
+MAX_MESSAGE_BYTES = 512 * 1024 * 1024
+
+
+class ProtocolError(ValueError):
+    """请求格式错误。"""
+
+
+def encode_message(message: dict) -> bytes:
+    # JSON 字符串中的换行都被转义，消息本身不会包含 "\n"
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes) -> dict:
+    try:
+        message = json.loads(line)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid JSON message: {e}") from None
+    if not isinstance(message, dict):
+        raise ProtocolError("A message must be a JSON object")
+    return message
+
+
+def default_socket_path() -> Path:
+    """MARKTYPIST_SOCKET，或者 $XDG_RUNTIME_DIR（没有时为临时目录）下的 marktypist.sock。"""
+    configured = os.environ.get("MARKTYPIST_SOCKET")
+    if configured:
+        return Path(configured)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "marktypist.sock"
+    # 不使用 tempfile.gettempdir()：客户端要尽量少导入模块
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(os.environ.get("TMPDIR", "/tmp")) / f"marktypist-{uid}.sock"
+
+
+def code_fingerprint() -> str:
+    """
+    marktypist 源码（各个 .py 和语法文件的名字、大小、修改时间）的指纹。升级或者修改源码之后，
+    仍在运行的旧服务的指纹与新的客户端不同。只 stat 文件，不读取内容，也不导入 importlib.metadata。
+    """
+    package = Path(__file__).parent
+    entries = []
+    for directory in (package, package / "grammar"):
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith((".py", ".lark")):
+                    st = entry.stat()
+                    entries.append(f"{entry.name}:{st.st_size}:{st.st_mtime_ns}")
+    return f"{zlib.crc32(chr(0).join(sorted(entries)).encode()):08x}"
+
+
+def _convert(request: dict) -> dict:
+    from .main import DIRECTIONS, converter_for
+
+    converter = converter_for(request.get("typst_parser", "regex"))
+    if "input" in request:
+        from .batch import worker_cache
+
+        cache_config = request.get("cache")
+        cache = worker_cache((Path(cache_config[0]), int(cache_config[1]))) if cache_config else None
+        hits = cache.stats.hits if cache else 0
+        output = request.get("output")
+        text = converter.convert_file(Path(request["input"]), Path(output) if output else None,
+                                      stream=bool(request.get("stream")), cache=cache)
+        result = {"cached": bool(cache and cache.stats.hits > hits)}
+        if output is None:
+            result["text"] = text
+        return result
+
+    suffix = next((s for s, d in DIRECTIONS.items() if d == request.get("direction")), None)
+    if suffix is None:
+        raise ProtocolError(f"Unknown direction: {request.get('direction')!r}")
+    if not isinstance(request.get("text"), str):
+        raise ProtocolError("A conversion request needs 'text' or 'input'")
+    return {"text": converter.convert_text(request["text"], suffix)}
+
+
+def handle_request(request: dict) -> dict:
+    """执行一个转换请求并返回响应。转换失败记录在响应中，不抛出异常。"""
+    try:
+        response = {"ok": True, **_convert(request)}
+    except Exception as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    if "id" in request:
+        response["id"] = request["id"]
+    return response
+
+
+def error_response(request: Optional[dict], error: str) -> dict:
+    response = {"ok": False, "error": error}
+    if request and "id" in request:
+        response["id"] = request["id"]
+    return response
@@ -0,0 +1,77 @@
+# marktypist/reader.py
+
+import codecs
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator
+
+# 不小于这个大小的文件通过 mmap 读取，更小的文件直接读入内存
+MMAP_THRESHOLD = 8 * 1024 * 1024
+# 每次增量解码的字节数
+DECODE_CHUNK = 1024 * 1024
+
+# str.splitlines() 认作换行的字符
+LINE_BREAKS = frozenset("\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+def iter_source_lines(path: Path, chunk_size: int = DECODE_CHUNK) -> Iterator[str]:
+    """
+    逐行读取 UTF-8 文件，产出不含换行符的行，结果与
+    ``path.read_text(encoding="utf-8-sig").splitlines()`` 完全相同，但不会在内存中构建整个文件的
+    字符串和行列表：
+
+    * 大文件通过 mmap 映射，按 chunk_size 字节增量解码，解码器直接读取映射的内存（memoryview 切片，
+      没有中间的 bytes 副本）；已经处理过的页面随即交还给操作系统（MADV_DONTNEED），
+      常驻内存与文件大小无关；
+    * 开头的 BOM 通过起始偏移跳过，不复制数据。
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size >= MMAP_THRESHOLD else None
+        buffer = mapped if mapped is not None else f.read()
+
+    release = getattr(mmap, "MADV_DONTNEED", None) if mapped is not None else None
+    released = 0
+    view = memoryview(buffer)
+    try:
+        offset = len(codecs.BOM_UTF8) if view[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pending = ""
+        # 上一块以 "\r" 结尾时，下一块开头的 "\n" 属于同一个 "\r\n"
+        skip_newline = False
+        while offset < size:
+            end = min(offset + chunk_size, size)
+            text = decoder.decode(view[offset:end], end == size)
+            offset = end
+            if release is not None:
+                # 只释放已经完整解码的页面
+                boundary = end // mmap.PAGESIZE * mmap.PAGESIZE
+                if boundary > released:
+                    mapped.madvise(release, released, boundary - released)
+                    released = boundary
+            if not text:
+                continue
+            if skip_newline and text[0] == "\n":
+                text = text[1:]
+            skip_newline = False
+            text = pending + text
+            pending = ""
+            if not text:
+                continue
+
+            lines = text.splitlines()
+            last = text[-1]
+            if last not in LINE_BREAKS and end < size:
+                # 最后一行还不完整，与下一块拼接
+                pending = lines.pop()
+            skip_newline = last == "\r"
+            yield from lines
+        if pending:
+            yield pending
+    finally:
+        view.release()
+        if mapped is not None:
+            mapped.close()
@@ -0,0 +1,49 @@
+# marktypist/renderers.py
+
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+
+# 输出格式名 -> (输出文件后缀, 渲染器工厂)。工厂是无参数的可调用对象，或者 "模块:类名"（第一次使用时才导入，
+# 不影响 CLI 的启动时间）。渲染器提供 render(document) -> str，可以另外提供 render_to(document, stream)。
+# Converter 为每种格式只创建一个渲染器并在所有转换间共享，因此渲染器应当是无状态的。
+_RENDERERS: Dict[str, Tuple[str, Union[str, Callable]]] = {
+    "typst": (".typ", "marktypist.typ_renderer:TypstRenderer"),
+    "markdown": (".md", "marktypist.md_renderer:MarkdownRenderer"),
+}
+
+
+def register_renderer(name: str, suffix: str, factory: Union[str, Callable]) -> None:
+    """
+    注册一种输出格式（同名的格式被替换）。之后 Converter.render_many 和 marktypist convert 的多个 -o
+    都可以使用它，例如：
+
+        register_renderer("html", ".html", HtmlRenderer)
+    """
+    if not suffix.startswith("."):
+        raise ValueError(f"Suffix must start with '.': {suffix!r}")
+    _RENDERERS[name] = (suffix.lower(), factory)
+
+
+def renderer_formats() -> List[str]:
+    return list(_RENDERERS)
+
+
+def format_for_path(path: Path) -> str:
+    """按输出文件的后缀选择输出格式（多个格式使用同一后缀时取先注册的）。"""
+    suffix = path.suffix.lower()
+    for name, (format_suffix, _) in _RENDERERS.items():
+        if format_suffix == suffix:
+            return name
+    raise ValueError(f"Unsupported output file format: {path.suffix}")
+
+
+def create_renderer(name: str):
+    try:
+        _, factory = _RENDERERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {name}") from None
+    if isinstance(factory, str):
+        module_name, _, attribute = factory.partition(":")
+        factory = getattr(importlib.import_module(module_name), attribute)
+    return factory()
@@ -0,0 +1,285 @@
+# marktypist/serialize.py
+
+import json
+import operator
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import fields, is_dataclass
+from typing import BinaryIO, Iterator, List, Union
+
+from .arena import (
+    BLOCK_QUOTE, BOLD, CODE, CODE_BLOCK, HEADING, IMAGE, ITALIC, LINK, LIST_ITEM, ORDERED_LIST, PARAGRAPH, TABLE,
+    TABLE_CELL, TABLE_ROW, TEXT, UNORDERED_LIST, NodeArena,
+)
+from .model import (
+    Document, BlockElement, Text, Bold, Italic, Code, Link, Image, Heading, Paragraph, UnorderedList,
+    OrderedList, ListItem, CodeBlock, BlockQuote, Table, TableRow, TableCell
+)
+
+# 二进制格式（小端）：
+#   头部   "MTUD"、格式版本 (u8)、标志 (u8)、保留 (u16，必须为 0)、节点数 n (u32)、文本的 UTF-8 字节数 (u64)、
+#          头部之后全部内容的 CRC-32 (u32)
+#   数组   NodeArena 的 kind (u8 × n)、parent (i32 × n)、end (i32 × n)、value (i32 × n)、stop (u32 × n)
+#   文本   NodeArena.text 的 UTF-8 编码
+# start 不保存：start[i] 等于 stop[i - 1]。读取时整块复制进数组，再用一次循环检查树的结构（_check_arena），
+# 损坏或伪造的数据总是得到 SerializationError，而不是其他异常或者一棵错误的树。
+# 标志 FLAG_ZLIB 表示头部之后的内容整体用 zlib 压缩（体积约为四分之一，编解码各多几十毫秒每 MB）。
+# 格式改变时增加 FORMAT_VERSION；读取不认识的版本会抛出 SerializationError。
+MAGIC = b"MTUD"
+FORMAT_VERSION = 2
+FLAG_ZLIB = 1
+_HEADER = struct.Struct("<4sBBHIQI")
+_ARRAYS = (("kind", "B"), ("parent", "i"), ("end", "i"), ("value", "i"), ("stop", "I"))
+
+JSON_FORMAT = "marktypist-udm"
+JSON_VERSION = 1
+
+# 没有子节点的节点种类
+_LEAF_KINDS = frozenset((TEXT, CODE, IMAGE, CODE_BLOCK))
+_BLOCK_KINDS = frozenset((PARAGRAPH, HEADING, UNORDERED_LIST, ORDERED_LIST, CODE_BLOCK, BLOCK_QUOTE, TABLE))
+_INLINE_KINDS = frozenset((TEXT, BOLD, ITALIC, CODE, LINK, IMAGE))
+# 各种节点允许的子节点种类（与 model 中的字段类型一致），以种类为下标
+_CHILD_KINDS = (
+    _BLOCK_KINDS,                   # DOCUMENT
+    _INLINE_KINDS,                  # PARAGRAPH
+    _INLINE_KINDS,                  # HEADING
+    frozenset((LIST_ITEM,)),        # UNORDERED_LIST
+    frozenset((LIST_ITEM,)),        # ORDERED_LIST
+    _BLOCK_KINDS,                   # LIST_ITEM
+    frozenset(),                    # CODE_BLOCK
+    _BLOCK_KINDS,                   # BLOCK_QUOTE
+    frozenset((TABLE_ROW,)),        # TABLE
+    frozenset((TABLE_CELL,)),       # TABLE_ROW
+    _INLINE_KINDS,                  # TABLE_CELL
+    frozenset(),                    # TEXT
+    _INLINE_KINDS,                  # BOLD
+    _INLINE_KINDS,                  # ITALIC
+    frozenset(),                    # CODE
+    _INLINE_KINDS,                  # LINK
+    frozenset(),                    # IMAGE
+)
+
+_NODE_TYPES = {cls.__name__: cls for cls in (
+    Document, Text, Bold, Italic, Code, Link, Image, Heading, Paragraph, UnorderedList, OrderedList,
+    ListItem, CodeBlock, BlockQuote, Table, TableRow, TableCell,
+)}
+
+
+class SerializationError(ValueError):
+    """数据不是（这个版本的）序列化 UDM。"""
+
+
+def _little_endian(data: array) -> array:
+    if sys.byteorder == "big" and data.itemsize > 1:
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data
+
+
+# --- 二进制格式 ---
+
+def dumps_arena(arena: NodeArena, compress: bool = False) -> bytes:
+    """把 NodeArena 编码为二进制格式。compress=True 时用 zlib（最快的级别）压缩。"""
+    text = arena.text.encode("utf-8", "surrogatepass")
+    parts = []
+    for name, typecode in _ARRAYS:
+        data = getattr(arena, name)
+        if data.typecode != typecode:
+            try:
+                data = array(typecode, data)
+            except OverflowError:
+                raise SerializationError(f"document too large to serialize ({name} out of range)") from None
+        parts.append(_little_endian(data).tobytes())
+    parts.append(text)
+    body = b"".join(parts)
+    if compress:
+        body = zlib.compress(body, 1)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_ZLIB if compress else 0, 0, len(arena), len(text),
+                          zlib.crc32(body))
+    return header + body
+
+
+def loads_arena(data: bytes) -> NodeArena:
+    """解码 dumps / dumps_arena 的结果，得到 NodeArena：只复制几个数组并检查结构，不创建节点对象。"""
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise SerializationError("truncated header")
+    magic, version, flags, reserved, count, text_size, checksum = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise SerializationError("not a serialized marktypist document")
+    if version != FORMAT_VERSION:
+        raise SerializationError(f"unsupported format version {version} (expected {FORMAT_VERSION})")
+    if flags & ~FLAG_ZLIB or reserved:
+        raise SerializationError(f"unknown flags {flags:#x}/{reserved:#x}")
+
+    offset = _HEADER.size
+    expected = sum(array(typecode).itemsize for _, typecode in _ARRAYS) * count + text_size
+    if not flags & FLAG_ZLIB and len(view) - offset != expected:
+        raise SerializationError(f"expected {offset + expected} bytes, got {len(view)}")
+    if zlib.crc32(view[offset:]) != checksum:
+        raise SerializationError("checksum mismatch (corrupt data)")
+    if flags & FLAG_ZLIB:
+        # 最多解压出 expected + 1 个字节：头部中的大小不可信
+        decompressor = zlib.decompressobj()
+        try:
+            view = memoryview(decompressor.decompress(view[offset:], expected + 1))
+        except zlib.error as e:
+            raise SerializationError(f"corrupt compressed data: {e}") from None
+        offset = 0
+        if len(view) != expected or not decompressor.eof:
+            raise SerializationError(f"corrupt compressed data: expected {expected} bytes after decompression")
+
+    arena = NodeArena()
+    for name, typecode in _ARRAYS:
+        values = array(typecode)
+        size = values.itemsize * count
+        values.frombytes(view[offset:offset + size])
+        offset += size
+        setattr(arena, name, _little_endian(values))
+    arena.stop = array("q", arena.stop)
+    arena.start = array("q", [0]) + arena.stop[:-1] if count else array("q")
+    try:
+        arena.text = str(view[offset:], "utf-8", "surrogatepass")
+    except UnicodeDecodeError as e:
+        raise SerializationError(f"invalid text: {e}") from None
+    _check_arena(arena)
+    return arena
+
+
+def _check_arena(arena: NodeArena) -> None:
+    """
+    检查数组描述的是一棵合法的先序树：种类已知，parent 是包含它的最近的节点，各子树 [i, end[i]) 正确嵌套，
+    每个节点的种类是父节点允许的子节点种类（_CHILD_KINDS），表格至少有表头，文本范围不越界。
+    之后的解码和渲染不会出错。每百万个节点约 0.4 秒。
+    """
+    kinds, parent, end, stop = arena.kind, arena.parent, arena.end, arena.stop
+    child_kinds = _CHILD_KINDS
+    count = len(kinds)
+    if not count:
+        raise SerializationError("no nodes")
+    if max(kinds) > IMAGE:
+        raise SerializationError(f"unknown node kind {max(kinds)}")
+    if stop[-1] > len(arena.text) or any(map(operator.gt, stop, stop[1:])):
+        raise SerializationError("text ranges out of order or out of bounds")
+    if parent[0] != -1 or end[0] != count:
+        raise SerializationError("invalid tree structure at node 0")
+
+    # 尚未结束的节点及其 end
+    open_nodes, open_ends = [0], [count]
+    for node in range(count):
+        if node:
+            while open_ends[-1] <= node:
+                open_nodes.pop()
+                open_ends.pop()
+            node_end = end[node]
+            if parent[node] != open_nodes[-1] or not node < node_end <= open_ends[-1]:
+                raise SerializationError(f"invalid tree structure at node {node}")
+            if kinds[node] not in child_kinds[kinds[open_nodes[-1]]]:
+                raise SerializationError(f"node {node} of kind {kinds[node]} is not allowed "
+                                         f"in node {open_nodes[-1]} of kind {kinds[open_nodes[-1]]}")
+            if node_end > node + 1:
+                open_nodes.append(node)
+                open_ends.append(node_end)
+        kind = kinds[node]
+        if end[node] > node + 1 and kind in _LEAF_KINDS:
+            raise SerializationError(f"leaf node {node} has children")
+        if end[node] == node + 1 and kind == TABLE:
+            raise SerializationError(f"table node {node} has no header row")
+
+
+def dumps(document: Document, compress: bool = False) -> bytes:
+    """把 UDM 文档（或任意 UDM 节点）编码为紧凑的二进制格式。"""
+    return dumps_arena(NodeArena.from_document(document), compress)
+
+
+def loads(data: bytes) -> Document:
+    """解码 dumps 的结果，得到 UDM 文档（dumps 的参数是其他节点时得到那个节点）。"""
+    return loads_arena(data).to_document()
+
+
+def dump(document: Document, stream: BinaryIO, compress: bool = False) -> None:
+    stream.write(dumps(document, compress))
+
+
+def load(stream: BinaryIO) -> Document:
+    return loads(stream.read())
+
+
+class LazyDocument:
+    """
+    loads_lazy 的结果：一个顶层块的序列，每个块在第一次访问时才解码为 UDM 节点（之后缓存）。
+    只需要其中一部分块、或者只需要渲染（arena 可以直接交给 ArenaTypstRenderer）时，不必解码整个文档。
+    """
+    def __init__(self, arena: NodeArena):
+        self.arena = arena
+        self._blocks = list(arena.children(0))
+        self._decoded: List = [None] * len(self._blocks)
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __getitem__(self, index: int) -> BlockElement:
+        block = self._decoded[index]
+        if block is None:
+            block = self._decoded[index] = self.arena.to_node(self._blocks[index])
+        return block
+
+    def __iter__(self) -> Iterator[BlockElement]:
+        for index in range(len(self._blocks)):
+            yield self[index]
+
+    def to_document(self) -> Document:
+        return Document(content=list(self))
+
+
+def loads_lazy(data: bytes) -> LazyDocument:
+    """解码 dumps 的结果，顶层块按需解码，参见 LazyDocument。"""
+    return LazyDocument(loads_arena(data))
+
+
+# --- JSON（便于调试和查看）---
+# {"format": "marktypist-udm", "version": JSON_VERSION, "document": 节点}，节点是 {"type": 类名, 各字段...}。
+# 使用 json 模块，嵌套深度受解释器的递归限制。
+
+def _to_json(value):
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if is_dataclass(value):
+        node = {"type": type(value).__name__}
+        for field in fields(value):
+            node[field.name] = _to_json(getattr(value, field.name))
+        return node
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if isinstance(value, dict):
+        node_type = _NODE_TYPES.get(value.get("type"))
+        if node_type is None:
+            raise SerializationError(f"unknown node type: {value.get('type')!r}")
+        try:
+            return node_type(**{name: _from_json(item) for name, item in value.items() if name != "type"})
+        except TypeError as e:
+            raise SerializationError(f"invalid {value['type']} node: {e}") from None
+    return value
+
+
+def dumps_json(document: Union[Document, BlockElement], indent: int = None) -> str:
+    return json.dumps({"format": JSON_FORMAT, "version": JSON_VERSION, "document": _to_json(document)},
+                      ensure_ascii=False, indent=indent)
+
+
+def loads_json(text: str) -> Document:
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise SerializationError(f"invalid JSON: {e}") from None
+    if not isinstance(data, dict) or data.get("format") != JSON_FORMAT:
+        raise SerializationError("not a serialized marktypist document")
+    if data.get("version") != JSON_VERSION:
+        raise SerializationError(f"unsupported format version {data.get('version')} (expected {JSON_VERSION})")
+    return _from_json(data["document"])
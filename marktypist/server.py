@@ -0,0 +1,163 @@
+# marktypist/server.py
+
+import asyncio
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+from .protocol import (
+    MAX_MESSAGE_BYTES, PROTOCOL_VERSION, ProtocolError, code_fingerprint, decode_message, default_socket_path,
+    encode_message, error_response, handle_request,
+)
+
+
+def _warm_up() -> None:
+    """工作进程的初始化函数：导入并构建默认转换器的解析器和渲染器，第一个请求不必再等待。"""
+    from .main import get_default_converter
+
+    converter = get_default_converter()
+    for name in ("markdown_parser", "typst_parser", "typst_renderer", "markdown_renderer"):
+        getattr(converter, name)
+
+
+class ConversionServer:
+    """
+    常驻的转换服务（marktypist serve）：在 Unix 域套接字上接收 NDJSON 转换请求（参见 protocol）。
+
+    asyncio 负责所有连接，转换本身在工作进程池中执行，多个客户端的请求可以并行转换；
+    同一个连接上的请求按顺序处理，响应顺序与请求相同。工作进程启动时就构建好转换器，
+    之后的每个请求都省去了 Python 启动、导入和构建 MarkdownIt 的时间。
+
+        server = ConversionServer(workers=4)
+        asyncio.run(server.serve_forever())
+    """
+    def __init__(self, socket_path: Optional[Path] = None, workers: Optional[int] = None):
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.workers = workers or os.cpu_count() or 1
+        self.requests = 0
+        # 本进程加载的源码的指纹，通过 ping 告诉客户端（参见 protocol.code_fingerprint）
+        self.code = code_fingerprint()
+        # 套接字开始监听后设置，供其他线程等待服务就绪
+        self.ready = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._clients: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def serve_forever(self) -> None:
+        """监听直到 shutdown()（或收到 {"op": "shutdown"} 请求）。"""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._remove_stale_socket()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.socket_path),
+                                                 limit=MAX_MESSAGE_BYTES)
+        # 请求中可以指定任意的输入、输出路径：只允许本用户连接（客户端也会检查这个权限）
+        os.chmod(self.socket_path, 0o600)
+        try:
+            # 先让每个工作进程启动并完成初始化
+            await asyncio.gather(*(self._loop.run_in_executor(self._executor, _warm_up)
+                                   for _ in range(self.workers)))
+            self.ready.set()
+            await self._stop.wait()
+        finally:
+            server.close()
+            # 空闲的客户端连接不会自己结束：关闭它们，并等待处理连接的任务退出
+            for writer in self._clients:
+                writer.close()
+            await asyncio.gather(*self._clients.values(), return_exceptions=True)
+            await server.wait_closed()
+            self._executor.shutdown()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.ready.clear()
+
+    def shutdown(self) -> None:
+        """停止服务，可以在任意线程中调用。"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def _remove_stale_socket(self) -> None:
+        """删除上一次异常退出留下的套接字文件；已经有服务在监听时报错。"""
+        if not self.socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except OSError:
+            self.socket_path.unlink()
+        else:
+            raise RuntimeError(f"A marktypist server is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    writer.write(encode_message(error_response(None, "ProtocolError: message too large")))
+                    break
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write(encode_message(response))
+                await writer.drain()
+        except ConnectionError:
+            pass  # 客户端提前断开
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def _respond(self, line: bytes) -> dict:
+        try:
+            request = decode_message(line)
+        except ProtocolError as e:
+            return error_response(None, f"ProtocolError: {e}")
+
+        op = request.get("op", "convert")
+        if op == "convert":
+            self.requests += 1
+            executor = self._executor
+            try:
+                return await self._loop.run_in_executor(executor, handle_request, request)
+            except (BrokenProcessPool, RuntimeError) as e:
+                # 工作进程异常退出（段错误、被 OOM 杀死等）后进程池不再可用：
+                # 本请求返回错误，换一个新的进程池处理之后的请求（并发的请求只换一次）
+                if executor is self._executor and not self._stop.is_set():
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+                    executor.shutdown(wait=False)
+                return error_response(request, f"{type(e).__name__}: {e}")
+        if op == "ping":
+            response = {"ok": True, "version": PROTOCOL_VERSION, "code": self.code, "workers": self.workers,
+                        "requests": self.requests}
+        elif op == "shutdown":
+            self._stop.set()
+            response = {"ok": True}
+        else:
+            return error_response(request, f"ProtocolError: Unknown op: {op!r}")
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+
+def run_server(socket_path: Optional[Path] = None, workers: Optional[int] = None) -> None:
+    """在当前线程中运行服务，直到收到 SIGINT / SIGTERM 或 shutdown 请求。"""
+    server = ConversionServer(socket_path, workers)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, server.shutdown)
+        await server.serve_forever()
+
+    asyncio.run(main())
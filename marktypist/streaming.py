@@ -0,0 +1,113 @@
+# marktypist/streaming.py
+
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence
+
+# visitor 从这里导入 StripJoiner，不能在模块级导入 markdown-it
+if TYPE_CHECKING:
+    from markdown_it.token import Token
+
+# 每次至少积累这么多行再交给 markdown-it 解析
+DEFAULT_CHUNK_LINES = 2000
+
+# 与 markdown-it 的换行规范化一致，保证 token.map 中的行号能对应回文本
+NEWLINES_RE = re.compile(r"\r\n?")
+
+
+class StripJoiner:
+    """
+    把逐个到达的顶层块按 "\\n\\n" 连接，并且输出与 "\\n\\n".join(blocks).strip() 完全相同：
+    开头的空白被丢弃，末尾的空白先暂存，直到后面再出现非空白内容才真正输出。
+    """
+    def __init__(self, separator: str = "\n\n"):
+        self.separator = separator
+        self.count = 0
+        self.started = False
+        self.pending = ""
+
+    def feed(self, block: str) -> str:
+        """加入一个块，返回现在可以安全输出的文本（可能为空）。"""
+        piece = self.separator + block if self.count else block
+        self.count += 1
+        if not self.started:
+            piece = piece.lstrip()
+            if not piece:
+                return ""
+            self.started = True
+        body = piece.rstrip()
+        if not body:
+            self.pending += piece
+            return ""
+        out = self.pending + body
+        self.pending = piece[len(body):]
+        return out
+
+
+def _last_top_level_block(tokens: Sequence["Token"]) -> Optional[int]:
+    """返回最后一个顶层块的起始 token 下标。"""
+    for index in range(len(tokens) - 1, -1, -1):
+        token = tokens[index]
+        if token.level == 0 and token.nesting >= 0 and token.map is not None:
+            return index
+    return None
+
+
+def _line_offset(text: str, line: int) -> int:
+    """返回第 line 行（从 0 开始）在 text 中的起始位置。"""
+    offset = 0
+    for _ in range(line):
+        offset = text.index("\n", offset) + 1
+    return offset
+
+
+def iter_md_to_typ(lines: Iterable[str], converter=None, chunk_lines: int = DEFAULT_CHUNK_LINES) -> Iterator[str]:
+    """
+    流式地把 Markdown 转换为 Typst，逐段产出输出文本。
+
+    lines 是带换行符的文本片段序列（通常是打开的文件对象，每次一行）。每积累 chunk_lines 行就用
+    markdown-it 解析一次：除了最后一个顶层块之外的所有块都已经闭合，后续输入
+    不可能再改变它们，于是立刻构建 UDM、渲染并产出；最后一个块（可能还会被后续行
+    延续，例如列表或段落）的源码行保留到下一轮重新解析。
+
+    "".join(iter_md_to_typ(lines)) 与 convert_md_to_typ("".join(lines)) 逐字节相同，
+    内存占用只与 chunk_lines 和单个顶层块的大小有关，与文档总大小无关。
+    唯一的例外是链接引用定义：markdown-it 的 env 在各轮之间共享，
+    因此引用定义必须出现在使用它的链接之前（向前引用在流式模式下不会被解析）。
+    """
+    if converter is None:
+        from .main import get_default_converter
+        converter = get_default_converter()
+    parser = converter.markdown_parser
+    renderer = converter.typst_renderer
+
+    joiner = StripJoiner()
+    env: dict = {}
+    buffer: List[str] = []
+    buffered_lines = 0
+    window = chunk_lines
+
+    def emit(tokens: Sequence["Token"]) -> Iterator[str]:
+        for block in parser.build(tokens).content:
+            out = joiner.feed(renderer.render_block(block))
+            if out:
+                yield out
+
+    for line in lines:
+        buffer.append(line)
+        buffered_lines += 1
+        if buffered_lines < window:
+            continue
+
+        text = NEWLINES_RE.sub("\n", "".join(buffer))
+        tokens = parser.tokenize(text, env)
+        last = _last_top_level_block(tokens)
+        if last:
+            yield from emit(tokens[:last])
+            text = text[_line_offset(text, tokens[last].map[0]):]
+        buffer = [text]
+        buffered_lines = text.count("\n")
+        # 如果一个块跨越了整个窗口，就扩大窗口，避免对同一段文本反复重新解析
+        window = max(chunk_lines, 2 * buffered_lines)
+
+    if buffer:
+        yield from emit(parser.tokenize("".join(buffer), env))
@@ -0,0 +1,232 @@
+# marktypist/typ_lark_parser.py
+
+import re
+import threading
+from typing import List, Optional
+
+from lark import Lark, Token, Transformer
+from lark.exceptions import UnexpectedInput
+
+from .grammar import load_lalr_parser
+from .model import (
+    Document, InlineElement, Text, Bold, Italic, Code, Link, Image,
+    Heading, Paragraph, UnorderedList, OrderedList, ListItem, CodeBlock, BlockQuote,
+    Table, TableRow, TableCell
+)
+
+ESCAPE_PATTERN = re.compile(r'\\(.)')
+STRING_ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+IMAGE_SRC_PATTERN = re.compile(r'#image\(\s*"((?:[^"\\]|\\.)*)"')
+IMAGE_ALT_PATTERN = re.compile(r'\balt\s*:\s*"((?:[^"\\]|\\.)*)"')
+RAW_BLOCK_PATTERN = re.compile(r'[ \t]*```([^`\n]*)\n([\s\S]*?)\n?[ \t]*```\Z')
+
+
+def _unescape_markup(text: str) -> str:
+    return ESCAPE_PATTERN.sub(r'\1', text)
+
+
+def _unescape_string(literal: str) -> str:
+    """去掉 Typst 字符串字面量的引号并处理转义。"""
+    return ESCAPE_PATTERN.sub(lambda m: STRING_ESCAPES.get(m.group(1), m.group(1)), literal[1:-1])
+
+
+def _coalesce(nodes: List[InlineElement]) -> List[InlineElement]:
+    """合并相邻的 Text 节点。"""
+    result: List[InlineElement] = []
+    for node in nodes:
+        if isinstance(node, Text) and result and isinstance(result[-1], Text):
+            result[-1] = Text(content=result[-1].content + node.content)
+        else:
+            result.append(node)
+    return result
+
+
+def _strip_line(nodes: List[InlineElement]) -> List[InlineElement]:
+    """去掉一行内联内容首尾的空白（行首缩进和行尾空格）。"""
+    if nodes and isinstance(nodes[0], Text):
+        nodes[0] = Text(content=nodes[0].content.lstrip())
+    if nodes and isinstance(nodes[-1], Text):
+        nodes[-1] = Text(content=nodes[-1].content.rstrip())
+    return [node for node in nodes if not (isinstance(node, Text) and not node.content)]
+
+
+class UdmTransformer(Transformer):
+    """
+    将 typst.lark 的语法树直接转换为 UDM 节点。
+    它作为 transformer 传给 LALR 解析器，在归约时即时调用，不会先构建完整的语法树。
+    """
+    # --- 内联元素 ---
+    def _inline_nodes(self, children) -> List[InlineElement]:
+        nodes: List[InlineElement] = []
+        for child in children:
+            if isinstance(child, Token):
+                if child.type == "TEXT":
+                    nodes.append(Text(content=_unescape_markup(child)))
+                elif child.type == "RAW_INLINE":
+                    nodes.append(Code(content=child[1:-1]))
+                elif child.type == "IMAGE":
+                    nodes.append(self._image(child))
+                # STAR / UNDERSCORE / 方括号等分隔符本身不产生节点
+            elif isinstance(child, list):
+                nodes.extend(child)
+            elif child is not None:
+                nodes.append(child)
+        return _coalesce(nodes)
+
+    def _image(self, token: Token) -> Image:
+        src = IMAGE_SRC_PATTERN.match(token)
+        alt = IMAGE_ALT_PATTERN.search(token)
+        return Image(
+            src=_unescape_string(f'"{src.group(1)}"') if src else "",
+            alt=_unescape_string(f'"{alt.group(1)}"') if alt else "",
+        )
+
+    def inline(self, children):
+        return self._inline_nodes(children)
+
+    def strong(self, children):
+        content = self._inline_nodes(children)
+        # Typst 的粗斜体 *_..._* 与 TypstParser 保持一致，表示为 Italic(Bold(...))
+        if len(content) == 1 and isinstance(content[0], Italic):
+            return Italic(content=[Bold(content=content[0].content)])
+        return Bold(content=content)
+
+    def emph(self, children):
+        return Italic(content=self._inline_nodes(children))
+
+    def link(self, children):
+        url = _unescape_string(children[0][len("#link("):-1])
+        content = self._inline_nodes(children[1:])
+        return Link(url=url, content=content or [Text(content=url)])
+
+    def bracket(self, children):
+        # 没有特殊含义的方括号按原样保留为文本
+        return [Text(content="["), *self._inline_nodes(children[1:-1]), Text(content="]")]
+
+    # --- 块级元素 ---
+    def start(self, children):
+        return Document(content=children)
+
+    def heading(self, children):
+        mark, content = children
+        return Heading(level=mark.count("="), content=_strip_line(content or []))
+
+    def para_line(self, children):
+        return _strip_line(children[0])
+
+    def paragraph(self, lines):
+        # 段落内的换行在 Typst 中等价于空白，这里保留为软换行
+        content: List[InlineElement] = []
+        for line in lines:
+            if content:
+                content.append(Text(content="\n"))
+            content.extend(line)
+        return Paragraph(content=_coalesce(content))
+
+    def _list_item(self, content) -> ListItem:
+        return ListItem(content=[Paragraph(content=_strip_line(content or []))])
+
+    def ulist_item(self, children):
+        return self._list_item(children[1])
+
+    def ulist(self, items):
+        return UnorderedList(items=items)
+
+    def olist_item(self, children):
+        mark = children[0].strip()
+        number = int(mark[:-1]) if mark.endswith(".") else None
+        return number, self._list_item(children[1])
+
+    def olist(self, items):
+        start = items[0][0] or 1
+        return OrderedList(start=start, items=[item for _, item in items])
+
+    def raw_block(self, children):
+        match = RAW_BLOCK_PATTERN.match(children[0])
+        return CodeBlock(language=match.group(1).strip(), content=match.group(2))
+
+    def quote(self, children):
+        return BlockQuote(content=children[1:-1])
+
+    # --- 表格 ---
+    def content_block(self, children):
+        return self._inline_nodes(children[1:-1])
+
+    def tuple(self, values):
+        return [value for value in values if value is not None]
+
+    def named_arg(self, children):
+        return children[0].value, children[1]
+
+    def _make_cell(self, value) -> TableCell:
+        if isinstance(value, Token):
+            if value.type == "STRING":
+                return TableCell(content=[Text(content=_unescape_string(value))])
+            return TableCell(content=self._inline_nodes([value]))
+        return TableCell(content=value)
+
+    def table(self, children):
+        named = {}
+        cells = []
+        for child in children[1:]:
+            if child is None:
+                continue
+            if isinstance(child, tuple):
+                named[child[0]] = child[1]
+            else:
+                cells.append(self._make_cell(child))
+
+        columns = named.get("columns", 1)
+        if isinstance(columns, list):
+            num_columns = len(columns)
+        elif isinstance(columns, Token) and columns.type == "NUMBER" and columns.isdigit():
+            num_columns = int(columns)
+        else:
+            num_columns = 1
+        num_columns = max(num_columns, 1)
+
+        align = named.get("align")
+        if isinstance(align, list):
+            align = [str(value) for value in align]
+        elif isinstance(align, Token):
+            align = [str(align)] * num_columns
+        else:
+            align = []
+
+        rows = [TableRow(cells=cells[i:i + num_columns]) for i in range(0, len(cells), num_columns)]
+        header = rows.pop(0) if rows else TableRow(cells=[])
+        # TypstRenderer 会把表头单元格包成 [*...*]，这里还原
+        for cell in header.cells:
+            if len(cell.content) == 1 and isinstance(cell.content[0], Bold):
+                cell.content = cell.content[0].content
+        return Table(header=header, align=align, rows=rows)
+
+
+_parser: Optional[Lark] = None
+_parser_lock = threading.Lock()
+
+
+def get_lark_parser() -> Lark:
+    """返回共享的 LALR 解析器。第一次调用时从磁盘缓存加载（或编译并写入缓存）。"""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                _parser = load_lalr_parser("typst.lark", transformer=UdmTransformer())
+    return _parser
+
+
+class LarkTypstParser:
+    """
+    基于 grammar/typst.lark 的 Typst 解析器。
+
+    与按行匹配正则的 TypstParser 相比，它还支持有序列表、代码块、
+    #link、#image、#quote 和 #table。不合法的标记（例如未闭合的 *）会抛出 ValueError。
+    """
+    def parse(self, typst_text: str) -> Document:
+        if not typst_text.endswith("\n"):
+            typst_text += "\n"
+        try:
+            return get_lark_parser().parse(typst_text)
+        except UnexpectedInput as e:
+            raise ValueError(f"Invalid Typst markup at line {e.line}, column {e.column}") from e
@@ -1,19 +1,40 @@
 # marktypist/typ_parser.py
 
 import re
-from typing import List, Union, Optional
+from typing import Iterable, List, Union, Optional
 
 from .model import (
     Document, BlockElement, InlineElement, Text, Bold, Italic,
     Heading, Paragraph, UnorderedList, OrderedList, ListItem
 )
 
+# Typst 内联标记，按优先级从左到右匹配：
+# 1. 粗斜体 *_..._*  2. 粗体 *...*  3. 斜体 _..._
+# 对于嵌套，这里仅能处理直接模式，例如 `*a _b_ c*`；
+# 复杂模式如 "这是 *_粗体*斜体_*" 无法被正确处理。
+INLINE_PATTERN = re.compile(r'\*_(?P<bold_italic>.+?)_\*|\*(?P<bold>.+?)\*|_(?P<italic>.+?)_')
+
+HEADING_PATTERN = re.compile(r'(=+)\s*(.*)')
+UNORDERED_ITEM_PATTERN = re.compile(r'-\s*(.*)')
+
+def _extend_inline(target: List[InlineElement], nodes: List[InlineElement]) -> None:
+    """把 nodes 追加到 target，衔接处相邻的两个 Text 合并为一个。"""
+    if nodes and target and type(target[-1]) is Text and type(nodes[0]) is Text:
+        target[-1] = Text(content=target[-1].content + nodes[0].content)
+        nodes = nodes[1:]
+    target.extend(nodes)
+
 class TypstParser:
     def parse(self, typst_text: str) -> Document:
-        blocks: List[BlockElement] = []
-        
         # 将输入文本按行分割，并处理 Typst 的块级和内联级模式
-        lines = typst_text.splitlines()
+        return self.parse_lines(typst_text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> Document:
+        """
+        解析逐行给出的 Typst 文本（不含换行符）。每行只读取一次，
+        lines 可以是惰性的迭代器（例如 reader.iter_source_lines），不需要整个文件的字符串。
+        """
+        blocks: List[BlockElement] = []
         
         current_paragraph: Optional[Paragraph] = None
         current_list: Optional[Union[UnorderedList, OrderedList]] = None
@@ -32,7 +53,7 @@ class TypstParser:
                 continue # 空行不生成块
 
             # 检查标题
-            match_heading = re.match(r'(=+)\s*(.*)', stripped_line)
+            match_heading = HEADING_PATTERN.match(stripped_line)
             if match_heading:
                 level = len(match_heading.group(1))
                 content_text = match_heading.group(2)
@@ -43,7 +64,7 @@ class TypstParser:
                 continue
             
             # 检查无序列表 (Typst 使用 - )
-            match_unordered_list = re.match(r'-\s*(.*)', stripped_line)
+            match_unordered_list = UNORDERED_ITEM_PATTERN.match(stripped_line)
             if match_unordered_list:
                 item_content_text = match_unordered_list.group(1)
                 inline_elements = self._parse_inline(item_content_text)
@@ -65,7 +86,7 @@ class TypstParser:
                 blocks.append(current_paragraph)
             else:
                 # 续接现有段落
-                current_paragraph.content.extend(inline_elements)
+                _extend_inline(current_paragraph.content, inline_elements)
             
             current_list = None # 段落不是列表的延续
 
@@ -73,74 +94,37 @@ class TypstParser:
 
     def _parse_inline(self, text: str) -> List[InlineElement]:
         """
-        使用正则表达式解析内联样式：粗体和斜体，以及粗斜体。
+        解析内联样式：粗体、斜体以及粗斜体。
+
+        使用一个预编译的组合正则 INLINE_PATTERN 从左到右扫描，
+        每个匹配直接生成对应的节点；匹配内部的文本不做切片复制，
+        而是以 (起点, 终点, 目标列表) 的形式放入待处理栈，
+        在原字符串上用 finditer(text, pos, endpos) 继续扫描。
+        整个过程没有递归，也不产生中间的字符串列表。
         """
         result: List[InlineElement] = []
-        
-        # Typst: *bold*, _italic_, *_bold_italic_*
-        # Markdown: **bold**, *italic*, ***bold_italic***
-
-        # 使用一个更精确的正则表达式，按照优先级从左到右匹配
-        # 1. Typst 粗斜体模式: *_..._*
-        # 2. Typst 粗体模式: *...* (确保不是粗斜体的一部分)
-        # 3. Typst 斜体模式: _..._ (确保不是粗斜体的一部分)
-        # 4. 普通文本
-        
-        # 捕获组: (粗斜体捕获1)(粗体捕获2)(斜体捕获3)
-        # 注意：这里的正则需要非常精确，确保边界条件。
-        # 对于嵌套，简单的 regex 很难完全实现，这里仅能处理直接模式。
-        # 复杂模式如 "这是 *_粗体*斜体_*" 将无法被此简陋解析器处理。
-        
-        # 正则表达式分解：
-        # ( \*_ ( .*? ) _\* ) : 匹配 *_TEXT_*。Group 1 是完整匹配，Group 2 是内部 TEXT
-        # | ( \* ( .*? ) \* ) : 匹配 *TEXT*。Group 3 是完整匹配，Group 4 是内部 TEXT
-        # | ( _ ( .*? ) _ )   : 匹配 _TEXT_。Group 5 是完整匹配，Group 6 是内部 TEXT
-        # | ( [^_*]+ )        : 匹配任何非 *, _, 空格的字符 (普通文本)
-        # | ( . )             : 匹配单个字符，作为回退（用于处理特殊字符）
-        
-        # Typst 的粗斜体是 `*_content_*`
-        # Typst 的粗体是 `*content*`
-        # Typst 的斜体是 `_content_`
-        
-        # 确保 `*` 和 `_` 只有在其作为分隔符时才被匹配，并且要处理嵌套和歧义
-        # 例如，`*a _b_ c*` 应该解析为 Bold(Text("a "), Italic(Text("b")), Text(" c"))
-        # 这对于纯 regex 是一个巨大的挑战。
-        # 鉴于我们测试用例是简单的，我们可以使用一个更直接的模式：
-        
-        # 简化的内联正则表达式，匹配单个标签
-        # 确保它不吞噬内部的换行符
-        parts = re.split(r'(\*_.+?_\*|\*.+?\*|_.+?_)', text)
-        
-        for part in parts:
-            if not part:
-                continue
-            
-            # 粗斜体: Typst *_..._*
-            match_bold_italic = re.match(r'\*_(.+?)_\*', part)
-            if match_bold_italic:
-                inner = self._parse_inline(match_bold_italic.group(1)) # 递归解析内部
-                result.append(Italic(content=[Bold(content=inner)]))
-                continue
-            
-            # 粗体: Typst *...*
-            match_bold = re.match(r'\*(.+?)\*', part)
-            if match_bold:
-                inner = self._parse_inline(match_bold.group(1)) # 递归解析内部
-                result.append(Bold(content=inner))
-                continue
-            
-            # 斜体: Typst _..._
-            match_italic = re.match(r'_(.+?)_', part)
-            if match_italic:
-                inner = self._parse_inline(match_italic.group(1)) # 递归解析内部
-                result.append(Italic(content=inner))
-                continue
-            
-            # 普通文本
-            result.append(Text(content=part))
+        pending = [(0, len(text), result)]
+
+        while pending:
+            pos, end, target = pending.pop()
+            for match in INLINE_PATTERN.finditer(text, pos, end):
+                start = match.start()
+                if start > pos:
+                    target.append(Text(content=text[pos:start]))
+
+                kind = match.lastgroup
+                inner: List[InlineElement] = []
+                if kind == "bold_italic":
+                    # Typst 的粗斜体 *_..._* 解析为 Italic(Bold(...))
+                    target.append(Italic(content=[Bold(content=inner)]))
+                elif kind == "bold":
+                    target.append(Bold(content=inner))
+                else:
+                    target.append(Italic(content=inner))
+                pending.append((match.start(kind), match.end(kind), inner))
+                pos = match.end()
 
-        # 确保对于纯文本输入也能正确处理
-        if not result and text: # 如果没有匹配到任何样式，整个就是文本
-            result.append(Text(content=text))
+            if pos < end:
+                target.append(Text(content=text[pos:end]))
 
-        return result
\ No newline at end of file
+        return result
@@ -1,6 +1,18 @@
 from .model import *
+from .visitor import Capture, NodeVisitor
 
-class TypstRenderer:
+# Typst 字符串字面量中需要转义的字符
+STRING_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+
+def escape_string(text: str) -> str:
+    # 绝大多数单元格不含需要转义的字符；translate 逐字符处理，先检查一次更快
+    if '"' in text or "\\" in text:
+        return text.translate(STRING_ESCAPES)
+    return text
+
+
+class TypstRenderer(NodeVisitor):
     """
     遍历 UDM 树并将其渲染为 Typst 格式的字符串。
     """
@@ -10,108 +22,125 @@ class TypstRenderer:
         # .strip() 可以在最后移除可能由顶层块连接产生的前后空白。
         return self._visit(document).strip()
 
-    def _visit(self, node):
-        """根据节点的类型，动态调用对应的 visit_xxx 方法"""
-        method_name = f"visit_{node.__class__.__name__.lower()}"
-        visitor = getattr(self, method_name, self.visit_default)
-        return visitor(node)
-
-    def visit_default(self, node):
-        raise NotImplementedError(f"No visitor for node type: {node.__class__.__name__}")
+    def render_block(self, node: BlockElement) -> str:
+        """
+        单独渲染一个顶层块。render() 的结果等价于
+        "\n\n".join(render_block(b) for b in document.content).strip()，
+        流式转换依赖这一点逐块输出。
+        """
+        return self._visit(node)
 
     # --- 内联元素访问者 ---
-    def _render_inline_content(self, content: List[InlineElement]) -> str:
-        return "".join(self._visit(item) for item in content)
-
+    # 容器节点的访问者是生成器：依次产出输出片段和子节点，参见 NodeVisitor
     def visit_text(self, node: Text) -> str:
         return node.content
 
-    def visit_bold(self, node: Bold) -> str:
-        return f"*{self._render_inline_content(node.content)}*"
+    def visit_bold(self, node: Bold):
+        yield "*"
+        yield node.content
+        yield "*"
 
-    def visit_italic(self, node: Italic) -> str:
-        return f"_{self._render_inline_content(node.content)}_"
+    def visit_italic(self, node: Italic):
+        yield "_"
+        yield node.content
+        yield "_"
 
     def visit_code(self, node: Code) -> str:
         return f"`{node.content}`"
 
-    def visit_link(self, node: Link) -> str:
-        return f'#link("{node.url}")[{self._render_inline_content(node.content)}]'
+    def visit_link(self, node: Link):
+        yield f'#link("{node.url}")['
+        yield node.content
+        yield "]"
     
     def visit_image(self, node: Image) -> str:
         alt_text = node.alt.replace('"', '\\"')
         return f'#image("{node.src}", alt: "{alt_text}")'
 
     # --- 块级元素访问者 ---
-    def _render_block_content(self, content: List[BlockElement], join_str="\n\n") -> str:
-        return join_str.join(self._visit(item) for item in content)
+    def _render_block_content(self, content: List[BlockElement], join_str="\n\n"):
+        for index, item in enumerate(content):
+            if index:
+                yield join_str
+            yield item
 
-    def visit_document(self, node: Document) -> str:
+    def visit_document(self, node: Document):
         # Document 节点负责用两个换行符连接所有顶层块
         return self._render_block_content(node.content, join_str="\n\n")
 
-    def visit_heading(self, node: Heading) -> str:
+    def visit_heading(self, node: Heading):
         # 块级元素自身不带末尾换行
-        return f"{'=' * node.level} {self._render_inline_content(node.content)}"
+        yield f"{'=' * node.level} "
+        yield node.content
 
-    def visit_paragraph(self, node: Paragraph) -> str:
-        # 如果一个段落只包含一个图片，那么它应该只渲染图片，而不是图片被包裹在段落中
-        if len(node.content) == 1 and isinstance(node.content[0], Image):
-            return self._visit(node.content[0])
-        return self._render_inline_content(node.content)
+    def visit_paragraph(self, node: Paragraph):
+        # 只包含一个图片的段落只输出图片本身
+        return node.content
+
+    def _render_list(self, items: List[ListItem], marker: str):
+        for index, item in enumerate(items):
+            yield "\n" + marker if index else marker
+            yield item
 
-    def visit_unorderedlist(self, node: UnorderedList) -> str:
-        items_str = [f"- {self._visit(item)}" for item in node.items]
-        return "\n".join(items_str)
+    def visit_unorderedlist(self, node: UnorderedList):
+        return self._render_list(node.items, "- ")
 
-    def visit_orderedlist(self, node: OrderedList) -> str:
-        items_str = [f"+ {self._visit(item)}" for item in node.items]
-        return "\n".join(items_str)
+    def visit_orderedlist(self, node: OrderedList):
+        return self._render_list(node.items, "+ ")
 
-    def visit_listitem(self, node: ListItem) -> str:
+    def visit_listitem(self, node: ListItem):
         if node.content and isinstance(node.content[0], Paragraph):
-             return self._render_inline_content(node.content[0].content)
+            return node.content[0].content
         return self._render_block_content(node.content, join_str="\n  ")
 
     def visit_codeblock(self, node: CodeBlock) -> str:
         return f"```{node.language}\n{node.content}\n```"
     
-    def visit_blockquote(self, node: BlockQuote) -> str:
-        inner_content = self._render_block_content(node.content)
-        return f"#quote[{inner_content}]"
+    def visit_blockquote(self, node: BlockQuote):
+        yield "#quote["
+        yield from self._render_block_content(node.content)
+        yield "]"
 
     # --- 表格渲染器 ---
-    def visit_table(self, node: Table) -> str:
+    def visit_table(self, node: Table):
         if not node.header.cells:
-            return ""
+            return
 
         num_columns = len(node.header.cells)
-        columns_def = f"  columns: ({', '.join(['auto'] * num_columns)}),\n"
-
-        header_cells = [f"[*{(self._visit(cell))}*]" for cell in node.header.cells]
-        header_line = "  " + ", ".join(header_cells) + ",\n"
-        
-        body_lines = []
+        yield f"#table(\n  columns: ({', '.join(['auto'] * num_columns)}),\n"
+        if any(align and align != "auto" for align in node.align):
+            yield f"  align: ({', '.join(align or 'auto' for align in node.align)}),\n"
+
+        yield "  "
+        for index, cell in enumerate(node.header.cells):
+            yield ", [*" if index else "[*"
+            yield cell
+            yield "*]"
+        yield ",\n"
+
+        # 纯文本单元格输出为字符串字面量；默认的单元格和文本访问者下直接取文本，不经过遍历引擎
+        direct_text = (self.handler_for(TableCell) is TypstRenderer.visit_tablecell
+                       and self.handler_for(Text) is TypstRenderer.visit_text)
         for row in node.rows:
-            row_cells = []
-            for cell in row.cells:
-                cell_content_str = self._visit(cell)
-                is_pure_text = len(cell.content) == 1 and isinstance(cell.content[0], Text)
-                
-                if is_pure_text:
-                    escaped_content = cell_content_str.replace('\\', '\\\\').replace('"', '\\"')
-                    row_cells.append(f'"{escaped_content}"')
+            # 每行的片段和单元格节点先收集到一个列表中，整行只交给遍历引擎一次；全是纯文本的行直接连接成字符串
+            items = ["  "]
+            plain = True
+            for index, cell in enumerate(row.cells):
+                if index:
+                    items.append(", ")
+                if len(cell.content) == 1 and isinstance(cell.content[0], Text):
+                    text = cell.content[0].content if direct_text else (yield Capture(cell))
+                    items.append('"' + escape_string(text) + '"')
                 else:
-                    row_cells.append(cell_content_str)
-            
-            while len(row_cells) < num_columns:
-                row_cells.append('""')
-            
-            body_lines.append("  " + ", ".join(row_cells) + ",")
-        
-        body_str = "\n".join(body_lines) + "\n" if body_lines else ""
-
-        return f"#table(\n{columns_def}{header_line}{body_str})"
-
-    def visit_tablecell(self, node: TableCell) -> str:
-        return self._render_inline_content(node.content)
\ No newline at end of file
+                    items.append(cell)
+                    plain = False
+            # 单元格不足时用空字符串补齐
+            for index in range(len(row.cells), num_columns):
+                items.append(', ""' if index else '""')
+            items.append(",\n")
+            yield "".join(items) if plain else items
+
+        yield ")"
+
+    def visit_tablecell(self, node: TableCell):
+        return node.content
@@ -0,0 +1,197 @@
+# marktypist/visitor.py
+
+from types import GeneratorType
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, TextIO
+
+from .streaming import StripJoiner
+
+
+class Dispatcher:
+    """
+    按 key（节点类型或 token 类型）把调用分发到处理方法。
+
+    处理方法仍然按命名约定查找（例如 visit_paragraph），但只在某个 key 第一次出现时
+    查找一次，结果缓存在类级别的分发表 _dispatch 中，之后每个节点只需要一次字典查找，
+    不再为每个节点拼接方法名并调用 getattr。每个子类都有自己的分发表。
+
+    新的节点类型或插件通过 register() 添加处理方法。
+    """
+    # 找不到处理方法时使用的方法名
+    default_handler = "visit_default"
+    _dispatch: Dict[Hashable, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    @classmethod
+    def handler_names(cls, key) -> Iterator[str]:
+        """按优先级产出 key 对应的候选方法名。"""
+        raise NotImplementedError
+
+    @classmethod
+    def handler_for(cls, key) -> Callable:
+        """返回 key 的处理函数（未绑定，调用时传入 self），并写入分发表。"""
+        handler = cls._dispatch.get(key)
+        if handler is None:
+            for name in cls.handler_names(key):
+                handler = getattr(cls, name, None)
+                if handler is not None:
+                    break
+            else:
+                handler = getattr(cls, cls.default_handler)
+            cls._dispatch[key] = handler
+        return handler
+
+    @classmethod
+    def register(cls, key, handler: Optional[Callable] = None):
+        """
+        为 key 注册处理方法，可以直接调用，也可以作为装饰器使用：
+
+            @TypstRenderer.register(Footnote)
+            def visit_footnote(self, node): ...
+
+        处理方法按命名约定设置为类属性（例如 visit_footnote），
+        因此子类依旧可以像普通方法一样覆盖它。
+        """
+        def decorator(func: Callable) -> Callable:
+            setattr(cls, next(iter(cls.handler_names(key))), func)
+            cls._clear_dispatch()
+            return func
+        return decorator(handler) if handler is not None else decorator
+
+    @classmethod
+    def _clear_dispatch(cls) -> None:
+        # 子类可能已经缓存了父类的处理方法
+        cls._dispatch.clear()
+        for subclass in cls.__subclasses__():
+            subclass._clear_dispatch()
+
+
+class Capture:
+    """
+    在 visit_* 生成器中使用 ``text = yield Capture(node)``：把 node（或节点列表）渲染为字符串取回，
+    而不是直接写入输出。只有需要对子节点的输出做后处理时才需要它（例如逐行加前缀、转义）。
+    """
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+# 栈中的标记：其下方的内容渲染到了一个单独的片段列表中
+_END_CAPTURE = object()
+
+# render_to 每积累这么多个输出片段写出一次
+FLUSH_FRAGMENTS = 4096
+
+
+class NodeVisitor(Dispatcher):
+    """
+    UDM 树的访问者基类：节点 Foo 由 visit_foo 方法处理。
+    如果没有 visit_foo，依次尝试节点类型的各个基类，最后使用 visit_default。
+
+    访问者不拼接子节点的结果，而是按顺序产出输出片段，所有片段只在最后拼接（或写入流）一次，
+    每个字符只复制一次，与嵌套深度无关。visit_* 方法有两种写法：
+
+    * 普通方法，返回一个字符串片段（叶子节点，例如 visit_text），或者返回一个节点列表
+      （例如段落直接返回它的内联元素）；
+    * 生成器方法，依次 yield 字符串片段、子节点或节点列表（子节点的输出写在这个位置），
+      或者 ``text = yield Capture(node)`` 取回子节点的输出。
+
+    遍历不使用递归：_render_into 用一个显式栈驱动这些生成器，嵌套深度不受 Python 递归上限限制，
+    每个节点只被访问一次。
+    """
+    @classmethod
+    def handler_names(cls, node_type: type) -> Iterator[str]:
+        for base in node_type.__mro__:
+            yield f"visit_{base.__name__.lower()}"
+
+    def _render_into(self, node, parts: List[str], flush: Optional[Callable[[], None]] = None) -> None:
+        """
+        渲染 node，把输出片段依次追加到 parts。
+        给出 flush 时，parts 积累到 FLUSH_FRAGMENTS 个片段后调用 flush()（由它清空 parts）。
+        """
+        dispatch = self._dispatch
+        handler_for = self.handler_for
+        # 栈中是尚未处理完的迭代器（生成器或节点列表的迭代器）
+        stack: List = [iter((node,))]
+        sinks = [parts]
+        write = parts.append
+        while stack:
+            top = stack[-1]
+            if top is _END_CAPTURE:
+                stack.pop()
+                captured = "".join(sinks.pop())
+                write = sinks[-1].append
+                # 把结果 send 回请求 Capture 的生成器，它产出的下一项放在栈顶处理
+                try:
+                    stack.append(iter((stack[-1].send(captured),)))
+                except StopIteration:
+                    stack.pop()
+                continue
+
+            # 在同一层中连续处理，只有需要进入子节点时才中断
+            for item in top:
+                item_type = type(item)
+                if item_type is str:
+                    write(item)
+                    continue
+                if item_type is list or item_type is tuple:
+                    stack.append(iter(item))
+                    break
+                if item_type is Capture:
+                    sinks.append([])
+                    write = sinks[-1].append
+                    stack.append(_END_CAPTURE)
+                    nodes = item.nodes
+                    stack.append(iter(nodes if type(nodes) in (list, tuple, GeneratorType) else (nodes,)))
+                    break
+                result = (dispatch.get(item_type) or handler_for(item_type))(self, item)
+                result_type = type(result)
+                if result_type is str:
+                    write(result)
+                elif result_type is GeneratorType or result_type is list or result_type is tuple:
+                    # 节点列表与生成器一样逐项处理
+                    stack.append(iter(result))
+                    break
+            else:
+                stack.pop()
+                # 只在一个迭代器结束时检查，避免在每个片段上增加开销
+                if flush is not None and len(parts) >= FLUSH_FRAGMENTS and len(sinks) == 1:
+                    flush()
+
+    def _visit(self, node) -> str:
+        """渲染 node 及其整个子树，返回输出字符串。"""
+        # 片段分批合并，大量短小的片段字符串不会同时留在内存中
+        chunks: List[str] = []
+        parts: List[str] = []
+
+        def flush():
+            chunks.append("".join(parts))
+            parts.clear()
+
+        self._render_into(node, parts, flush)
+        flush()
+        return "".join(chunks)
+
+    def render_to(self, document, stream: TextIO) -> None:
+        """
+        把 document 写入文本流 stream（StringIO 或打开的文件），内容与 render(document) 相同
+        （包括去掉首尾空白）。输出片段每积累一批就写出，不会在内存中构建整个输出字符串。
+        """
+        # 分隔符为空的 StripJoiner 就是流式的 strip()
+        stripper = StripJoiner("")
+        parts: List[str] = []
+
+        def flush():
+            out = stripper.feed("".join(parts))
+            parts.clear()
+            if out:
+                stream.write(out)
+
+        self._render_into(document, parts, flush)
+        flush()
+
+    def visit_default(self, node):
+        raise NotImplementedError(f"No visitor for node type: {node.__class__.__name__}")
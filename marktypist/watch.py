@@ -0,0 +1,235 @@
+# marktypist/watch.py
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .batch import BatchResult, collect_sources, convert_one
+from .main import output_path_for
+
+MANIFEST_NAME = ".marktypist-manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class WatchEvent:
+    """
+    一次重新转换或删除。kind 为 "converted"、"failed" 或 "deleted"。
+    latency 是从源文件最后一次保存（mtime）到输出写完的秒数，启动时已有的文件和重命名的文件为 None。
+    """
+    kind: str
+    source: Path
+    output: Path
+    error: Optional[str] = None
+    latency: Optional[float] = None
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+class TreeWatcher:
+    """
+    监视 source（目录或 glob）下的 .md/.typ 文件，把改动的文件重新转换到 output_root（保持目录结构）。
+
+    不依赖 inotify 等平台接口：每次 poll() 扫描一遍文件的 (mtime, 大小)。
+    * 去抖：文件最后一次变化后静止 debounce 秒才转换，一次保存产生的多次写入只转换一次；
+    * 只有内容哈希与上次转换时不同的文件才会重新转换（例如 touch 不会触发转换）；
+    * 清单（output_root 下的 .marktypist-manifest.json）记录 源文件 -> (输出, 哈希)，
+      源文件被删除或重命名时删除旧的输出；重新启动时据此跳过没有变化的文件，
+      并清理停止监视期间被删除的源文件的输出。
+
+    jobs > 1 时转换提交到后台进程池中并行进行，poll() 不等待它们完成：完成的转换在之后的 poll() 中报告。
+    正在转换的文件再次变化时，等这次转换完成后再转换。jobs=1 时在 poll() 中直接转换。
+    """
+    def __init__(self, source: str, output_root: Path, jobs: Optional[int] = None,
+                 debounce: float = 0.2):
+        self.source = source
+        self.output_root = Path(output_root).resolve()
+        self.jobs = jobs or os.cpu_count() or 1
+        self.debounce = debounce
+        self.manifest_path = self.output_root / MANIFEST_NAME
+        # 源文件（相对路径）-> {"output": 相对 output_root 的路径, "hash": 内容哈希}
+        self.manifest: Dict[str, dict] = self._load_manifest()
+        self._stats: Dict[Path, Tuple[int, int]] = {}
+        # 检测到变化、等待去抖的文件 -> 最后一次看到变化的时间（time.monotonic）
+        self._pending: Dict[Path, float] = {}
+        # 检测到变化的文件 -> 保存时间（mtime）；启动前就存在的文件和重命名的文件没有意义的保存时间
+        self._saved: Dict[Path, Optional[float]] = {}
+        # 上一次扫描的时间（time.time）
+        self._last_scan: Optional[float] = None
+        self._base: Optional[Path] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 后台正在转换的文件 -> (Future, 输出路径, 内容哈希)，以及转换完成的时间（time.time，由回调记录）
+        self._running: Dict[Path, Tuple[Future, Path, str]] = {}
+        self._finished_at: Dict[Path, float] = {}
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save_manifest(self) -> None:
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "files": self.manifest}, indent=1, sort_keys=True),
+                       encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        self._base, files = collect_sources(self.source, self.output_root)
+        stats = {}
+        for path in files:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # 扫描过程中被删除
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self._base).as_posix()
+
+    def poll(self) -> List[WatchEvent]:
+        """
+        扫描一次，转换（或提交到后台）去抖完成且内容变化的文件、处理删除，
+        返回这一轮的事件（包括此前提交、已经完成的后台转换）。
+        """
+        now = time.monotonic()
+        first_scan = self._base is None
+        scan_started = time.time()
+        stats = self._scan()
+        for path, stat in stats.items():
+            if self._stats.get(path) != stat:
+                # 第一次扫描的文件不需要等待去抖
+                self._pending[path] = float("-inf") if first_scan else now
+                # mtime 早于上一次扫描说明不是刚刚保存的，例如重命名（文件系统的时间戳略粗，留 0.1 秒余量）
+                saved = stat[0] / 1e9
+                self._saved[path] = saved if self._last_scan and saved >= self._last_scan - 0.1 else None
+        self._stats = stats
+        self._last_scan = scan_started
+        for path in list(self._pending):
+            if path not in stats:
+                del self._pending[path]
+                self._saved.pop(path, None)
+
+        ready = [path for path, seen in self._pending.items()
+                 if now - seen >= self.debounce and path not in self._running]
+        for path in ready:
+            del self._pending[path]
+
+        events = self._delete_missing(stats)
+        events += self._convert_changed(ready)
+        events += self._collect_finished()
+        if events:
+            self._save_manifest()
+        return events
+
+    def _delete_missing(self, stats: Dict[Path, Tuple[int, int]]) -> List[WatchEvent]:
+        """删除源文件已经不存在的输出（删除或重命名）。"""
+        current = {self._key(path) for path in stats}
+        events = []
+        for key in [key for key in self.manifest if key not in current]:
+            output = self.output_root / self.manifest.pop(key)["output"]
+            try:
+                output.unlink()
+            except FileNotFoundError:
+                pass
+            events.append(WatchEvent("deleted", self._base / key, output))
+        return events
+
+    def _convert_changed(self, paths: List[Path]) -> List[WatchEvent]:
+        tasks, hashes = [], []
+        for path in sorted(paths):
+            key = self._key(path)
+            output = self.output_root / output_path_for(Path(key))
+            try:
+                digest = _hash_file(path)
+            except FileNotFoundError:
+                self._saved.pop(path, None)
+                continue
+            entry = self.manifest.get(key)
+            if entry and entry["hash"] == digest and output.exists():
+                self._saved.pop(path, None)
+                continue  # 只是 mtime 变了，内容没有变化
+            tasks.append((path, output))
+            hashes.append(digest)
+
+        if self.jobs > 1:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+            for (path, output), digest in zip(tasks, hashes):
+                try:
+                    future = self._executor.submit(convert_one, (path, output))
+                except BrokenProcessPool:
+                    # 之前有工作进程异常退出（那些转换已经作为失败报告）：换一个新的进程池
+                    self._executor.shutdown(wait=False)
+                    self._executor = ProcessPoolExecutor(max_workers=self.jobs)
+                    future = self._executor.submit(convert_one, (path, output))
+                self._running[path] = (future, output, digest)
+                future.add_done_callback(lambda _, path=path: self._finished_at.__setitem__(path, time.time()))
+            return []
+        return [self._record(convert_one(task), digest, time.time()) for task, digest in zip(tasks, hashes)]
+
+    def _collect_finished(self) -> List[WatchEvent]:
+        """后台转换中已经完成的部分。"""
+        events = []
+        for path, (future, output, digest) in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[path]
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程异常退出等：convert_one 自身不会抛出异常
+                result = BatchResult(path, output, f"{type(e).__name__}: {e}")
+            events.append(self._record(result, digest, self._finished_at.pop(path, time.time())))
+        return events
+
+    def _record(self, result: BatchResult, digest: str, finished: float) -> WatchEvent:
+        """把一个转换结果记入清单，返回对应的事件。"""
+        saved = self._saved.pop(result.source, None)
+        latency = finished - saved if saved is not None else None
+        key = self._key(result.source)
+        if result.ok:
+            self.manifest[key] = {"output": result.output.relative_to(self.output_root).as_posix(), "hash": digest}
+            return WatchEvent("converted", result.source, result.output, latency=latency)
+        # 转换失败时不记录哈希，下次保存时重试
+        self.manifest.pop(key, None)
+        return WatchEvent("failed", result.source, result.output, result.error, latency)
+
+    def run(self, callback: Callable[[WatchEvent], None], interval: float = 0.5,
+            should_stop: Callable[[], bool] = lambda: False) -> None:
+        """
+        每 interval 秒 poll() 一次，把事件交给 callback，直到 should_stop() 为真（或 KeyboardInterrupt）。
+        结束时等待后台的转换完成，同样报告它们的事件。
+        """
+        try:
+            while not should_stop():
+                for event in self.poll():
+                    callback(event)
+                time.sleep(interval)
+        finally:
+            for event in self.close():
+                callback(event)
+
+    def close(self) -> List[WatchEvent]:
+        """等待后台的转换完成并关闭进程池，返回这些转换的事件（已记入清单）。"""
+        if self._executor is None:
+            return []
+        self._executor.shutdown()
+        self._executor = None
+        events = self._collect_finished()
+        if events:
+            self._save_manifest()
+        return events
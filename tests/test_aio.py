@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from marktypist import aio
+from marktypist.aio import AsyncConverter, aconvert_file, aconvert_md_to_typ, aconvert_typ_to_md, aiter_convert_files
+from marktypist.main import convert_md_to_typ, convert_typ_to_md
+
+
+def test_module_functions(tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text("# Title\n\n**bold**", encoding="utf-8")
+
+    async def main():
+        assert await aconvert_md_to_typ("# A *b*") == convert_md_to_typ("# A *b*")
+        assert await aconvert_typ_to_md("= A _b_") == convert_typ_to_md("= A _b_")
+        assert await aconvert_file(source) == "= Title\n\n*bold*"
+        assert await aconvert_file(source, tmp_path / "out.typ") is None
+
+    asyncio.run(main())
+    assert (tmp_path / "out.typ").read_text(encoding="utf-8") == "= Title\n\n*bold*"
+
+
+def test_iter_convert_files_keeps_order_and_records_errors(tmp_path: Path):
+    tasks = []
+    for i in range(10):
+        source = tmp_path / f"doc{i}.md"
+        source.write_text(f"# Doc {i}", encoding="utf-8")
+        tasks.append((source, None))
+    tasks.insert(3, (tmp_path / "missing.md", None))
+
+    async def main():
+        return [result async for result in aiter_convert_files(tasks)]
+
+    results = asyncio.run(main())
+    assert [r.source for r in results] == [source for source, _ in tasks]
+    assert [r.ok for r in results].count(False) == 1 and "FileNotFoundError" in results[3].error
+    assert (tmp_path / "doc9.typ").read_text(encoding="utf-8") == "= Doc 9"
+
+
+def test_concurrency_limit(monkeypatch):
+    """同时在执行器中运行的转换不超过 max_concurrency，输入可以是异步迭代器"""
+    running = peak = 0
+    lock = threading.Lock()
+
+    def slow_convert(text, suffix, typst_parser):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return text.upper()
+
+    monkeypatch.setattr(aio, "_convert_text", slow_convert)
+
+    async def texts():
+        for i in range(12):
+            yield f"doc {i}"
+
+    async def main():
+        async with AsyncConverter(max_workers=8, max_concurrency=3) as converter:
+            results = [text async for text in converter.iter_convert_texts(texts(), ".md")]
+            extra = await asyncio.gather(*(converter.md_to_typ(f"x{i}") for i in range(6)))
+            return results, extra, converter.in_flight
+
+    results, extra, in_flight = asyncio.run(main())
+    assert results == [f"DOC {i}" for i in range(12)]
+    assert extra == [f"X{i}" for i in range(6)]
+    assert peak <= 3
+    assert in_flight == 0
+
+
+def test_timeout_and_cancellation_release_slots(monkeypatch):
+    started = threading.Event()
+
+    def blocking_convert(text, suffix, typst_parser):
+        if text == "slow":
+            started.set()
+            time.sleep(0.2)
+        return text
+
+    monkeypatch.setattr(aio, "_convert_text", blocking_convert)
+
+    async def main():
+        async with AsyncConverter(max_workers=2, max_concurrency=1) as converter:
+            with pytest.raises(asyncio.TimeoutError):
+                await converter.md_to_typ("slow", timeout=0.01)
+            # 超时的转换仍在运行，名额要等它真正结束才释放
+            assert converter.in_flight == 1
+            assert await converter.md_to_typ("fast", timeout=5) == "fast"
+
+            task = asyncio.ensure_future(converter.md_to_typ("slow"))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert await converter.md_to_typ("after cancel") == "after cancel"
+            return converter.in_flight
+
+    started.clear()
+    assert asyncio.run(main()) == 0
+
+
+def test_process_pool():
+    texts = [f"# Doc {i}\n\n- *item*" for i in range(5)]
+
+    async def main():
+        async with AsyncConverter("process", max_workers=2) as converter:
+            return [text async for text in converter.iter_convert_texts(texts, ".md")]
+
+    assert asyncio.run(main()) == [convert_md_to_typ(text) for text in texts]
+
+
+def test_iter_convert_texts_raises_on_error():
+    async def main():
+        async with AsyncConverter() as converter:
+            return [text async for text in converter.iter_convert_texts(["# a", "b"], ".docx")]
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
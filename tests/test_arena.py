@@ -0,0 +1,50 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from marktypist.arena import DOCUMENT, HEADING, PARAGRAPH, TEXT, ArenaTypstRenderer
+from marktypist.main import Converter, convert_md_to_typ
+from marktypist.md_parser import MarkdownParser
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+DOCUMENTS = [
+    (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8"),
+    "# Title *x*\n\nSee [the docs][docs] and www.example.com.\n\n[docs]: https://example.com/docs\n",
+    "**a** b ~~c~~ <span>d</span> e\nf  \ng",
+    "1. x\n\n   ```rust\n   y\n   ```\n2. z\n\n- a\n  - b\n    > c",
+    '| a | **b** |\n|:--|--:|\n| "x" \\\\ | `y` |\n| only |\n\n![alt "q"](img.png)',
+    "",
+]
+
+
+@pytest.mark.parametrize("text", DOCUMENTS)
+def test_arena_matches_udm_pipeline(text):
+    """arena 与 UDM 表达相同的树，渲染结果逐字节相同"""
+    parser = MarkdownParser()
+    arena = parser.parse_arena(text)
+    assert arena.to_document() == parser.parse(text)
+
+    expected = convert_md_to_typ(text)
+    assert ArenaTypstRenderer().render(arena) == expected
+    stream = io.StringIO()
+    ArenaTypstRenderer().render_to(arena, stream)
+    assert stream.getvalue() == expected
+    assert Converter().md_to_typ_arena(text) == expected
+
+
+def test_arena_layout():
+    arena = MarkdownParser().parse_arena("# A\n\nb *c*")
+    assert list(arena.kind[:3]) == [DOCUMENT, HEADING, TEXT]
+    heading, paragraph = arena.children(0)
+    assert arena.kind[paragraph] == PARAGRAPH and arena.parent[paragraph] == 0
+    assert [arena.text_of(n) for n in arena.children(heading)] == ["A"]
+    assert arena.end[0] == len(arena)
+    assert arena.nbytes() > 0
+
+
+def test_arena_render_deep_nesting():
+    depth = 5_000
+    text = "*" * depth + "x" + "*" * depth
+    assert ArenaTypstRenderer().render(MarkdownParser().parse_arena(text)) == convert_md_to_typ(text)
@@ -0,0 +1,92 @@
+import os
+import re
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+import marktypist
+from marktypist.cache import ConversionCache
+from marktypist.cli import cli
+from marktypist.main import Converter, convert_file
+from marktypist.typ_lark_parser import LarkTypstParser
+
+
+def test_convert_file_uses_cache(tmp_path: Path):
+    cache = ConversionCache(tmp_path / "cache")
+    source = tmp_path / "doc.md"
+    source.write_text("# 标题\n\n**粗体**", encoding="utf-8")
+
+    first = convert_file(source, None, cache=cache)
+    second = convert_file(source, None, cache=cache)
+    assert first == second == "= 标题\n\n*粗体*"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    # 输出到文件时命中缓存同样得到相同的内容
+    convert_file(source, tmp_path / "doc.typ", cache=cache)
+    assert (tmp_path / "doc.typ").read_text(encoding="utf-8") == first
+    assert cache.stats.hits == 2
+
+    # 内容变化后不再命中
+    source.write_text("# 新标题", encoding="utf-8")
+    assert convert_file(source, None, cache=cache) == "= 新标题"
+    assert cache.stats.misses == 2
+
+
+def test_cache_key_includes_options(tmp_path: Path):
+    cache = ConversionCache(tmp_path / "cache")
+    source = tmp_path / "doc.typ"
+    source.write_text("+ one", encoding="utf-8")
+
+    Converter().convert_file(source, None, cache=cache)
+    lark_output = Converter(typst_parser=LarkTypstParser()).convert_file(source, None, cache=cache)
+    assert lark_output == "1. one"
+    assert cache.stats.misses == 2
+
+
+def test_cache_key_follows_package_version(tmp_path: Path, monkeypatch):
+    """版本号只在 pyproject.toml（或安装的元数据）中定义，升级版本后旧的缓存项不再命中"""
+    pyproject = (Path(__file__).parent.parent / "pyproject.toml").read_text(encoding="utf-8")
+    assert marktypist.__version__ == re.search(r'^version = "([^"]+)"', pyproject, re.MULTILINE).group(1)
+
+    cache = ConversionCache(tmp_path / "cache")
+    key = cache.key_for_bytes(b"# a", "md->typ")
+    monkeypatch.setattr(marktypist, "__version__", "999.0")
+    assert cache.key_for_bytes(b"# a", "md->typ") != key
+
+
+def test_lru_eviction(tmp_path: Path):
+    cache = ConversionCache(tmp_path / "cache", max_bytes=250)
+    keys = [cache.key_for_bytes(bytes([i]), ".md") for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, b"x" * 100)
+        # 保证 mtime 有先后顺序
+        past = time.time() - 100 + i
+        os.utime(cache.lookup(key), (past, past))
+
+    cache.lookup(keys[0])  # keys[0] 成为最近使用
+    cache.put(keys[2], b"x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats.evictions == 1
+
+
+def test_cli_cache_statistics(tmp_path: Path):
+    runner = CliRunner()
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(3):
+        (src / f"page{i}.md").write_text(f"# Page {i}", encoding="utf-8")
+    args = ["convert-tree", str(src), "-O", str(tmp_path / "out"), "-j", "1",
+            "--cache-dir", str(tmp_path / "cache")]
+
+    cold = runner.invoke(cli, args)
+    warm = runner.invoke(cli, args)
+    disabled = runner.invoke(cli, args + ["--no-cache"])
+
+    assert "Cache: 0 hit(s), 3 miss(es)" in cold.output
+    assert "Cache: 3 hit(s), 0 miss(es)" in warm.output
+    assert "Cache:" not in disabled.output
+    assert (tmp_path / "out" / "page2.typ").read_text(encoding="utf-8") == "= Page 2"
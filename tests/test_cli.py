@@ -1,7 +1,12 @@
+import os
+import subprocess
+import sys
+
 import pytest
 from click.testing import CliRunner
 from pathlib import Path
 
+from marktypist.batch import convert_one, iter_convert_tree
 from marktypist.cli import cli
 
 # 使用 pytest 的 tmp_path fixture 来创建一个临时目录进行测试
@@ -51,6 +56,23 @@ def test_conversion_to_stdout(tmp_path: Path):
     # 我们要去掉命令本身的回显信息，只检查核心输出
     assert expected_content in result.output
 
+def test_convert_to_several_outputs(tmp_path: Path):
+    """多个 -o：解析一次，按后缀写出 Typst 和规范化的 Markdown"""
+    runner = CliRunner()
+    source = tmp_path / "doc.md"
+    source.write_text("Title\n=====\n\n* a\n* b\n")
+    result = runner.invoke(cli, ["convert", str(source), "-o", str(tmp_path / "doc.typ"),
+                                 "-o", str(tmp_path / "normalized.md")])
+    assert result.exit_code == 0, result.output
+    assert "doc.typ, normalized.md" in result.output
+    assert (tmp_path / "doc.typ").read_text() == "= Title\n\n- a\n- b"
+    assert (tmp_path / "normalized.md").read_text().strip() == "# Title\n\n- a\n- b"
+
+    result = runner.invoke(cli, ["convert", str(source), "-o", str(tmp_path / "a.typ"),
+                                 "-o", str(tmp_path / "b.typ"), "--stream"])
+    assert result.exit_code != 0
+    assert "--stream" in result.output
+
 def test_input_file_not_found(tmp_path: Path):
     """测试输入文件不存在的情况"""
     runner = CliRunner()
@@ -60,4 +82,87 @@ def test_input_file_not_found(tmp_path: Path):
     # Click 会自动处理文件不存在的错误
     assert result.exit_code != 0
     assert "Error: Invalid value for 'INPUT_FILE'" in result.output
-    assert "does not exist" in result.output
\ No newline at end of file
+    assert "does not exist" in result.output
+
+def test_convert_tree_mirrors_layout(tmp_path: Path):
+    """测试 'marktypist convert-tree' 镜像目录结构，并报告单个文件的失败"""
+    runner = CliRunner()
+
+    src = tmp_path / "src"
+    (src / "guide").mkdir(parents=True)
+    (src / "index.md").write_text("# Index", encoding="utf-8")
+    (src / "guide" / "intro.typ").write_text("= Intro", encoding="utf-8")
+    (src / "guide" / "broken.md").write_bytes(b"\xff\xfe invalid utf-8")
+    (src / "notes.txt").write_text("ignored", encoding="utf-8")
+    out = tmp_path / "out"
+
+    result = runner.invoke(cli, ["convert-tree", str(src), "-O", str(out), "-j", "1"])
+
+    # 有文件失败时退出码非零，但其余文件仍然被转换
+    assert result.exit_code == 1
+    assert "broken.md" in result.output
+    assert "Converted 2 file(s), 1 failed" in result.output
+    assert (out / "index.typ").read_text(encoding="utf-8") == "= Index"
+    assert (out / "guide" / "intro.md").read_text(encoding="utf-8") == "# Intro"
+    assert not (out / "notes.md").exists()
+
+
+def test_convert_tree_glob_with_process_pool(tmp_path: Path):
+    """测试 glob 输入与多进程转换"""
+    runner = CliRunner()
+
+    src = tmp_path / "docs"
+    for i in range(4):
+        (src / f"part{i}").mkdir(parents=True)
+        (src / f"part{i}" / "page.md").write_text(f"**Page {i}**", encoding="utf-8")
+    out = tmp_path / "out"
+
+    result = runner.invoke(cli, ["convert-tree", str(src / "**" / "*.md"), "-O", str(out), "-j", "2"])
+
+    assert result.exit_code == 0, result.output
+    for i in range(4):
+        assert (out / f"part{i}" / "page.typ").read_text(encoding="utf-8") == f"*Page {i}*"
+
+
+def _crash_on_marker(task, cache=None):
+    if task[0].name == "crash.md":
+        os._exit(1)
+    return convert_one(task, cache)
+
+
+def test_convert_tree_survives_worker_crash(tmp_path: Path, monkeypatch):
+    """工作进程异常退出时，导致崩溃的文件报告为失败，其余文件照常转换"""
+    from marktypist import batch
+
+    src = tmp_path / "src"
+    src.mkdir()
+    names = [f"page{i:02}.md" for i in range(12)] + ["crash.md"]
+    for name in names:
+        (src / name).write_text(f"# Page {name[4:6]}", encoding="utf-8")
+    monkeypatch.setattr(batch, "convert_one", _crash_on_marker)
+
+    results = list(iter_convert_tree(str(src), tmp_path / "out", jobs=2))
+    assert [r.source.name for r in results] == sorted(names)
+    failed = [r for r in results if not r.ok]
+    assert [r.source.name for r in failed] == ["crash.md"] and "BrokenProcessPool" in failed[0].error
+    assert all((tmp_path / "out" / f"page{i:02}.typ").read_text(encoding="utf-8") == f"= Page {i:02}"
+               for i in range(12))
+
+
+def test_typ_conversion_does_not_import_markdown_it(tmp_path: Path):
+    """Typst -> Markdown 与 --help 不加载 markdown-it，CLI 启动更快"""
+    source = tmp_path / "doc.typ"
+    source.write_text("= Title\n\n*bold*", encoding="utf-8")
+    script = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from marktypist.cli import cli\n"
+        f"assert CliRunner().invoke(cli, ['convert', {str(source)!r}]).exit_code == 0\n"
+        "assert CliRunner().invoke(cli, ['--help']).exit_code == 0\n"
+        "print(sorted(m for m in sys.modules if m.startswith(('markdown_it', 'linkify_it'))))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=Path(__file__).parent.parent)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
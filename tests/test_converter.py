@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from marktypist import renderers
+from marktypist.main import Converter, convert_md_to_typ, get_default_converter
+
+
+def test_converter_reuses_parsers():
+    """同一线程内多次转换复用同一个 MarkdownParser"""
+    converter = Converter()
+    parser = converter.markdown_parser
+    assert converter.md_to_typ("# 标题") == "= 标题"
+    assert converter.typ_to_md("*粗体*") == "**粗体**"
+    assert converter.markdown_parser is parser
+
+
+def test_module_functions_share_default_converter():
+    parser = get_default_converter().markdown_parser
+    convert_md_to_typ("text")
+    assert get_default_converter().markdown_parser is parser
+
+
+def test_converter_is_safe_to_share_across_threads():
+    """多个线程共享一个 Converter，每个线程拥有自己的 MarkdownParser"""
+    converter = Converter()
+    docs = [f"Visit https://example.com/{i} and **item {i}**" for i in range(200)]
+    expected = [converter.md_to_typ(doc) for doc in docs]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        actual = list(pool.map(converter.md_to_typ, docs))
+    assert actual == expected
+
+    parsers = []
+    def grab():
+        parsers.append(converter.markdown_parser)
+    threads = [threading.Thread(target=grab) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert parsers[0] is not parsers[1]
+
+
+SOURCE = "# Title\n\nSome *text* with a [link](https://x.org).\n\n| a | b |\n|:--|--:|\n| 1 | 2 |\n"
+
+
+class CountingRenderer:
+    """测试用的渲染器：输出节点个数"""
+    def render(self, document):
+        return str(len(document.content))
+
+
+@pytest.fixture
+def counting_format():
+    renderers.register_renderer("count", ".count", CountingRenderer)
+    yield "count"
+    del renderers._RENDERERS["count"]
+
+
+def test_render_many_parses_once(counting_format, monkeypatch):
+    """一次解析得到的文档交给每种格式的渲染器，结果与单独转换相同"""
+    converter = Converter()
+    parses = []
+    parse = converter.markdown_parser.parse
+    monkeypatch.setattr(converter.markdown_parser, "parse", lambda text: parses.append(text) or parse(text))
+
+    outputs = converter.convert_text_to_many(SOURCE, ".md", ["typst", "markdown", counting_format])
+    assert len(parses) == 1
+    assert outputs["typst"] == Converter().md_to_typ(SOURCE)
+    assert outputs["markdown"].startswith("# Title\n\nSome *text*")
+    assert outputs[counting_format] == "3"
+    assert converter.renderer("typst") is converter.typst_renderer
+
+
+@pytest.mark.parametrize("jobs", [None, 2])
+def test_convert_file_to_many(tmp_path: Path, counting_format, jobs):
+    source = tmp_path / "doc.md"
+    source.write_text(SOURCE, encoding="utf-8")
+    targets = [tmp_path / "doc.typ", tmp_path / "normalized.md", tmp_path / "doc.count"]
+
+    Converter().convert_file_to_many(source, targets, jobs=jobs)
+    assert targets[0].read_text(encoding="utf-8") == Converter().md_to_typ(SOURCE)
+    assert Converter().md_to_typ(targets[1].read_text(encoding="utf-8")) == Converter().md_to_typ(SOURCE)
+    # 没有 render_to 的渲染器同样可以写文件
+    assert targets[2].read_text(encoding="utf-8") == "3"
+
+
+def test_convert_file_to_many_rejects_bad_targets(tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text(SOURCE, encoding="utf-8")
+    with pytest.raises(ValueError, match="overwrite the input"):
+        Converter().convert_file_to_many(source, [tmp_path / "doc.typ", source])
+    with pytest.raises(ValueError, match="more than once"):
+        Converter().convert_file_to_many(source, [tmp_path / "doc.typ", tmp_path / "sub" / ".." / "doc.typ"])
+    (tmp_path / "link.typ").symlink_to(tmp_path / "doc.typ")
+    with pytest.raises(ValueError, match="more than once"):
+        Converter().convert_file_to_many(source, [tmp_path / "doc.typ", tmp_path / "link.typ"], jobs=2)
+    with pytest.raises(ValueError, match="Unsupported output file format"):
+        Converter().convert_file_to_many(source, [tmp_path / "doc.pdf"])
+    with pytest.raises(ValueError, match="Unknown output format"):
+        Converter().render_many(None, ["pdf"])
@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.model import (
+    Bold, BlockQuote, Document, Italic, Link, ListItem, Paragraph, Text, UnorderedList,
+)
+from marktypist.typ_renderer import TypstRenderer
+
+DEPTH = 10_000
+
+
+def nested_inline(wrap, depth=DEPTH):
+    node = Text(content="x")
+    for _ in range(depth):
+        node = wrap([node])
+    return Document(content=[Paragraph(content=[node])])
+
+
+def nested_blocks(wrap, depth=DEPTH):
+    node = Paragraph(content=[Text(content="x")])
+    for _ in range(depth):
+        node = wrap([node])
+    return Document(content=[node])
+
+
+def test_depth_exceeds_recursion_limit():
+    assert DEPTH > sys.getrecursionlimit()
+
+
+@pytest.mark.parametrize("wrap, typst, markdown", [
+    (lambda c: Bold(content=c), ("*", "*"), ("**", "**")),
+    (lambda c: Italic(content=c), ("_", "_"), ("*", "*")),
+    (lambda c: Link(url="u", content=c), ('#link("u")[', "]"), ("[", "](u)")),
+])
+def test_deep_inline_nesting(wrap, typst, markdown):
+    document = nested_inline(wrap)
+    assert TypstRenderer().render(document) == typst[0] * DEPTH + "x" + typst[1] * DEPTH
+    assert MarkdownRenderer().render(document) == markdown[0] * DEPTH + "x" + markdown[1] * DEPTH
+
+
+def test_deep_blockquote_nesting():
+    document = nested_blocks(lambda c: BlockQuote(content=c))
+    assert TypstRenderer().render(document) == "#quote[" * DEPTH + "x" + "]" * DEPTH
+    assert MarkdownRenderer().render(document) == "> " * DEPTH + "x"
+
+
+def test_deep_list_nesting():
+    document = nested_blocks(lambda c: UnorderedList(items=[ListItem(content=c)]))
+    assert TypstRenderer().render(document) == "- " * DEPTH + "x"
+    assert MarkdownRenderer().render(document) == "- " * DEPTH + "x"
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from marktypist.incremental import IncrementalDocument
+from marktypist.main import convert_md_to_typ
+
+SNIPPETS = [
+    "# Heading", "paragraph line", "second line", "", "", "- item", "- other",
+    "  continuation", "1. first", "> quote", "> > nested", "lazy line",
+    "```python", "print(1)", "```", "| a | b |", "| - | - |", "| 1 | `x` |",
+    "---", "===", "    indented", "**bold** and *italic*", "[link](https://example.com)",
+]
+INSERTIONS = ["\n", "- ", "# ", "`", "```", "a", "*", "> ", "|", "\n\n", "=", ""]
+
+
+def test_initial_document_matches_full_conversion():
+    text = "\n".join(SNIPPETS)
+    doc = IncrementalDocument(text)
+    assert doc.text == text
+    assert doc.typst == convert_md_to_typ(text)
+
+
+def test_edit_returns_local_patch():
+    doc = IncrementalDocument("# A\n\none\n\ntwo\n\nthree\n\nfour\n")
+    patch = doc.edit(6, 0, 6, 5, "**THREE**")
+    assert doc.typst == convert_md_to_typ(doc.text)
+    assert patch.index >= 1
+    assert "*THREE*" in "".join(patch.inserted)
+    # 只重新生成了附近的几个块
+    assert patch.removed <= 3
+
+
+def test_unclosed_fence_reaches_end_of_document():
+    doc = IncrementalDocument("intro\n\n" + "\n\n".join(f"para {i}" for i in range(20)))
+    doc.edit(1, 0, 1, 0, "```")
+    assert doc.typst == convert_md_to_typ(doc.text)
+    doc.edit(1, 0, 1, 3, "")
+    assert doc.typst == convert_md_to_typ(doc.text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_match_full_conversion(seed):
+    """随机编辑后增量结果始终与整体转换相同"""
+    rng = random.Random(seed)
+    text = "\n".join(rng.choice(SNIPPETS) for _ in range(rng.randint(0, 40)))
+    doc = IncrementalDocument(text)
+    for _ in range(20):
+        lines = doc.lines
+        start_line = rng.randrange(len(lines))
+        end_line = min(len(lines) - 1, start_line + rng.choice([0, 0, 1, 3]))
+        start_col = rng.randint(0, len(lines[start_line]))
+        if end_line > start_line:
+            end_col = rng.randint(0, len(lines[end_line]))
+        else:
+            end_col = rng.randint(start_col, len(lines[start_line]))
+        doc.edit(start_line, start_col, end_line, end_col, rng.choice(INSERTIONS) + rng.choice(INSERTIONS))
+        assert doc.typst == convert_md_to_typ(doc.text)
@@ -0,0 +1,71 @@
+import pytest
+from markdown_it import MarkdownIt
+
+from marktypist.main import convert_md_to_typ, converter_for
+from marktypist.md_parser import MarkdownParser, UdmRenderer
+from marktypist.model import Table, Text
+
+TABLES = [
+    "| a | b |\n|---|:-:|\n| x \\| y | see www.example.com |\n| [r][ref] | &amp; |\n| 1 |\n| 1 | 2 | 3 |\n|  | e |\n\n"
+    "[ref]: https://example.com",
+    "- item\n\n  | a | b |\n  |--|--|\n  | *e* | `c` |\n> | q | r |\n> |---|---|\n> | 1 | 2 |\n> quote",
+    "para\n| a | b |\n| - | - |\n| c | d |\n    code\n",
+    "| a |\n|---|\n| b |\n# heading\n| c |",
+    '|a|b|\n|-:|:-|\n|x.com|mail@x.org|\n|http://a.b/c|a_b_c|\n|"q"|back\\\\slash|',
+]
+
+
+def _without_align(node):
+    if isinstance(node, Table):
+        node.align = []
+    for child in getattr(node, "content", None) or getattr(node, "items", None) or []:
+        if not isinstance(child, str):
+            _without_align(child)
+    return node
+
+
+@pytest.mark.parametrize("text", TABLES)
+def test_fast_path_matches_markdown_it_table_rule(text):
+    """表格快速路径与 markdown-it 自带的表格规则得到相同的 UDM（自带的规则不填写 align）"""
+    stock = UdmRenderer().render(MarkdownIt("gfm-like").parse(text))
+    assert _without_align(MarkdownParser().parse(text)) == _without_align(stock)
+
+
+def test_table_is_one_token_with_plain_cells_left_as_strings():
+    tokens = MarkdownParser().tokenize("| a | b |\n|---|---|\n| plain | *em* |\n| 2.5 | www.example.com |\n")
+    assert [token.type for token in tokens] == ["table"]
+    plain, marked = tokens[0].meta["columns"]
+    assert plain == ["a", "plain", "2.5"]
+    assert marked[0] == "b"
+    # 需要内联解析的单元格换成了已解析的 inline token
+    assert [child.type for child in marked[1].children] == ["em_open", "text", "em_close"]
+    assert "link_open" in [child.type for child in marked[2].children]
+
+
+def test_alignment_is_parsed_and_rendered():
+    text = "| a | b | c | d |\n|:--|:-:|--:|---|\n| 1 | 2 | 3 | 4 |"
+    table = MarkdownParser().parse(text).content[0]
+    assert table.align == ["left", "center", "right", ""]
+    assert convert_md_to_typ(text) == (
+        '#table(\n'
+        '  columns: (auto, auto, auto, auto),\n'
+        '  align: (left, center, right, auto),\n'
+        '  [*a*], [*b*], [*c*], [*d*],\n'
+        '  "1", "2", "3", "4",\n'
+        ')'
+    )
+    # 没有指定对齐方式时不输出 align
+    assert "align" not in convert_md_to_typ("| a |\n|---|\n| 1 |")
+
+
+def test_alignment_round_trips_through_typst():
+    text = "| a | b | c |\n|:--|:-:|--:|\n| 1 | 2 | 3 |"
+    typst = convert_md_to_typ(text)
+    markdown = converter_for("lark").typ_to_md(typst)
+    assert "| :--- | :---: | ---: |" in markdown
+
+
+def test_cells_are_escaped_as_string_literals():
+    table = MarkdownParser().parse('| a |\n|---|\n| say "hi" \\\\ |\n').content[0]
+    assert table.rows[0].cells[0].content == [Text('say "hi" \\')]
+    assert '  "say \\"hi\\" \\\\",\n' in convert_md_to_typ('| a |\n|---|\n| say "hi" \\\\ |\n')
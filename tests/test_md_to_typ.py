@@ -46,6 +46,7 @@ MD_TO_TYP_BASIC_CASES = [
         # Expected Typst Table
         '#table(\n'
         '  columns: (auto, auto),\n'
+        '  align: (left, left),\n'
         '  [*命令*], [*描述*],\n'
         '  `git status`, "列出所有新的或修改的文件",\n'
         '  `git diff`, "显示文件差异",\n'
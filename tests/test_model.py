@@ -0,0 +1,40 @@
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from marktypist.md_parser import MarkdownParser
+from marktypist.model import Bold, Code, Document, Image, Link, Paragraph, Text
+from marktypist.typ_parser import TypstParser
+
+
+def test_nodes_have_no_instance_dict():
+    for node in (Text(content="a"), Bold(content=[]), Paragraph(content=[]), Document(content=[])):
+        assert not hasattr(node, "__dict__")
+
+
+def test_leaf_nodes_are_frozen():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        Text(content="a").content = "b"
+    assert Text("a") == Text(content="a")
+    assert hash(Code("x")) == hash(Code(content="x"))
+
+
+def test_pickle_and_copy_round_trip():
+    doc = Document(content=[Paragraph(content=[
+        Text(content="a"), Bold(content=[Code(content="c")]),
+        Link(url="u", content=[Image(src="s", alt="t")]),
+    ])])
+    assert pickle.loads(pickle.dumps(doc)) == doc
+    assert copy.deepcopy(doc) == doc
+
+
+def test_markdown_adjacent_text_is_coalesced():
+    doc = MarkdownParser().parse("one\ntwo")
+    assert [type(node) for node in doc.content[0].content] == [Text]
+
+
+def test_typst_paragraph_lines_are_coalesced():
+    doc = TypstParser().parse("one\n*two* three\nfour")
+    assert [type(node) for node in doc.content[0].content] == [Text, Bold, Text]
@@ -0,0 +1,194 @@
+import json
+import os
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from marktypist.cli import cli
+from marktypist.main import Converter
+from marktypist.md_parser import MarkdownParser
+from marktypist.model import Heading, Image, Link
+from marktypist.outline import (
+    Outline, OutlineHeading, _outline_one, _plain_text, iter_outline_tree, outline_typst,
+)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+MARKDOWN = """\
+# Title with [a link](https://a.example) and *emphasis*
+
+Intro with www.example.com and <https://auto.example>, plus ![logo](logo.png "t").
+
+## `code` heading
+
+- item [ref][r] **bold [inner](https://inner.example)**
+- ![[nested](https://not-a-link.example)](img.png)
+
+| name | target |
+|------|--------|
+| x | [cell](https://cell.example) |
+| ![c](cell.png) | plain |
+
+> quoted [q](https://q.example)
+
+<a href="https://html.example">html</a> and `[code](https://code.example)`
+
+Setext heading
+--------------
+
+[r]: https://ref.example
+"""
+
+
+def udm_outline(document) -> Outline:
+    """从完整解析的 UDM 中收集标题、链接和图片，作为对照"""
+    result = Outline()
+    stack = [document]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+            continue
+        if isinstance(node, Heading):
+            result.headings.append(OutlineHeading(node.level, _plain_text(node.content), 0))
+        elif isinstance(node, Link):
+            result.links.append(node.url)
+        elif isinstance(node, Image):
+            result.images.append(node.src)
+        if is_dataclass(node):
+            stack.extend(reversed([getattr(node, field.name) for field in fields(node)]))
+    return result
+
+
+@pytest.mark.parametrize("text", [
+    MARKDOWN,
+    (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8"),
+])
+def test_markdown_outline_matches_udm(text):
+    outline = Converter().outline_text(text, ".md")
+    expected = udm_outline(MarkdownParser().parse(text))
+    assert outline.links == expected.links
+    assert outline.images == expected.images
+    assert [(h.level, h.text) for h in outline.headings] == [(h.level, h.text) for h in expected.headings]
+
+
+def test_markdown_outline_details():
+    outline = Converter().outline_text(MARKDOWN, ".md")
+    assert [(h.level, h.text, h.line) for h in outline.headings] == [
+        (1, "Title with a link and emphasis", 1),
+        (2, "code heading", 5),
+        (2, "Setext heading", 19),
+    ]
+    assert outline.links == [
+        "https://a.example", "http://www.example.com", "https://auto.example", "https://ref.example",
+        "https://inner.example", "https://cell.example", "https://q.example",
+    ]
+    assert outline.images == ["logo.png", "img.png", "cell.png"]
+    assert "https://html.example" not in outline.links
+
+
+def test_typst_outline():
+    text = (
+        '= Title with #link("https://a.example")[link]\n'
+        '\n'
+        'Text #link("https://b.example/\\"q\\"")[b] and #image("pic.png") #image("two.png", width: 50%)\n'
+        '```\n'
+        '= not a heading #link("https://raw.example")[x]\n'
+        '```\n'
+        '== *Bold* _it_\n'
+    )
+    outline = Converter().outline_text(text, ".typ")
+    assert [(h.level, h.line) for h in outline.headings] == [(1, 1), (2, 7)]
+    assert outline.headings[1].text == "Bold it"
+    assert outline.links == ["https://a.example", 'https://b.example/"q"']
+    assert outline.images == ["pic.png", "two.png"]
+    assert outline_typst(iter(text.splitlines())) == outline
+
+
+TYPST_EDGE_CASES = """\
+= Title #link("https://h.example")[h] // #link("https://heading-comment.example")
+text `#link("https://raw.example")` more #link("https://after-raw.example")[x]
+// #image("commented.png")
+a // #link("https://comment.example")[c]
+see https://x.org/a//b and #image("kept.png")
+\\#link("https://escaped.example")[e] and "#link("https://quoted.example")[q]"
+#image("a.png", alt: "#link(\\"https://alt.example\\")")
+#table(columns: 2, "#link(\\"https://cell.example\\")", [#link("https://t.example")[t]])
+"""
+
+
+def test_typst_outline_matches_lark():
+    """行内代码、注释、转义和字符串参数中的 #link / #image 不算，与 LarkTypstParser 一致"""
+    from marktypist.typ_lark_parser import LarkTypstParser
+
+    outline = Converter().outline_text(TYPST_EDGE_CASES, ".typ")
+    expected = udm_outline(LarkTypstParser().parse(TYPST_EDGE_CASES))
+    assert outline.links == expected.links == [
+        "https://h.example", "https://after-raw.example", "https://quoted.example", "https://t.example",
+    ]
+    assert outline.images == expected.images == ["kept.png", "a.png"]
+    # 标题文本由 TypstParser 解析（它不识别 #link），行尾的注释不属于标题
+    assert [(h.level, h.text) for h in outline.headings] == [(1, 'Title #link("https://h.example")[h]')]
+
+
+def test_outline_unsupported_suffix():
+    with pytest.raises(ValueError, match="Unsupported input file format"):
+        Converter().outline_text("x", ".txt")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_outline_tree(tmp_path: Path, jobs):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.md").write_text("# A\n\n[x](https://x.example)", encoding="utf-8")
+    (tmp_path / "sub" / "b.typ").write_text('= B\n#image("b.png")', encoding="utf-8")
+    (tmp_path / "sub" / "bad.md").write_bytes(b"\xff\xfe# broken")
+
+    results = list(iter_outline_tree(str(tmp_path), jobs))
+    assert [r.source.name for r in results] == ["a.md", "b.typ", "bad.md"]
+    assert results[0].outline.links == ["https://x.example"]
+    assert results[1].outline.images == ["b.png"]
+    assert not results[2].ok and "UnicodeDecodeError" in results[2].error
+
+
+def _crash_on_marker(source):
+    if source.name == "crash.md":
+        os._exit(1)
+    return _outline_one(source)
+
+
+def test_outline_tree_survives_worker_crash(tmp_path: Path, monkeypatch):
+    """工作进程异常退出时，导致崩溃的文件报告为失败，其余文件的大纲照常产出"""
+    from marktypist import outline
+
+    names = [f"page{i:02}.md" for i in range(12)] + ["crash.md"]
+    for name in names:
+        (tmp_path / name).write_text(f"# Page {name[4:6]}", encoding="utf-8")
+    monkeypatch.setattr(outline, "_outline_one", _crash_on_marker)
+
+    results = list(iter_outline_tree(str(tmp_path), 2))
+    assert [r.source.name for r in results] == sorted(names)
+    failed = [r for r in results if not r.ok]
+    assert [r.source.name for r in failed] == ["crash.md"] and "BrokenProcessPool" in failed[0].error
+    assert [r.outline.headings[0].text for r in results if r.ok] == [f"Page {i:02}" for i in range(12)]
+
+
+def test_outline_cli(tmp_path: Path):
+    (tmp_path / "doc.md").write_text("# Top\n\n## Sub\n\n![i](i.png) [l](https://l.example)", encoding="utf-8")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["outline", str(tmp_path / "doc.md")])
+    assert result.exit_code == 0, result.output
+    assert result.output.splitlines()[1:] == [
+        "  Top (line 1)", "    Sub (line 3)", "  link: https://l.example", "  image: i.png",
+    ]
+
+    result = runner.invoke(cli, ["outline", "--json", "-j", "1", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output)
+    assert data["headings"] == [{"level": 1, "text": "Top", "line": 1}, {"level": 2, "text": "Sub", "line": 3}]
+    assert data["links"] == ["https://l.example"] and data["images"] == ["i.png"]
+
+    result = runner.invoke(cli, ["outline", str(tmp_path / "missing")])
+    assert result.exit_code == 2
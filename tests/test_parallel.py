@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from marktypist import parallel
+from marktypist.cli import cli
+from marktypist.main import convert_file, convert_md_to_typ
+from marktypist.parallel import parallel_md_to_typ, split_markdown
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+LARGE_MD = "".join(
+    f"# Section {i}\n\n"
+    f"Paragraph with **bold** and *italic*\ncontinued on a second line.\n\n"
+    f"- item {i}\n- item {i + 1}\n\n  loose continuation\n\n"
+    f"3. ordered\n\n4. loose\n\n"
+    f"> quote\n> > nested\nlazy line\n\n"
+    f"```python\nprint({i})\n\n\nafter blank lines\n```\n\n"
+    f"<!--\n\ncomment with blank lines\n\n-->\n\n"
+    f"    indented code\n\n    more code\n\n"
+    f"| a | b |\n| - | - |\n| {i} | `x` |\n\n"
+    for i in range(30)
+)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize("chunk_size", [1, 50, 400, 5000])
+def test_parallel_is_byte_identical(executor, chunk_size):
+    """并行转换的输出与顺序转换逐字节相同"""
+    assert len(split_markdown(LARGE_MD, chunk_size)) > 1
+    assert parallel_md_to_typ(LARGE_MD, jobs=2, chunk_size=chunk_size, executor=executor) == convert_md_to_typ(LARGE_MD)
+
+
+def test_split_points_are_top_level_boundaries():
+    chunks = split_markdown(LARGE_MD, 1)
+    assert "".join(chunks) == LARGE_MD
+    for chunk in chunks[1:]:
+        # 不会在围栏、HTML 注释、列表、引用或缩进代码块内部切分
+        assert chunk[0] not in " \t\n>-0123456789"
+        assert not chunk.startswith(("print(", "after blank", "comment with", "-->", "more code"))
+
+
+def test_fixture_and_crlf(executor):
+    text = (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8") * 5
+    for source in (text, text.replace("\n", "\r\n")):
+        assert parallel_md_to_typ(source, jobs=2, chunk_size=100, executor=executor) == convert_md_to_typ(source)
+
+
+def test_unsafe_split_falls_back(executor, monkeypatch):
+    """行首扫描看不出列表项中的围栏被顶层围栏接替，切分点落在围栏内部时回退到整体转换"""
+    text = "- item\n\n  ```\n  code\n```\n\nstill code\n\n```\n\nafter\n"
+    results = []
+    convert_chunk = parallel._convert_chunk
+    monkeypatch.setattr(parallel, "_convert_chunk", lambda task: results.append(convert_chunk(task)) or results[-1])
+    assert parallel_md_to_typ(text, jobs=2, chunk_size=1, executor=executor) == convert_md_to_typ(text)
+    assert None in results
+
+
+def test_reference_definitions_convert_serially(executor, monkeypatch):
+    text = "See [the docs][docs].\n\n" + "Filler paragraph.\n\n" * 20 + "[docs]: https://example.com\n"
+    monkeypatch.setattr(parallel, "_convert_chunk", lambda task: pytest.fail("should not split"))
+    assert parallel_md_to_typ(text, jobs=2, chunk_size=1, executor=executor) == convert_md_to_typ(text)
+
+
+def test_process_pool_and_convert_file(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 1000)
+    source = tmp_path / "large.md"
+    source.write_text("\ufeff" + LARGE_MD, encoding="utf-8")
+    convert_file(source, tmp_path / "serial.typ")
+    convert_file(source, tmp_path / "parallel.typ", jobs=2)
+    assert (tmp_path / "parallel.typ").read_bytes() == (tmp_path / "serial.typ").read_bytes()
+
+    result = CliRunner().invoke(cli, ["convert", str(source), "--jobs", "2"])
+    assert result.exit_code == 0, result.output
+    assert convert_md_to_typ(LARGE_MD) in result.output
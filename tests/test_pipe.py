@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from marktypist.main import convert_md_to_typ, convert_typ_to_md
+from marktypist.pipe import LENGTH_PREFIX, encode_frame, read_frames, run_pipe
+from marktypist.protocol import handle_request
+
+REQUESTS = [{"id": i, "direction": "md->typ" if i % 2 else "typ->md", "text": f"# Doc {i}" if i % 2 else f"= Doc {i}"}
+            for i in range(20)]
+
+
+def expected_text(request):
+    convert = convert_md_to_typ if request["direction"] == "md->typ" else convert_typ_to_md
+    return convert(request["text"])
+
+
+def run(framing, messages, workers=1, ordered=True, raw=b""):
+    source = io.BytesIO(b"".join(encode_frame(m, framing) for m in messages) + raw)
+    target = io.BytesIO()
+    run_pipe(source, target, framing, workers, ordered)
+    return [json.loads(frame) for frame in read_frames(io.BytesIO(target.getvalue()), framing)]
+
+
+@pytest.mark.parametrize("framing", ["ndjson", "length"])
+def test_framings_round_trip(framing):
+    message = {"id": "x", "text": "line 1\nline 2 中文"}
+    frame = encode_frame(message, framing)
+    if framing == "length":
+        assert LENGTH_PREFIX.unpack(frame[:4])[0] == len(frame) - 4
+    assert [json.loads(f) for f in read_frames(io.BytesIO(frame * 2), framing)] == [message, message]
+
+
+@pytest.mark.parametrize("framing", ["ndjson", "length"])
+def test_pipe_converts_in_order(framing):
+    responses = run(framing, REQUESTS + [{"op": "ping", "id": "p"}])
+    assert [r["id"] for r in responses] == list(range(20)) + ["p"]
+    assert all(r["ok"] and r["text"] == expected_text(q) for q, r in zip(REQUESTS, responses))
+    assert responses[-1]["requests"] == 20
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_worker_pool(ordered):
+    responses = run("length", REQUESTS, workers=2, ordered=ordered)
+    if ordered:
+        assert [r["id"] for r in responses] == list(range(20))
+    by_id = {r["id"]: r for r in responses}
+    assert sorted(by_id) == list(range(20))
+    assert all(by_id[q["id"]]["text"] == expected_text(q) for q in REQUESTS)
+
+
+def test_errors_and_shutdown():
+    responses = run("ndjson", [{"id": 1, "direction": "typ->typ", "text": ""}], raw=b"not json\n"
+                    + encode_frame({"op": "shutdown", "id": 2}) + encode_frame({"id": 3, "direction": "md->typ", "text": "a"}))
+    assert [r["ok"] for r in responses] == [False, False, True]
+    assert "ProtocolError" in responses[0]["error"] and "Invalid JSON" in responses[1]["error"]
+    assert responses[2]["id"] == 2  # shutdown 之后的请求不再处理
+
+    # 截断的长度前缀帧无法继续分帧：报告错误后结束
+    responses = run("length", REQUESTS[:1], raw=LENGTH_PREFIX.pack(100) + b"{}")
+    assert responses[0]["ok"] and "truncated" in responses[1]["error"]
+
+
+def _crash_worker(request):
+    if request["id"] == 0:
+        os._exit(1)
+    return handle_request(request)
+
+
+class _NotifyingTarget(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.written = threading.Event()
+
+    def write(self, data):
+        size = super().write(data)
+        self.written.set()
+        return size
+
+
+class _WaitingSource(io.BytesIO):
+    """第一行之后的数据要等 target 写出第一个响应才能读到"""
+
+    def __init__(self, data, target):
+        super().__init__(data)
+        self.target = target
+
+    def readline(self, size=-1):
+        if self.tell():
+            self.target.written.wait(30)
+        return super().readline(size)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_worker_failure_keeps_request_id(monkeypatch, ordered):
+    """
+    工作进程异常退出时，错误响应同样带有请求的 "id"；之后到达的请求也各得到一个响应，
+    进程池换新后照常转换
+    """
+    from marktypist import pipe
+
+    monkeypatch.setattr(pipe, "handle_request", _crash_worker)
+    target = _NotifyingTarget()
+    # 第一个响应写出时进程池已经失效，后面的请求到达时需要换新的进程池
+    source = _WaitingSource(b"".join(encode_frame(r) for r in REQUESTS[:8]), target)
+    run_pipe(source, target, "ndjson", 2, ordered)
+
+    responses = [json.loads(frame) for frame in read_frames(io.BytesIO(target.getvalue()), "ndjson")]
+    assert sorted(r["id"] for r in responses) == list(range(8))
+    by_id = {r["id"]: r for r in responses}
+    assert not by_id[0]["ok"] and "BrokenProcessPool" in by_id[0]["error"]
+    assert all(by_id[q["id"]]["text"] == expected_text(q) for q in REQUESTS[2:8])
+
+
+def test_file_requests(tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text("**bold**", encoding="utf-8")
+    responses = run("ndjson", [{"id": 1, "input": str(source)},
+                               {"id": 2, "input": str(source), "output": str(tmp_path / "doc.typ")}])
+    assert responses[0]["text"] == "*bold*" and responses[1]["ok"]
+    assert (tmp_path / "doc.typ").read_text(encoding="utf-8") == "*bold*"
+
+
+def test_cli_pipe_subprocess():
+    """长期运行的子进程：逐个请求、逐个读取响应（每个响应立即写出）"""
+    process = subprocess.Popen([sys.executable, "-m", "marktypist.cli", "pipe"],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=Path(__file__).parent.parent)
+    try:
+        for request in REQUESTS[:3]:
+            process.stdin.write(encode_frame(request))
+            process.stdin.flush()
+            response = json.loads(process.stdout.readline())
+            assert response == {"ok": True, "text": expected_text(request), "id": request["id"]}
+    finally:
+        process.stdin.close()
+        assert process.wait(30) == 0
@@ -0,0 +1,86 @@
+import pstats
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from marktypist.cli import cli
+from marktypist.main import Converter, convert_md_to_typ, convert_typ_to_md
+from marktypist.profiling import Profiler, count_nodes, get_profiler
+
+MARKDOWN = "# Title\n\nSome **bold** text.\n\n- one\n- two\n"
+
+
+def test_disabled_by_default():
+    assert get_profiler() is None
+    with Profiler() as profiler:
+        assert get_profiler() is profiler
+    assert get_profiler() is None
+
+
+def test_md_to_typ_stages():
+    profiles = []
+    with Profiler(callback=profiles.append) as profiler:
+        result = convert_md_to_typ(MARKDOWN)
+
+    # 插桩不改变输出
+    assert result == convert_md_to_typ(MARKDOWN)
+    assert profiler.profiles == profiles
+    [run] = profiles
+    assert run.direction == "md->typ"
+    assert [stage.name for stage in run.stages] == ["tokenize", "build", "render"]
+    assert run.stage("tokenize").count > 0 and run.stage("tokenize").unit == "tokens"
+    assert run.stage("build").unit == "nodes"
+    assert run.stage("render").count == len(result)
+    assert run.seconds >= sum(stage.seconds for stage in run.stages)
+    assert run.stage("tokenize").peak_bytes is None
+    assert "tokenize" in str(run)
+
+
+def test_typ_to_md_stages():
+    with Profiler() as profiler:
+        convert_typ_to_md("= Title\n\n*bold* text")
+    [run] = profiler.profiles
+    assert run.direction == "typ->md"
+    assert [stage.name for stage in run.stages] == ["parse", "render"]
+
+
+def test_convert_file_is_one_profile(tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text(MARKDOWN, encoding="utf-8")
+    with Profiler(memory=True) as profiler:
+        Converter().convert_file(source, tmp_path / "doc.typ")
+
+    [run] = profiler.profiles
+    assert run.source == str(source)
+    assert [stage.name for stage in run.stages] == ["read", "tokenize", "build", "render"]
+    assert all(stage.peak_bytes is not None for stage in run.stages)
+
+
+def test_pstats_dump(tmp_path: Path):
+    with Profiler(pstats_dir=tmp_path / "prof") as profiler:
+        convert_md_to_typ(MARKDOWN)
+        convert_md_to_typ(MARKDOWN)
+
+    paths = [run.pstats_path for run in profiler.profiles]
+    assert len(set(paths)) == 2
+    assert pstats.Stats(str(paths[0])).total_calls > 0
+
+
+def test_count_nodes():
+    document = Converter().markdown_parser.parse("a **b** c")
+    # Document, Paragraph, Text, Bold, Text, Text
+    assert count_nodes(document) == 6
+
+
+def test_cli_profile(tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text(MARKDOWN, encoding="utf-8")
+    result = CliRunner().invoke(cli, [
+        "convert", str(source), "-o", str(tmp_path / "doc.typ"),
+        "--profile", "--profile-dir", str(tmp_path / "prof"),
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert "Profile md->typ" in result.output
+    assert "tokenize" in result.output
+    assert list((tmp_path / "prof").glob("*.pstats"))
@@ -0,0 +1,51 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from marktypist import reader
+from marktypist.main import Converter
+from marktypist.reader import iter_source_lines
+from marktypist.typ_parser import TypstParser
+
+PIECES = ["a", "中", "😀", " ", "\n", "\r", "\r\n", "\x85", "\u2028", "= h", "*b*"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 4096])
+def test_matches_read_text_splitlines(tmp_path: Path, chunk_size: int):
+    """任意分块位置（包括 "\\r\\n" 与多字节字符被切开）都与 read_text().splitlines() 相同"""
+    path = tmp_path / "doc.typ"
+    for seed in range(200):
+        rng = random.Random(seed)
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        path.write_bytes((b"\xef\xbb\xbf" if seed % 3 == 0 else b"") + text.encode("utf-8"))
+        assert list(iter_source_lines(path, chunk_size)) == path.read_text(encoding="utf-8-sig").splitlines()
+
+
+def test_memory_mapped_file(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(reader, "MMAP_THRESHOLD", 1)
+    path = tmp_path / "doc.typ"
+    lines = [f"line {i} *中文*" for i in range(5000)]
+    path.write_bytes(b"\xef\xbb\xbf" + "\r\n".join(lines).encode("utf-8"))
+    assert list(iter_source_lines(path, chunk_size=5000)) == lines
+
+
+def test_invalid_utf8(tmp_path: Path):
+    path = tmp_path / "doc.typ"
+    path.write_bytes(b"ok\n\xff\xfe")
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_source_lines(path))
+
+
+def test_parse_lines_and_convert_file(tmp_path: Path):
+    text = "= Title\n\nSome *bold*\ncontinued\n\n- a\n- b _c_\n"
+    parser = TypstParser()
+    assert parser.parse_lines(iter(text.splitlines())) == parser.parse(text)
+
+    source = tmp_path / "doc.typ"
+    source.write_text(text, encoding="utf-8-sig")
+    converter = Converter()
+    expected = converter.typ_to_md(text)
+    assert converter.convert_file(source) == expected
+    converter.convert_file(source, tmp_path / "doc.md")
+    assert (tmp_path / "doc.md").read_text(encoding="utf-8") == expected
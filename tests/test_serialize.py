@@ -0,0 +1,149 @@
+import io
+import pickle
+from pathlib import Path
+
+import pytest
+
+from marktypist import serialize
+from marktypist.arena import TABLE_ROW, TEXT, ArenaTypstRenderer, NodeArena
+from marktypist.md_parser import MarkdownParser
+from marktypist.model import (
+    BlockQuote, Bold, Code, CodeBlock, Document, Heading, Image, Italic, Link, ListItem, OrderedList,
+    Paragraph, Table, TableCell, TableRow, Text, UnorderedList,
+)
+from marktypist.typ_renderer import TypstRenderer
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# 覆盖所有节点类型，包括空文本、空列表、非标准的 align 和代理字符
+HAND_BUILT = Document(content=[
+    Heading(level=3, content=[Text(""), Bold(content=[Italic(content=[Text("é \ud800")])])]),
+    Paragraph(content=[Link(url="https://x", content=[Code("a|b"), Image(src="i.png", alt='q "x"')])]),
+    OrderedList(start=7, items=[ListItem(content=[]), ListItem(content=[CodeBlock(language="", content="x\n")])]),
+    UnorderedList(items=[]),
+    BlockQuote(content=[Table(header=TableRow(cells=[TableCell(content=[])]), align=["left + top"], rows=[])]),
+    Table(header=TableRow(cells=[]), align=[], rows=[TableRow(cells=[TableCell(content=[Text("1")])])]),
+    CodeBlock(language="rust", content="fn main() {}"),
+])
+
+DOCUMENTS = [
+    HAND_BUILT,
+    MarkdownParser().parse((FIXTURES_DIR / "basic.md").read_text(encoding="utf-8")),
+    MarkdownParser().parse("| a | **b** |\n|:--|--:|\n| x | `y` |\n\n1. one\n2. two\n\n> q\n> - r"),
+    Document(content=[]),
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("compress", [False, True])
+def test_binary_round_trip(document, compress):
+    data = serialize.dumps(document, compress=compress)
+    assert data.startswith(serialize.MAGIC)
+    assert serialize.loads(data) == document
+    assert serialize.loads_lazy(data).to_document() == document
+
+    stream = io.BytesIO()
+    serialize.dump(document, stream, compress=compress)
+    stream.seek(0)
+    assert serialize.load(stream) == document
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_json_round_trip(document):
+    assert serialize.loads_json(serialize.dumps_json(document, indent=2)) == document
+
+
+def test_single_node_round_trip():
+    node = Paragraph(content=[Text("a"), Bold(content=[Text("b")])])
+    assert serialize.loads(serialize.dumps(node)) == node
+
+
+def test_loaded_arena_renders_without_building_udm():
+    text = (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8")
+    parser = MarkdownParser()
+    arena = serialize.loads_arena(serialize.dumps_arena(parser.parse_arena(text)))
+    assert ArenaTypstRenderer().render(arena) == TypstRenderer().render(parser.parse(text))
+
+
+def test_lazy_document_decodes_blocks_on_access():
+    lazy = serialize.loads_lazy(serialize.dumps(HAND_BUILT))
+    assert len(lazy) == len(HAND_BUILT.content)
+    assert lazy._decoded == [None] * len(lazy)
+    assert lazy[2] == HAND_BUILT.content[2]
+    assert lazy[2] is lazy[2]
+    assert sum(block is not None for block in lazy._decoded) == 1
+
+
+def test_deep_nesting_round_trip():
+    """编码和解码都不递归"""
+    node = Text("x")
+    for _ in range(10_000):
+        node = Bold(content=[node])
+    document = Document(content=[Paragraph(content=[node])])
+    arena = serialize.loads_arena(serialize.dumps(document))
+    assert len(arena) == 10_003
+    innermost = arena.to_node(10_002)
+    assert innermost == Text("x")
+
+
+def test_smaller_than_pickle_when_compressed():
+    document = DOCUMENTS[1]
+    assert len(serialize.dumps(document, compress=True)) < len(pickle.dumps(document, pickle.HIGHEST_PROTOCOL))
+
+
+def _corrupt(data: bytes, offset: int) -> bytes:
+    return data[:offset] + bytes([data[offset] ^ 0x01]) + data[offset + 1:]
+
+
+def _crafted(**changes) -> bytes:
+    """修改 arena 的数组后重新编码（校验和正确，但结构不合法）"""
+    arena = NodeArena.from_document(HAND_BUILT)
+    for name, (index, value) in changes.items():
+        getattr(arena, name)[index] = value
+    return serialize.dumps_arena(arena)
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"MTU", "truncated header"),
+    (b"XXXX" + bytes(20), "not a serialized"),
+    (serialize.MAGIC + bytes([99]) + bytes(19), "unsupported format version 99"),
+    (serialize.dumps(HAND_BUILT)[:-1], "expected"),
+    (serialize.dumps(HAND_BUILT, compress=True)[:-4], "checksum mismatch"),
+    (_corrupt(serialize.dumps(HAND_BUILT), 60), "checksum mismatch"),
+    (_crafted(kind=(3, 17)), "unknown node kind"),
+    (_crafted(end=(2, 99)), "invalid tree structure"),
+    (_crafted(parent=(5, 0)), "invalid tree structure"),
+    (_crafted(end=(2, 4)), "leaf node 2 has children"),
+    (_crafted(kind=(20, TEXT)), "node 20 of kind 11 is not allowed in node 19 of kind 8"),
+    (_crafted(kind=(14, TABLE_ROW)), "node 14 of kind 9 is not allowed in node 0 of kind 0"),
+    (_crafted(kind=(13, TEXT)), "node 13 of kind 11 is not allowed in node 12 of kind 5"),
+    (_crafted(stop=(4, 10 ** 6)), "text ranges"),
+])
+def test_invalid_binary_data(data, message):
+    with pytest.raises(serialize.SerializationError, match=message):
+        serialize.loads(data)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_every_corrupted_byte_is_detected(compress):
+    """任意一个字节被改动都得到 SerializationError（不是其他异常，也不会静默地解码出错误的树）"""
+    data = serialize.dumps(DOCUMENTS[1], compress=compress)
+    for offset in range(len(data)):
+        with pytest.raises(serialize.SerializationError):
+            serialize.loads(_corrupt(data, offset))
+
+
+def test_invalid_json():
+    with pytest.raises(serialize.SerializationError, match="unsupported format version"):
+        serialize.loads_json('{"format": "marktypist-udm", "version": 2, "document": {}}')
+    with pytest.raises(serialize.SerializationError, match="unknown node type"):
+        serialize.loads_json('{"format": "marktypist-udm", "version": 1, "document": {"type": "Footnote"}}')
+
+
+def test_from_document_matches_builder_arena():
+    """由 UDM 构建的 arena 与解析时直接构建的 arena 相同（文本已经合并过）"""
+    text = "# T\n\nsome *text* and www.example.com\n\n| a |\n|:-:|\n| b |"
+    parsed = MarkdownParser().parse_arena(text)
+    rebuilt = NodeArena.from_document(parsed.to_document())
+    for name in ("kind", "parent", "end", "value", "start", "stop", "text"):
+        assert getattr(rebuilt, name) == getattr(parsed, name)
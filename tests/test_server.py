@@ -0,0 +1,184 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from marktypist import client, server as server_module
+from marktypist.cli import cli
+from marktypist.main import convert_md_to_typ
+from marktypist.protocol import decode_message, encode_message, handle_request
+from marktypist.server import ConversionServer
+
+
+@pytest.fixture
+def server(tmp_path: Path, monkeypatch):
+    """在后台线程中运行一个使用 tmp_path 下套接字的服务。"""
+    socket_path = tmp_path / "marktypist.sock"
+    monkeypatch.setenv("MARKTYPIST_SOCKET", str(socket_path))
+    server = ConversionServer(socket_path, workers=2)
+    thread = threading.Thread(target=asyncio.run, args=(server.serve_forever(),))
+    thread.start()
+    assert server.ready.wait(30)
+    yield server
+    server.shutdown()
+    thread.join(30)
+    assert not socket_path.exists()
+
+
+def test_handle_request():
+    assert handle_request({"id": 1, "direction": "md->typ", "text": "**a**"}) == {"ok": True, "text": "*a*", "id": 1}
+    response = handle_request({"direction": "typ->typ", "text": ""})
+    assert not response["ok"] and "ProtocolError" in response["error"]
+
+
+def test_message_round_trip():
+    message = {"id": "x", "text": "line 1\nline 2 中文"}
+    encoded = encode_message(message)
+    assert encoded.count(b"\n") == 1 and encoded.endswith(b"\n")
+    assert decode_message(encoded) == message
+
+
+def test_no_server(tmp_path: Path):
+    assert client.request({"op": "ping"}, tmp_path / "missing.sock") is None
+    # 残留的套接字文件（没有进程在监听）
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.bind(str(stale))
+    assert client.ping(stale) is None
+
+
+def test_text_and_file_requests(server, tmp_path: Path):
+    text = "# Title\n\nSome **bold** text."
+    response = client.request({"id": 3, "direction": "md->typ", "text": text})
+    assert response == {"ok": True, "text": convert_md_to_typ(text), "id": 3}
+
+    source = tmp_path / "doc.typ"
+    source.write_text("= Title\n\n*bold*", encoding="utf-8")
+    assert client.request({"input": str(source)})["text"] == "# Title\n\n**bold**"
+    assert client.request({"input": str(source), "output": str(tmp_path / "doc.md")}) == {"ok": True, "cached": False}
+    assert (tmp_path / "doc.md").read_text(encoding="utf-8") == "# Title\n\n**bold**"
+
+    response = client.request({"input": str(tmp_path / "missing.md")})
+    assert not response["ok"] and "FileNotFoundError" in response["error"]
+    assert client.ping()["requests"] == 4
+
+
+def test_concurrent_clients(server):
+    texts = [f"# Doc {i}\n\n- item *{i}*" for i in range(20)]
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda t: client.request({"direction": "md->typ", "text": t}), texts))
+    assert [r["text"] for r in responses] == [convert_md_to_typ(t) for t in texts]
+
+
+def test_pipelined_requests_and_bad_message(server):
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(str(server.socket_path))
+        sock.sendall(b"not json\n" + b"".join(
+            encode_message({"id": i, "direction": "typ->md", "text": f"= {i}"}) for i in range(3)))
+        with sock.makefile("rb") as stream:
+            responses = [decode_message(stream.readline()) for _ in range(4)]
+    assert not responses[0]["ok"]
+    assert [r["text"] for r in responses[1:]] == ["# 0", "# 1", "# 2"]
+
+
+def _crash_worker(request):
+    if request.get("text") == "crash":
+        os._exit(1)
+    return handle_request(request)
+
+
+def test_worker_crash(server, monkeypatch):
+    """工作进程异常退出时返回带 "id" 的错误，之后的请求由新的进程池处理"""
+    monkeypatch.setattr(server_module, "handle_request", _crash_worker)
+    response = client.request({"id": 1, "direction": "md->typ", "text": "crash"})
+    assert response["id"] == 1 and not response["ok"] and "BrokenProcessPool" in response["error"]
+    assert client.request({"id": 2, "direction": "md->typ", "text": "**a**"}) == {"ok": True, "text": "*a*", "id": 2}
+    assert client.ping()["requests"] == 2
+
+
+def test_socket_is_private(server, monkeypatch):
+    """套接字只有本用户可以访问；客户端不连接其他用户的或者权限过宽的套接字"""
+    assert server.socket_path.stat().st_mode & 0o777 == 0o600
+    assert client.ping() is not None
+
+    server.socket_path.chmod(0o660)
+    assert client.ping() is None
+    server.socket_path.chmod(0o600)
+
+    monkeypatch.setattr(client.os, "getuid", lambda: server.socket_path.stat().st_uid + 1)
+    assert client.ping() is None
+
+
+def test_cli_falls_back_when_daemon_hangs(tmp_path: Path, monkeypatch):
+    """服务接受连接但不回应 ping 时，convert 改为本进程转换"""
+    socket_path = tmp_path / "wedged.sock"
+    monkeypatch.setenv("MARKTYPIST_SOCKET", str(socket_path))
+    monkeypatch.setattr(client, "PING_TIMEOUT", 0.2)
+    source = tmp_path / "doc.md"
+    source.write_text("# Hello", encoding="utf-8")
+    with socket.socket(socket.AF_UNIX) as wedged:
+        wedged.bind(str(socket_path))
+        socket_path.chmod(0o600)
+        wedged.listen()
+        assert client.ping(socket_path) is None
+
+        result = CliRunner().invoke(cli, ["convert", str(source), "-o", str(tmp_path / "doc.typ")])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "doc.typ").read_text(encoding="utf-8") == "= Hello"
+
+
+def _slow_worker(request):
+    time.sleep(0.5)
+    return handle_request(request)
+
+
+def test_slow_conversion_does_not_time_out(server, monkeypatch):
+    """服务回应了 ping 就一直等待转换结果，不会因为转换慢而回退、重复转换"""
+    monkeypatch.setattr(server_module, "handle_request", _slow_worker)
+    monkeypatch.setattr(client, "PING_TIMEOUT", 0.2)
+    response = client.convert({"id": 1, "direction": "md->typ", "text": "**a**"})
+    assert response == {"ok": True, "text": "*a*", "id": 1}
+
+
+@pytest.mark.parametrize("stale", ["protocol", "code"])
+def test_cli_skips_daemon_of_other_version(server, tmp_path: Path, monkeypatch, stale):
+    """协议版本或源码与客户端不同的服务（升级后没有重启）不接收请求，convert 在本进程中转换"""
+    if stale == "protocol":
+        monkeypatch.setattr(client, "PROTOCOL_VERSION", client.PROTOCOL_VERSION + 1)
+    else:
+        monkeypatch.setattr(server, "code", "00000000")
+    assert client.convert({"direction": "md->typ", "text": "**a**"}) is None
+
+    source = tmp_path / "doc.md"
+    source.write_text("# Hello", encoding="utf-8")
+    result = CliRunner().invoke(cli, ["convert", str(source), "-o", str(tmp_path / "doc.typ")])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "doc.typ").read_text(encoding="utf-8") == "= Hello"
+    assert client.ping()["requests"] == 0
+
+
+def test_second_server_refuses_socket(server):
+    with pytest.raises(RuntimeError):
+        asyncio.run(ConversionServer(server.socket_path, workers=1).serve_forever())
+
+
+def test_cli_uses_daemon(server, tmp_path: Path):
+    source = tmp_path / "doc.md"
+    source.write_text("# Hello", encoding="utf-8")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["convert", str(source), "-o", str(tmp_path / "doc.typ")])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "doc.typ").read_text(encoding="utf-8") == "= Hello"
+    assert client.ping()["requests"] == 1
+
+    # --no-daemon 在本进程中转换
+    result = runner.invoke(cli, ["convert", str(source), "--no-daemon"])
+    assert result.exit_code == 0 and "= Hello" in result.output
+    assert client.ping()["requests"] == 1
@@ -0,0 +1,53 @@
+import io
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from marktypist.cli import cli
+from marktypist.main import Converter, convert_file, convert_md_to_typ
+from marktypist.streaming import StripJoiner
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+LARGE_MD = "".join(
+    f"# Section {i}\n\n"
+    f"Paragraph with **bold** and *italic*\ncontinued on a second line.\n\n"
+    f"- item {i}\n- item {i + 1}\n\n  loose continuation\n\n"
+    f"> quote\n> > nested\nlazy line\n\n"
+    f"```python\nprint({i})\n\n```\n\n"
+    f"| a | b |\n| - | - |\n| {i} | `x` |\n\n"
+    for i in range(40)
+)
+
+
+@pytest.mark.parametrize("chunk_lines", [1, 3, 17, 2000])
+def test_streaming_is_byte_identical(chunk_lines):
+    """逐块流式转换的输出与整体转换逐字节相同"""
+    converter = Converter()
+    expected = convert_md_to_typ(LARGE_MD)
+    chunks = list(converter.iter_md_to_typ(io.StringIO(LARGE_MD), chunk_lines=chunk_lines))
+    assert "".join(chunks) == expected
+    if chunk_lines < 2000:
+        assert len(chunks) > 1
+
+
+def test_strip_joiner_matches_join_and_strip():
+    blocks = ["", "  a", "", "b  ", " ", "c\n", ""]
+    joiner = StripJoiner()
+    assert "".join(joiner.feed(b) for b in blocks) == "\n\n".join(blocks).strip()
+
+
+def test_convert_file_stream(tmp_path: Path):
+    source = tmp_path / "large.md"
+    source.write_text("\ufeff" + LARGE_MD, encoding="utf-8")
+    convert_file(source, tmp_path / "in_memory.typ")
+    convert_file(source, tmp_path / "streamed.typ", stream=True)
+    assert (tmp_path / "streamed.typ").read_bytes() == (tmp_path / "in_memory.typ").read_bytes()
+
+
+def test_cli_stream_flag():
+    runner = CliRunner()
+    result = runner.invoke(cli, ["convert", str(FIXTURES_DIR / "basic.md"), "--stream"])
+    assert result.exit_code == 0
+    assert (FIXTURES_DIR / "basic.typ").read_text(encoding="utf-8").strip() in result.output
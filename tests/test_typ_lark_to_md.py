@@ -0,0 +1,74 @@
+import pytest
+from pathlib import Path
+
+from marktypist.main import Converter, convert_md_to_typ
+from marktypist.typ_lark_parser import LarkTypstParser, get_lark_parser
+from tests.test_typ_to_md import TYP_TO_MD_BASIC_CASES
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+converter = Converter(typst_parser=LarkTypstParser())
+
+# 在 Typst 中未闭合的 * 是语法错误，Lark 解析器会报错而不是当作文本
+BASIC_CASES = [case for case in TYP_TO_MD_BASIC_CASES if case[0] != "unclosed_marker"]
+
+# --- 正则解析器不支持、由 Lark 语法支持的结构 ---
+TYP_TO_MD_LARK_CASES = [
+    ("ordered_list", "+ 第一项\n+ 第二项", "1. 第一项\n2. 第二项"),
+    ("numbered_list", "3. 第三项\n4. 第四项", "3. 第三项\n4. 第四项"),
+    ("inline_code", "使用 `print()` 函数。", "使用 `print()` 函数。"),
+    ("code_block", "```python\nprint(1)\n```", "```python\nprint(1)\n```"),
+    ("link", '#link("https://typst.app")[Typst官网]', "[Typst官网](https://typst.app)"),
+    ("bare_link", '#link("https://typst.app")', "[https://typst.app](https://typst.app)"),
+    ("image", '#image("logo.png", alt: "Typst logo")', "![Typst logo](logo.png)"),
+    ("blockquote", "#quote[这是一个引用。]", "> 这是一个引用。"),
+    (
+        "nested_blockquote",
+        "#quote[第一层引用。\n\n#quote[第二层引用。]]",
+        "> 第一层引用。\n>\n> > 第二层引用。"
+    ),
+    ("escaped_star", "2 \\* 3", "2 * 3"),
+    ("word_underscore", "snake_case", "snake_case"),
+    ("cjk_underscore", "_文本_与*粗体*。", "*文本*与**粗体**。"),
+    ("line_comment", '第一行 // #link("https://x")[x]\n// 整行注释\n第二行', "第一行\n第二行"),
+    ("url_not_comment", "见 https://typst.app/a//b", "见 https://typst.app/a//b"),
+    (
+        "table",
+        '#table(\n'
+        '  columns: (auto, auto),\n'
+        '  align: (left, right),\n'
+        '  [*命令*], [*描述*],\n'
+        '  `git status`, "列出所有新的或修改的文件",\n'
+        '  `git diff`, "显示文件差异",\n'
+        ')',
+        "| 命令 | 描述 |\n"
+        "| :--- | ---: |\n"
+        "| `git status` | 列出所有新的或修改的文件 |\n"
+        "| `git diff` | 显示文件差异 |"
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "test_id, typst_input, expected_md_output",
+    BASIC_CASES + TYP_TO_MD_LARK_CASES,
+    ids=[case[0] for case in BASIC_CASES + TYP_TO_MD_LARK_CASES]
+)
+def test_lark_typ_to_md_conversion(test_id, typst_input, expected_md_output):
+    assert converter.typ_to_md(typst_input).strip() == expected_md_output
+
+
+def test_markdown_roundtrip_through_lark_parser():
+    """Markdown -> Typst -> Markdown -> Typst 之后 Typst 输出保持不变"""
+    md_content = (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8")
+    typst_output = convert_md_to_typ(md_content)
+    assert convert_md_to_typ(converter.typ_to_md(typst_output)) == typst_output
+
+
+def test_invalid_markup_reports_location():
+    with pytest.raises(ValueError, match="line 2"):
+        converter.typ_to_md("ok\nnot *closed")
+
+
+def test_parser_is_built_once():
+    assert get_lark_parser() is get_lark_parser()
@@ -16,6 +16,8 @@ TYP_TO_MD_BASIC_CASES = [
     ("italic", "这是 _斜体_ 文字。", "这是 *斜体* 文字。"),
     # 注意 Typst 的粗斜体是 *_..._*
     ("bold_italic", "这是 *_粗斜体_* 文字。", "这是 ***粗斜体*** 文字。"),
+    ("italic_in_bold", "*粗体 _斜体_ 粗体*", "**粗体 *斜体* 粗体**"),
+    ("unclosed_marker", "2 * 3 = 6", "2 * 3 = 6"),
 ]
 
 @pytest.mark.parametrize(
@@ -0,0 +1,93 @@
+import io
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+from markdown_it import MarkdownIt
+
+from marktypist.md_parser import MarkdownParser, UdmRenderer
+from marktypist.md_renderer import MarkdownRenderer
+from marktypist.model import Bold, Document, Italic, Paragraph, Text
+from marktypist.typ_renderer import TypstRenderer
+from marktypist.visitor import Capture
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@dataclass
+class Footnote:
+    __slots__ = ("content",)
+    content: str
+
+
+class Shout(Text):
+    __slots__ = ()
+
+
+def test_register_new_node_type():
+    class FootnoteRenderer(TypstRenderer):
+        pass
+
+    document = Document(content=[Paragraph(content=[Text(content="a"), Footnote(content="b")])])
+    with pytest.raises(NotImplementedError):
+        FootnoteRenderer().render(document)
+
+    @FootnoteRenderer.register(Footnote)
+    def visit_footnote(self, node):
+        return f"#footnote[{node.content}]"
+
+    assert FootnoteRenderer().render(document) == "a#footnote[b]"
+    assert FootnoteRenderer.visit_footnote is visit_footnote
+    # 注册只影响该类及其子类
+    with pytest.raises(NotImplementedError):
+        TypstRenderer().render(document)
+
+
+def test_register_invalidates_subclass_tables():
+    class Base(MarkdownRenderer):
+        pass
+
+    class Child(Base):
+        pass
+
+    node = Paragraph(content=[Text(content="x")])
+    assert Child().render(Document(content=[node])) == "x"
+    Base.register(Text, lambda self, node: node.content.upper())
+    assert Child().render(Document(content=[node])) == "X"
+
+
+def test_node_subclass_uses_base_visitor():
+    assert TypstRenderer().render(Document(content=[Paragraph(content=[Shout(content="hi")])])) == "hi"
+
+
+def test_token_handlers_registered_on_udm_renderer():
+    class Renderer(UdmRenderer):
+        pass
+
+    Renderer.register("hr", lambda self, token: self.stack[-1].content.append(Paragraph(content=[Text(content="***")])))
+    tokens = MarkdownIt("gfm-like").parse("a\n\n---\n")
+    document = Renderer().render(tokens)
+    assert document.content[-1] == Paragraph(content=[Text(content="***")])
+    assert "hr" not in UdmRenderer._dispatch or UdmRenderer._dispatch["hr"] is UdmRenderer.render_default
+
+
+@pytest.mark.parametrize("renderer_class", [TypstRenderer, MarkdownRenderer])
+def test_render_to_matches_render(renderer_class):
+    markdown = (FIXTURES_DIR / "basic.md").read_text(encoding="utf-8")
+    document = MarkdownParser().parse(markdown + "\n\n| a | b |\n| - | - |\n| 1 |\n\n> - q\n>\n> text\n")
+    # 首尾为空白的块也与 render() 的 strip 结果一致
+    document.content[:0] = [Paragraph(content=[Text(content="  ")])]
+    document.content.append(Paragraph(content=[Text(content="tail  ")]))
+    stream = io.StringIO()
+    renderer_class().render_to(document, stream)
+    assert stream.getvalue() == renderer_class().render(document)
+
+
+def test_capture_returns_child_output():
+    class UpperRenderer(TypstRenderer):
+        def visit_bold(self, node):
+            text = yield Capture(node.content)
+            yield text.upper()
+
+    document = Document(content=[Paragraph(content=[Bold(content=[Text(content="a"), Italic(content=[Text(content="b")])])])])
+    assert UpperRenderer().render(document) == "A_B_"
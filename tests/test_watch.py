@@ -0,0 +1,178 @@
+import os
+import time
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from marktypist import watch
+from marktypist.batch import convert_one
+from marktypist.cli import cli
+from marktypist.watch import MANIFEST_NAME, TreeWatcher
+
+
+def write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def kinds(events):
+    return sorted((event.kind, event.source.name) for event in events)
+
+
+def test_converts_only_changed_content(tmp_path: Path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    write(src / "guide" / "b.typ", "= B")
+    watcher = TreeWatcher(str(src), out, jobs=1, debounce=0)
+
+    events = watcher.poll()
+    assert kinds(events) == [("converted", "a.md"), ("converted", "b.typ")]
+    # 启动前就存在的文件没有保存延迟
+    assert all(event.latency is None for event in events)
+    assert (out / "guide" / "b.md").read_text(encoding="utf-8") == "# B"
+    assert watcher.poll() == []
+
+    # 只改 mtime 不会触发转换
+    os.utime(src / "a.md", ns=(0, 10 ** 18))
+    assert watcher.poll() == []
+
+    write(src / "a.md", "# A2")
+    [event] = watcher.poll()
+    assert event.kind == "converted" and event.latency is not None
+    assert (out / "a.typ").read_text(encoding="utf-8") == "= A2"
+
+
+def test_deletes_and_renames_propagate(tmp_path: Path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    write(src / "b.md", "# B")
+    watcher = TreeWatcher(str(src), out, jobs=1, debounce=0)
+    watcher.poll()
+
+    (src / "a.md").unlink()
+    (src / "b.md").rename(src / "c.md")
+    assert kinds(watcher.poll()) == [("converted", "c.md"), ("deleted", "a.md"), ("deleted", "b.md")]
+    assert sorted(p.name for p in out.iterdir()) == [MANIFEST_NAME, "c.typ"]
+
+
+def test_debounce(tmp_path: Path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    watcher = TreeWatcher(str(src), out, jobs=1, debounce=3600)
+    # 启动时已有的文件不需要等待
+    assert kinds(watcher.poll()) == [("converted", "a.md")]
+
+    write(src / "a.md", "# A2 with a different size")
+    assert watcher.poll() == []
+    watcher.debounce = 0
+    assert kinds(watcher.poll()) == [("converted", "a.md")]
+
+
+def test_manifest_survives_restart(tmp_path: Path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    write(src / "b.md", "# B")
+    TreeWatcher(str(src), out, jobs=1, debounce=0).poll()
+
+    # 停止监视期间的改动：删除 b.md，修改 a.md 的内容
+    (src / "b.md").unlink()
+    write(src / "a.md", "# A2")
+    watcher = TreeWatcher(str(src), out, jobs=1, debounce=0)
+    assert kinds(watcher.poll()) == [("converted", "a.md"), ("deleted", "b.md")]
+    assert not (out / "b.typ").exists()
+
+    assert TreeWatcher(str(src), out, jobs=1, debounce=0).poll() == []
+
+
+def test_failures_are_reported_and_retried(tmp_path: Path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    write(src / "b.md", "# B")
+    # 让 b.md 的输出路径被一个目录占用
+    (out / "b.typ").mkdir(parents=True)
+    watcher = TreeWatcher(str(src), out, jobs=2, debounce=0)
+    try:
+        events = watcher.poll()
+    finally:
+        events += watcher.close()
+    assert kinds(events) == [("converted", "a.md"), ("failed", "b.md")]
+    assert "b.md" not in watcher.manifest
+
+
+def test_cli_watch(tmp_path: Path, monkeypatch):
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+
+    # 第一轮扫描（以及它提交到后台的转换）之后停止
+    def run(self, callback, interval):
+        for event in self.poll() + self.close():
+            callback(event)
+
+    monkeypatch.setattr(TreeWatcher, "run", run)
+    result = CliRunner().invoke(cli, ["watch", str(src), "-O", str(out)])
+    assert result.exit_code == 0, result.output
+    assert f"Converted {src / 'a.md'}" in result.output
+    assert (out / "a.typ").read_text(encoding="utf-8") == "= A"
+
+
+def _slow_convert(task):
+    time.sleep(1)
+    return convert_one(task)
+
+
+def test_background_conversions_do_not_block_poll(tmp_path: Path, monkeypatch):
+    """jobs > 1 时 poll() 只提交转换，完成的转换在之后的 poll() 中报告"""
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "a.md", "# A")
+    monkeypatch.setattr(watch, "convert_one", _slow_convert)
+    watcher = TreeWatcher(str(src), out, jobs=2, debounce=0)
+    try:
+        start = time.monotonic()
+        assert watcher.poll() == []
+        assert time.monotonic() - start < 0.9
+
+        # 转换还在进行时再次修改：等这次转换完成后才重新转换
+        write(src / "a.md", "# A2")
+        assert watcher.poll() == []
+        events = []
+        deadline = time.monotonic() + 30
+        while len(events) < 2 and time.monotonic() < deadline:
+            events += watcher.poll()
+            time.sleep(0.05)
+    finally:
+        events += watcher.close()
+    assert kinds(events) == [("converted", "a.md"), ("converted", "a.md")]
+    assert (out / "a.typ").read_text(encoding="utf-8") == "= A2"
+
+
+def _crash_on_marker(task):
+    if task[0].name == "crash.md":
+        os._exit(1)
+    return convert_one(task)
+
+
+def poll_until(watcher, count):
+    events = []
+    deadline = time.monotonic() + 30
+    while len(events) < count and time.monotonic() < deadline:
+        events += watcher.poll()
+        time.sleep(0.05)
+    return events
+
+
+def test_worker_crash_does_not_stop_watching(tmp_path: Path, monkeypatch):
+    """工作进程异常退出时转换报告为失败，之后的修改由新的进程池转换"""
+    src, out = tmp_path / "src", tmp_path / "out"
+    write(src / "crash.md", "# C")
+    monkeypatch.setattr(watch, "convert_one", _crash_on_marker)
+    watcher = TreeWatcher(str(src), out, jobs=2, debounce=0)
+    try:
+        events = poll_until(watcher, 1)
+        assert kinds(events) == [("failed", "crash.md")] and "BrokenProcessPool" in events[0].error
+
+        write(src / "a.md", "# A")
+        events = poll_until(watcher, 1)
+    finally:
+        events += watcher.close()
+    assert ("converted", "a.md") in kinds(events)
+    assert (out / "a.typ").read_text(encoding="utf-8") == "= A"